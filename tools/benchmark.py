@@ -0,0 +1,599 @@
+#!/usr/bin/env python3
+"""
+Offline Benchmark Suite for the n8n Monitoring and Render API Tooling
+
+This tool measures the performance of health-check.py and render-api.py
+entirely locally, against stub n8n and Render API servers with configurable
+latency and failure rates. Results are emitted as JSON so runs can be
+compared between commits.
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import logging
+import platform
+import shutil
+import tempfile
+import statistics
+import subprocess
+import importlib.util
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Any
+from urllib.parse import urlsplit, parse_qs
+import threading
+
+
+TOOLS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+BENCHMARKS = ["health", "metrics", "render", "cli"]
+
+
+def load_tool(filename: str, module_name: str):
+    """
+    Load one of the hyphenated tool scripts as a module
+
+    Args:
+        filename: Script file name in the tools directory
+        module_name: Name to register the module under
+
+    Returns:
+        Loaded module
+    """
+    spec = importlib.util.spec_from_file_location(module_name, os.path.join(TOOLS_DIR, filename))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class StubServer:
+    """Threaded local HTTP server with injected latency and failures"""
+
+    def __init__(self, latency: float = 0.0, failure_rate: float = 0.0,
+                 failure_status: int = 503):
+        """
+        Initialize the stub server
+
+        Args:
+            latency: Seconds added to every response
+            failure_rate: Fraction of requests answered with failure_status
+            failure_status: Status code used for injected failures
+        """
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.failure_status = failure_status
+        self.request_count = 0
+        self._lock = threading.Lock()
+        self._server = None
+
+    @property
+    def url(self) -> str:
+        """Base URL of the running server"""
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> 'StubServer':
+        """Start serving on an ephemeral port"""
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def _dispatch(self, method: str):
+                with stub._lock:
+                    stub.request_count += 1
+
+                if stub.latency:
+                    time.sleep(stub.latency)
+
+                if stub.failure_rate and random.random() < stub.failure_rate:
+                    headers = {'Retry-After': '0'} if stub.failure_status == 429 else {}
+                    self.send_json(stub.failure_status, {'message': 'injected failure'}, headers)
+                    return
+
+                length = int(self.headers.get('Content-Length') or 0)
+                body = json.loads(self.rfile.read(length)) if length else None
+                status, data, headers = stub.handle(method, self.path, body)
+                self.send_json(status, data, headers)
+
+            def send_json(self, status: int, data: Any, headers: dict = None):
+                payload = json.dumps(data).encode() if data is not None else b''
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(payload)))
+                for key, value in (headers or {}).items():
+                    self.send_header(key, value)
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def do_GET(self):
+                self._dispatch("GET")
+
+            def do_POST(self):
+                self._dispatch("POST")
+
+            def do_PUT(self):
+                self._dispatch("PUT")
+
+            def do_PATCH(self):
+                self._dispatch("PATCH")
+
+            def do_DELETE(self):
+                self._dispatch("DELETE")
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        """Stop the server"""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def handle(self, method: str, path: str, body: Any) -> tuple:
+        """
+        Produce a response
+
+        Returns:
+            Tuple of (status, JSON data, extra headers)
+        """
+        raise NotImplementedError
+
+
+class StubN8nServer(StubServer):
+    """Stub n8n instance answering /healthz and the editor page"""
+
+    def handle(self, method: str, path: str, body: Any) -> tuple:
+        if path.startswith('/healthz'):
+            return 200, {'status': 'ok'}, {}
+        return 200, {'app': 'n8n'}, {}
+
+
+class StubRenderAPI(StubServer):
+    """Stub Render API with cursor pagination over a fixed set of services"""
+
+    def __init__(self, service_count: int = 250, **kwargs):
+        """
+        Initialize the stub Render API
+
+        Args:
+            service_count: Number of services in the fake account
+            **kwargs: StubServer options
+        """
+        super().__init__(**kwargs)
+        self.services = {}
+        self.env_vars = {}
+        for i in range(service_count):
+            service_id = f"srv-{i:05d}"
+            self.services[service_id] = {
+                'id': service_id,
+                'name': f"n8n-tenant-{i}-app",
+                'type': 'web_service',
+                'createdAt': '2026-01-01T00:00:00Z',
+                'updatedAt': '2026-01-01T00:00:00Z',
+                'serviceDetails': {
+                    'status': 'live',
+                    'url': f"https://n8n-tenant-{i}-app.onrender.com",
+                    'plan': 'starter',
+                    'region': 'oregon'
+                }
+            }
+            self.env_vars[service_id] = {}
+
+    def handle(self, method: str, path: str, body: Any) -> tuple:
+        parts = urlsplit(path)
+        query = parse_qs(parts.query)
+        segments = [segment for segment in parts.path.split('/') if segment][1:]  # drop "v1"
+
+        if segments == ['services'] and method == "POST":
+            service_id = f"srv-{len(self.services):05d}"
+            self.services[service_id] = {
+                'id': service_id,
+                'name': body['name'],
+                'type': body['type'],
+                'serviceDetails': {'status': 'live', 'plan': body.get('plan'), 'region': body.get('region')}
+            }
+            self.env_vars[service_id] = {}
+            return 201, self.services[service_id], {}
+
+        if segments == ['services'] and method == "GET":
+            limit = int(query.get('limit', ['20'])[0])
+            ids = sorted(self.services)
+            start = ids.index(query['cursor'][0]) + 1 if 'cursor' in query else 0
+            page = [{'cursor': service_id, 'service': self.services[service_id]}
+                    for service_id in ids[start:start + limit]]
+            return 200, page, {}
+
+        if len(segments) >= 2 and segments[0] == 'services':
+            service_id = segments[1]
+            if service_id not in self.services:
+                return 404, {'message': 'not found'}, {}
+
+            if len(segments) == 2:
+                return 200, self.services[service_id], {}
+
+            if segments[2] == 'env-vars':
+                if method == "GET":
+                    return 200, [{'cursor': key, 'envVar': {'key': key, 'value': value}}
+                                 for key, value in self.env_vars[service_id].items()], {}
+                if method == "PUT" and len(segments) == 4:
+                    self.env_vars[service_id][segments[3]] = body.get('value', '')
+                    return 200, body, {}
+                if method == "PUT":
+                    self.env_vars[service_id] = {item['key']: item.get('value', '') for item in body}
+                    return 200, [{'envVar': item} for item in body], {}
+
+            if segments[2] == 'deploys':
+                if method == "POST":
+                    return 201, {'id': 'dep-new', 'status': 'created'}, {}
+                limit = int(query.get('limit', ['20'])[0])
+                return 200, [{'cursor': f"dep-{i}", 'deploy': {'id': f"dep-{i}", 'status': 'live'}}
+                             for i in range(limit)], {}
+
+        return 404, {'message': 'not found'}, {}
+
+
+def _percentile(values: List[float], q: float) -> float:
+    """Nearest-rank percentile of a list of values"""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class BenchmarkSuite:
+    """Runs the benchmarks and collects their results"""
+
+    def __init__(self, args: argparse.Namespace):
+        """
+        Initialize the suite
+
+        Args:
+            args: Parsed command line arguments
+        """
+        self.args = args
+        self.logger = logging.getLogger(__name__)
+        self.workdir = tempfile.mkdtemp(prefix="n8n-bench-")
+        self.health_check = load_tool("health-check.py", "health_check")
+        self.render_api = load_tool("render-api.py", "render_api")
+
+    def run(self, names: List[str]) -> dict:
+        """
+        Run the selected benchmarks
+
+        Args:
+            names: Benchmark names to run
+
+        Returns:
+            Machine-readable report
+        """
+        results = {}
+        try:
+            for name in names:
+                self.logger.info(f"Running {name} benchmark")
+                start = time.perf_counter()
+                results[name] = getattr(self, f"bench_{name}")()
+                results[name]['wall_seconds'] = time.perf_counter() - start
+        finally:
+            shutil.rmtree(self.workdir, ignore_errors=True)
+
+        return {
+            'timestamp': datetime.now().isoformat(),
+            'commit': self._git_commit(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'parameters': {key: value for key, value in vars(self.args).items()
+                           if key not in ('only', 'output', 'compare', 'verbose')},
+            'results': results
+        }
+
+    def bench_health(self) -> dict:
+        """Health-check sweep time over N stub n8n services"""
+        server = StubN8nServer(self.args.latency, self.args.failure_rate).start()
+        try:
+            config = {
+                'services': [
+                    {'name': f"tenant-{i}", 'type': 'n8n' if i % 2 else 'http', 'url': f"{server.url}/"}
+                    for i in range(self.args.services)
+                ],
+                'check_system_resources': False,
+                'max_concurrency': self.args.concurrency,
+                'metrics_db': os.path.join(self.workdir, 'health.db'),
+            }
+            config_path = os.path.join(self.workdir, 'health.json')
+            with open(config_path, 'w') as f:
+                json.dump(config, f)
+
+            monitor = self.health_check.N8nMonitor(config_path)
+            sweeps = []
+            for _ in range(self.args.repeat):
+                start = time.perf_counter()
+                results = monitor.run_health_checks()
+                sweeps.append(time.perf_counter() - start)
+            monitor.metrics_collector.close()
+
+            return {
+                'services': self.args.services,
+                'results_per_sweep': len(results),
+                'requests': server.request_count,
+                'sweep_seconds_median': statistics.median(sweeps),
+                'sweep_seconds_max': max(sweeps),
+                'serial_lower_bound_seconds': self.args.services * self.args.latency,
+            }
+        finally:
+            server.stop()
+
+    def bench_metrics(self) -> dict:
+        """MetricsCollector insert and query throughput"""
+        rows = self.args.rows
+        collector = self.health_check.MetricsCollector(
+            os.path.join(self.workdir, 'metrics.db'), batch_size=5000
+        )
+        MetricData = self.health_check.MetricData
+
+        services = [f"tenant-{i}" for i in range(50)]
+        metric_names = ['cpu_percent', 'memory_percent', 'response_time', 'executions_running']
+        span = timedelta(days=30).total_seconds()
+        end = datetime.now()
+
+        start = time.perf_counter()
+        for i in range(rows):
+            collector.store_metric(MetricData(
+                end - timedelta(seconds=span * (rows - i) / rows),
+                services[i % len(services)],
+                metric_names[i % len(metric_names)],
+                float(i % 100),
+                '%'
+            ))
+        collector.flush()
+        insert_seconds = time.perf_counter() - start
+
+        queries = {
+            'raw_1h_service_metric': dict(service_name='tenant-1', metric_name='memory_percent',
+                                          since=end - timedelta(hours=1), resolution='raw'),
+            'auto_24h_service_metric': dict(service_name='tenant-1', metric_name='memory_percent',
+                                            since=end - timedelta(hours=24)),
+            'auto_30d_all': dict(since=end - timedelta(days=30)),
+            'hourly_max_30d_service_metric': dict(service_name='tenant-1', metric_name='memory_percent',
+                                                  since=end - timedelta(days=30), bucket=3600,
+                                                  aggregate='max'),
+            'raw_bucket_7d_service_metric': dict(service_name='tenant-1', metric_name='memory_percent',
+                                                 since=end - timedelta(days=7), resolution='raw',
+                                                 bucket=900),
+        }
+        query_results = {}
+        for name, kwargs in queries.items():
+            timings = []
+            for _ in range(self.args.repeat):
+                start = time.perf_counter()
+                returned = collector.get_metrics(**kwargs)
+                timings.append(time.perf_counter() - start)
+            query_results[name] = {
+                'rows_returned': len(returned),
+                'seconds_median': statistics.median(timings),
+            }
+
+        collector.close()
+        db_path = os.path.join(self.workdir, 'metrics.db')
+
+        return {
+            'rows': rows,
+            'insert_seconds': insert_seconds,
+            'insert_rows_per_second': rows / insert_seconds if insert_seconds else None,
+            'db_bytes': sum(os.path.getsize(path) for path in (db_path, db_path + '-wal', db_path + '-shm')
+                            if os.path.exists(path)),
+            'queries': query_results,
+        }
+
+    def bench_render(self) -> dict:
+        """RenderAPIClient request overhead and retry behavior"""
+        results = {}
+
+        # Per-request client overhead on top of the stub's own latency
+        server = StubRenderAPI(self.args.render_services, latency=self.args.latency).start()
+        try:
+            client = self._render_client(server, cache=False)
+            timings = []
+            for _ in range(self.args.requests):
+                start = time.perf_counter()
+                client.get_service('srv-00001')
+                timings.append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            services = client.get_services()
+            list_seconds = time.perf_counter() - start
+
+            results['overhead'] = {
+                'requests': len(timings),
+                'latency_ms_p50': _percentile(timings, 0.5) * 1000,
+                'latency_ms_p99': _percentile(timings, 0.99) * 1000,
+                'overhead_ms_p50': (_percentile(timings, 0.5) - self.args.latency) * 1000,
+                'list_services': len(services),
+                'list_requests': server.request_count - len(timings),
+                'list_seconds': list_seconds,
+            }
+        finally:
+            server.stop()
+
+        # Retry behavior under injected 503s and 429s
+        for status in (503, 429):
+            server = StubRenderAPI(self.args.render_services, latency=self.args.latency,
+                                   failure_rate=self.args.failure_rate or 0.2,
+                                   failure_status=status).start()
+            try:
+                client = self._render_client(server, cache=False)
+                succeeded = failed = 0
+                start = time.perf_counter()
+                for _ in range(self.args.retry_requests):
+                    try:
+                        client.get_service('srv-00001')
+                        succeeded += 1
+                    except self.render_api.RenderAPIError:
+                        failed += 1
+                elapsed = time.perf_counter() - start
+
+                results[f"retry_{status}"] = {
+                    'calls': self.args.retry_requests,
+                    'succeeded': succeeded,
+                    'failed': failed,
+                    'http_requests': server.request_count,
+                    'seconds': elapsed,
+                }
+            finally:
+                server.stop()
+
+        # Throughput of concurrent callers sharing a client capped by the limiter
+        server = StubRenderAPI(self.args.render_services, latency=self.args.latency).start()
+        try:
+            limiter = self.render_api.RateLimiter(rate=self.args.limiter_rate, burst=1)
+            client = self._render_client(server, cache=False, rate_limiter=limiter)
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=self.args.concurrency) as executor:
+                list(executor.map(lambda _: client.get_service('srv-00001'), range(self.args.requests)))
+            elapsed = time.perf_counter() - start
+
+            results['rate_limited'] = {
+                'requests': self.args.requests,
+                'rate_limit': self.args.limiter_rate,
+                'requests_per_second': self.args.requests / elapsed if elapsed else None,
+                'seconds': elapsed,
+            }
+        finally:
+            server.stop()
+
+        return results
+
+    def bench_cli(self) -> dict:
+        """CLI startup time for each tool"""
+        results = {}
+        for script in ("health-check.py", "render-api.py"):
+            timings = []
+            for _ in range(self.args.repeat):
+                start = time.perf_counter()
+                subprocess.run([sys.executable, os.path.join(TOOLS_DIR, script), "--help"],
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=False)
+                timings.append(time.perf_counter() - start)
+            results[script] = {
+                'seconds_median': statistics.median(timings),
+                'seconds_min': min(timings),
+            }
+        return results
+
+    def _render_client(self, server: StubRenderAPI, cache: bool = True, rate_limiter=None):
+        """Create a RenderAPIClient pointed at a stub server, unthrottled unless a limiter is given"""
+        rate_limiter = rate_limiter or self.render_api.RateLimiter(rate=float('inf'))
+        client = self.render_api.RenderAPIClient("bench-key", timeout=10, cache=cache, rate_limiter=rate_limiter)
+        client.BASE_URL = f"{server.url}/v1/"
+        return client
+
+    @staticmethod
+    def _git_commit() -> Optional[str]:
+        """Current git commit, if available"""
+        try:
+            return subprocess.run(["git", "rev-parse", "HEAD"], cwd=TOOLS_DIR, capture_output=True,
+                                  text=True, check=True).stdout.strip()
+        except Exception:
+            return None
+
+
+def _flatten(data: dict, prefix: str = "") -> Dict[str, float]:
+    """Flatten nested numeric results into dotted keys"""
+    flat = {}
+    for key, value in data.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(_flatten(value, f"{name}."))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[name] = value
+    return flat
+
+
+def compare_reports(baseline: dict, current: dict) -> List[str]:
+    """
+    Compare two reports
+
+    Args:
+        baseline: Earlier report
+        current: New report
+
+    Returns:
+        One line per numeric result present in both reports
+    """
+    before = _flatten(baseline.get('results', {}))
+    after = _flatten(current.get('results', {}))
+
+    lines = []
+    for key in sorted(before.keys() & after.keys()):
+        old, new = before[key], after[key]
+        change = f"{(new - old) / old * 100:+.1f}%" if old else "n/a"
+        lines.append(f"{key:<60} {old:>14.4f} {new:>14.4f} {change:>9}")
+    return lines
+
+
+def setup_logging(verbose: bool = False):
+    """Set up logging configuration"""
+    level = logging.DEBUG if verbose else logging.INFO
+    logging.basicConfig(
+        level=level,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+
+
+def main():
+    """Main CLI interface"""
+    parser = argparse.ArgumentParser(description="Offline benchmarks for the n8n monitoring and Render API tools")
+    parser.add_argument("--only", nargs="+", choices=BENCHMARKS, default=BENCHMARKS,
+                        help="Benchmarks to run (default: all)")
+    parser.add_argument("--services", type=int, default=200, help="Stub n8n services per health sweep")
+    parser.add_argument("--concurrency", type=int, default=20, help="Health check concurrency limit")
+    parser.add_argument("--latency", type=float, default=0.05, help="Stub server latency in seconds")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="Fraction of stub requests that fail")
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Rows inserted by the metrics benchmark")
+    parser.add_argument("--render-services", type=int, default=250, help="Services in the stub Render account")
+    parser.add_argument("--requests", type=int, default=200, help="Requests for the Render overhead benchmark")
+    parser.add_argument("--retry-requests", type=int, default=20, help="Calls for the Render retry benchmark")
+    parser.add_argument("--limiter-rate", type=float, default=50.0,
+                        help="Requests per second allowed in the Render rate limiter benchmark")
+    parser.add_argument("--repeat", type=int, default=3, help="Repetitions for timed operations")
+    parser.add_argument("--output", "-o", help="Write the JSON report to this file instead of stdout")
+    parser.add_argument("--compare", help="Baseline JSON report to compare against")
+    parser.add_argument("--verbose", "-v", action="store_true", help="Verbose output")
+
+    args = parser.parse_args()
+
+    setup_logging(args.verbose)
+
+    try:
+        suite = BenchmarkSuite(args)
+        report = suite.run(args.only)
+
+        if args.output:
+            with open(args.output, 'w') as f:
+                json.dump(report, f, indent=2)
+        else:
+            print(json.dumps(report, indent=2))
+
+        if args.compare:
+            with open(args.compare) as f:
+                baseline = json.load(f)
+            print(f"{'result':<60} {'baseline':>14} {'current':>14} {'change':>9}", file=sys.stderr)
+            for line in compare_reports(baseline, report):
+                print(line, file=sys.stderr)
+
+    except KeyboardInterrupt:
+        print("\nOperation cancelled")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
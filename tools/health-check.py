@@ -10,32 +10,75 @@ import os
 import sys
 import time
 import json
+import gzip
+import math
+import heapq
+import bisect
+import signal
+import hashlib
 import argparse
+import importlib.util
+import functools
 import logging
+import queue
+import random
 import sqlite3
-from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any
+import threading
+import multiprocessing
+import multiprocessing.connection
+import weakref
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterator, List, Optional, Any
 from dataclasses import dataclass, asdict
-from urllib.parse import urljoin
+from urllib.parse import quote, urljoin
 import requests
+from requests.adapters import HTTPAdapter
 import psutil
 from pathlib import Path
 
 # Try to import optional dependencies
 try:
     import smtplib
-    from email.mime.text import MimeText
-    from email.mime.multipart import MimeMultipart
+    from email.mime.text import MIMEText
+    from email.mime.multipart import MIMEMultipart
     SMTP_AVAILABLE = True
 except ImportError:
     SMTP_AVAILABLE = False
 
+def _load_render_api():
+    """Load render-api.py from this directory; its hyphenated name can't be imported"""
+    spec = importlib.util.spec_from_file_location(
+        'render_api', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'render-api.py'))
+    module = importlib.util.module_from_spec(spec)
+    sys.modules['render_api'] = module
+    try:
+        spec.loader.exec_module(module)
+    except BaseException:
+        del sys.modules['render_api']
+        raise
+    return module
+
+
 try:
-    from render_api import RenderAPIClient, N8nRenderManager
+    _render_api = _load_render_api()
+    RenderAPIClient = _render_api.RenderAPIClient
+    N8nRenderManager = _render_api.N8nRenderManager
+    LogTail = _render_api.LogTail
+    RateLimiter = _render_api.RateLimiter
     RENDER_API_AVAILABLE = True
-except ImportError:
+except (ImportError, OSError):
     RENDER_API_AVAILABLE = False
 
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
 
 @dataclass
 class HealthCheckResult:
@@ -71,36 +114,441 @@ class MetricData:
         return data
 
 
+@dataclass
+class MetricRollup(MetricData):
+    """Represents an aggregated metric bucket; value holds the requested aggregate, the average by default"""
+    resolution: str = ""
+    count: int = 0
+    min_value: float = 0.0
+    max_value: float = 0.0
+    sum_value: float = 0.0
+
+
+class LatencySketch:
+    """
+    Mergeable, fixed-memory latency distribution (DDSketch style)
+    
+    Values are counted in logarithmic buckets so any quantile is reported
+    within relative_accuracy of the true value. Sketches built with the same
+    accuracy can be merged, which lets per-interval sketches be combined
+    over arbitrary windows.
+    """
+    
+    def __init__(self, relative_accuracy: float = 0.01, max_buckets: int = 2048):
+        """
+        Initialize the sketch
+        
+        Args:
+            relative_accuracy: Maximum relative error of reported quantiles
+            max_buckets: Bucket limit; the lowest buckets are collapsed beyond it
+        """
+        self.relative_accuracy = relative_accuracy
+        self.max_buckets = max_buckets
+        self._gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self._gamma)
+        
+        self.bins = {}
+        self.zero_count = 0
+        self.count = 0
+        self.sum = 0.0
+        self.min = None
+        self.max = None
+    
+    def add(self, value: float, count: int = 1):
+        """Record a value"""
+        if value <= 0:
+            self.zero_count += count
+        else:
+            index = math.ceil(math.log(value) / self._log_gamma)
+            self.bins[index] = self.bins.get(index, 0) + count
+            if len(self.bins) > self.max_buckets:
+                self._collapse()
+        
+        self.count += count
+        self.sum += value * count
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+    
+    def merge(self, other: 'LatencySketch'):
+        """Fold another sketch with the same accuracy into this one"""
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("Cannot merge sketches with different relative accuracy")
+        
+        for index, count in other.bins.items():
+            self.bins[index] = self.bins.get(index, 0) + count
+        if len(self.bins) > self.max_buckets:
+            self._collapse()
+        
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.sum += other.sum
+        if other.min is not None:
+            self.min = other.min if self.min is None else min(self.min, other.min)
+            self.max = other.max if self.max is None else max(self.max, other.max)
+    
+    def quantile(self, q: float) -> Optional[float]:
+        """
+        Estimate a quantile
+        
+        Args:
+            q: Quantile between 0 and 1
+            
+        Returns:
+            Estimated value, or None if the sketch is empty
+        """
+        if self.count == 0:
+            return None
+        
+        rank = q * (self.count - 1)
+        seen = self.zero_count
+        if seen > rank:
+            return 0.0
+        
+        for index in sorted(self.bins):
+            seen += self.bins[index]
+            if seen > rank:
+                value = 2 * self._gamma ** index / (self._gamma + 1)
+                return min(max(value, self.min), self.max)
+        
+        return self.max
+    
+    def _collapse(self):
+        """Merge the lowest buckets so the sketch stays within max_buckets"""
+        indexes = sorted(self.bins)
+        excess = indexes[:len(indexes) - self.max_buckets + 1]
+        target = indexes[len(excess)]
+        for index in excess:
+            self.bins[target] += self.bins.pop(index)
+    
+    def to_dict(self) -> dict:
+        """Convert to dictionary for JSON serialization"""
+        return {
+            'relative_accuracy': self.relative_accuracy,
+            'bins': {str(index): count for index, count in self.bins.items()},
+            'zero_count': self.zero_count,
+            'count': self.count,
+            'sum': self.sum,
+            'min': self.min,
+            'max': self.max,
+        }
+    
+    @classmethod
+    def from_dict(cls, data: dict, max_buckets: int = 2048) -> 'LatencySketch':
+        """Rebuild a sketch from to_dict output"""
+        sketch = cls(data['relative_accuracy'], max_buckets)
+        sketch.bins = {int(index): count for index, count in data['bins'].items()}
+        sketch.zero_count = data['zero_count']
+        sketch.count = data['count']
+        sketch.sum = data['sum']
+        sketch.min = data['min']
+        sketch.max = data['max']
+        return sketch
+
+
+class ResourceSampler:
+    """Samples host and n8n process resources on a background thread"""
+    
+    def __init__(self, interval: float = 1.0, window: int = 60,
+                 process_pattern: str = 'n8n', disk_path: str = '/'):
+        """
+        Initialize the resource sampler
+        
+        Args:
+            interval: Seconds between samples
+            window: Number of samples kept for rolling averages
+            process_pattern: Substring identifying the n8n process by name or
+                command line, or None to skip process tracking
+            disk_path: Path whose filesystem usage is sampled
+        """
+        self.interval = interval
+        self.process_pattern = process_pattern
+        self.disk_path = disk_path
+        self.logger = logging.getLogger(__name__)
+        
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self._ready = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        
+        self._process = None
+        self._last_net = None
+        self._last_ctx_switches = None
+    
+    def start(self):
+        """Start sampling in the background"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        
+        # Prime the counters so the first sample has a baseline
+        psutil.cpu_percent(interval=None)
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='resource-sampler', daemon=True)
+        self._thread.start()
+    
+    def stop(self):
+        """Stop sampling"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval * 2)
+            self._thread = None
+    
+    def latest(self, timeout: float = None) -> Optional[dict]:
+        """
+        Get the most recent sample without blocking on measurement
+        
+        Args:
+            timeout: Seconds to wait for the first sample (defaults to two
+                sampling intervals)
+            
+        Returns:
+            Latest sample, or None if nothing has been sampled yet
+        """
+        self._ready.wait(self.interval * 2 if timeout is None else timeout)
+        with self._lock:
+            return self._samples[-1] if self._samples else None
+    
+    def average(self, key: str) -> Optional[float]:
+        """Average of a numeric sample field over the rolling window"""
+        with self._lock:
+            values = [sample[key] for sample in self._samples if sample.get(key) is not None]
+        return sum(values) / len(values) if values else None
+    
+    def _run(self):
+        """Sampling loop; the next tick is scheduled from the previous one to avoid drift"""
+        next_tick = time.monotonic() + self.interval
+        while not self._stop.wait(max(0, next_tick - time.monotonic())):
+            try:
+                sample = self._sample()
+                with self._lock:
+                    self._samples.append(sample)
+                self._ready.set()
+            except Exception as e:
+                self.logger.error(f"Resource sampling failed: {e}")
+            
+            next_tick += self.interval
+    
+    def _sample(self) -> dict:
+        """Take one sample of host and process counters"""
+        now = time.monotonic()
+        disk = psutil.disk_usage(self.disk_path)
+        net = psutil.net_io_counters()
+        
+        sample = {
+            'timestamp': datetime.now(),
+            'cpu_percent': psutil.cpu_percent(interval=None),
+            'memory': psutil.virtual_memory(),
+            'disk': disk,
+            'disk_percent': (disk.used / disk.total) * 100,
+            'net_bytes_sent_per_sec': None,
+            'net_bytes_recv_per_sec': None,
+            'process': self._sample_process(now) if self.process_pattern else None,
+        }
+        
+        if net is not None:
+            if self._last_net is not None:
+                elapsed = now - self._last_net[0]
+                if elapsed > 0:
+                    sample['net_bytes_sent_per_sec'] = (net.bytes_sent - self._last_net[1].bytes_sent) / elapsed
+                    sample['net_bytes_recv_per_sec'] = (net.bytes_recv - self._last_net[1].bytes_recv) / elapsed
+            self._last_net = (now, net)
+        
+        return sample
+    
+    def _find_process(self) -> Optional[psutil.Process]:
+        """
+        Find the n8n node process
+        
+        Matches a process whose name contains the pattern, or a node process
+        started with an argument containing it (e.g. node /usr/local/bin/n8n).
+        """
+        pattern = self.process_pattern.lower()
+        for proc in psutil.process_iter(['name', 'cmdline']):
+            try:
+                name = (proc.info['name'] or '').lower()
+                args = [os.path.basename(arg).lower() for arg in (proc.info['cmdline'] or [])[1:]]
+                if proc.pid == os.getpid():
+                    continue
+                if pattern in name or (name.startswith('node') and any(pattern in arg for arg in args)):
+                    proc.cpu_percent(interval=None)
+                    return proc
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                continue
+        return None
+    
+    def _sample_process(self, now: float) -> Optional[dict]:
+        """
+        Sample the n8n process
+        
+        n8n runs workflows on a single Node.js event loop, so CPU close to one
+        full core and a high rate of involuntary context switches are used as
+        proxies for event-loop lag.
+        """
+        if self._process is None or not self._process.is_running():
+            self._process = self._find_process()
+            self._last_ctx_switches = None
+            if self._process is None:
+                return None
+        
+        try:
+            with self._process.oneshot():
+                memory = self._process.memory_info()
+                ctx_switches = self._process.num_ctx_switches()
+                sample = {
+                    'pid': self._process.pid,
+                    'cpu_percent': self._process.cpu_percent(interval=None),
+                    'rss': memory.rss,
+                    'num_threads': self._process.num_threads(),
+                    'num_fds': self._process.num_fds() if hasattr(self._process, 'num_fds') else None,
+                    'involuntary_ctx_switches_per_sec': None,
+                }
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            self._process = None
+            return None
+        
+        if self._last_ctx_switches is not None:
+            elapsed = now - self._last_ctx_switches[0]
+            if elapsed > 0:
+                sample['involuntary_ctx_switches_per_sec'] = (
+                    ctx_switches.involuntary - self._last_ctx_switches[1]) / elapsed
+        self._last_ctx_switches = (now, ctx_switches.involuntary)
+        
+        return sample
+
+
 class HealthChecker:
     """Core health checking functionality"""
     
-    def __init__(self, timeout: int = 10):
+    def __init__(self, timeout: int = 10, pool_size: int = 10, sampler: ResourceSampler = None):
         """
         Initialize the health checker
         
         Args:
             timeout: Request timeout in seconds
+            pool_size: Maximum pooled connections per host and per database,
+                should match the number of concurrent checks
+            sampler: Optional running resource sampler; without one, system
+                checks measure CPU inline for one second
         """
         self.timeout = timeout
+        self.pool_size = pool_size
+        self.sampler = sampler
         self.session = requests.Session()
-        self.session.timeout = timeout
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
         self.logger = logging.getLogger(__name__)
+        
+        # PostgreSQL connection pools, kept across cycles
+        self._pg_pools = {}  # (host, port, database, user, timeout) -> ThreadedConnectionPool
+        self._pg_used = weakref.WeakSet()  # connections that completed a query
+        self._pg_lock = threading.Lock()
+    
+    def close(self):
+        """Close pooled database connections"""
+        with self._pg_lock:
+            for pool in self._pg_pools.values():
+                pool.closeall()
+            self._pg_pools.clear()
+    
+    def _postgres_pool(self, db_config: dict, timeout: float):
+        """
+        Get the connection pool for a database, creating it on first use
+        
+        Connect and statement timeouts are fixed per connection, so callers
+        using different timeouts get separate pools.
+        """
+        import psycopg2.pool
+        
+        key = (db_config['host'], db_config.get('port', 5432), db_config['database'], db_config['user'], timeout)
+        with self._pg_lock:
+            pool = self._pg_pools.get(key)
+            if pool is None:
+                pool = psycopg2.pool.ThreadedConnectionPool(
+                    0, db_config.get('pool_size', self.pool_size),
+                    host=db_config['host'],
+                    port=db_config.get('port', 5432),
+                    database=db_config['database'],
+                    user=db_config['user'],
+                    password=db_config['password'],
+                    connect_timeout=int(max(1, timeout)),
+                    application_name='n8n-health-check',
+                    # Stats queries must never hang a check
+                    options=f"-c statement_timeout={int(timeout * 1000)}"
+                )
+                self._pg_pools[key] = pool
+        return pool
+    
+    def _postgres_query(self, db_config: dict, timeout: float, query: str, params: tuple = None) -> tuple:
+        """
+        Run a read-only query on a pooled connection
+        
+        A pooled connection that went stale (e.g. after a database restart)
+        is discarded and the query retried once on a fresh one. When every
+        pooled connection is in use, waits up to timeout for one to be
+        returned before raising psycopg2.pool.PoolError.
+        
+        Returns:
+            (rows, connect_ms, query_ms, reused)
+        """
+        import psycopg2
+        import psycopg2.pool
+        
+        pool = self._postgres_pool(db_config, timeout)
+        
+        for attempt in range(2):
+            start_time = time.time()
+            deadline = time.monotonic() + timeout
+            while True:
+                try:
+                    conn = pool.getconn()
+                    break
+                except psycopg2.pool.PoolError:
+                    if pool.closed or time.monotonic() >= deadline:
+                        raise
+                    time.sleep(0.05)
+            reused = conn in self._pg_used
+            connect_ms = (time.time() - start_time) * 1000
+            
+            try:
+                start_time = time.time()
+                with conn.cursor() as cursor:
+                    cursor.execute(query, params)
+                    rows = cursor.fetchall()
+                conn.rollback()
+                query_ms = (time.time() - start_time) * 1000
+            except (psycopg2.OperationalError, psycopg2.InterfaceError):
+                pool.putconn(conn, close=True)
+                if attempt or not reused:
+                    raise
+                continue
+            except Exception:
+                pool.putconn(conn, close=True)
+                raise
+            
+            self._pg_used.add(conn)
+            pool.putconn(conn)
+            return rows, connect_ms, query_ms, reused
     
-    def check_http_endpoint(self, url: str, expected_status: int = 200) -> HealthCheckResult:
+    def check_http_endpoint(self, url: str, expected_status: int = 200,
+                            auth: tuple = None, timeout: float = None) -> HealthCheckResult:
         """
         Check HTTP endpoint health
         
         Args:
             url: URL to check
             expected_status: Expected HTTP status code
+            auth: Optional basic auth tuple (username, password)
+            timeout: Request timeout in seconds (defaults to checker timeout)
             
         Returns:
             Health check result
         """
+        timeout = timeout or self.timeout
         start_time = time.time()
         
         try:
-            response = self.session.get(url)
+            response = self.session.get(url, auth=auth, timeout=timeout)
             response_time = (time.time() - start_time) * 1000  # ms
             
             if response.status_code == expected_status:
@@ -130,7 +578,7 @@ class HealthChecker:
                 service_name=self._extract_service_name(url),
                 check_type='http_endpoint',
                 status='critical',
-                response_time=self.timeout * 1000,
+                response_time=timeout * 1000,
                 message="Request timeout",
                 details={'url': url, 'error': 'timeout'}
             )
@@ -157,25 +605,27 @@ class HealthChecker:
                 details={'url': url, 'error': str(e)}
             )
     
-    def check_n8n_health(self, base_url: str, auth: tuple = None) -> HealthCheckResult:
+    def check_n8n_health(self, base_url: str, auth: tuple = None,
+                         timeout: float = None) -> HealthCheckResult:
         """
         Check n8n specific health endpoints
         
+        Auth is passed per request rather than set on the shared session so
+        that checks can run concurrently from several threads.
+        
         Args:
             base_url: n8n base URL
             auth: Optional basic auth tuple (username, password)
+            timeout: Request timeout in seconds (defaults to checker timeout)
             
         Returns:
             Health check result
         """
+        timeout = timeout or self.timeout
         health_url = urljoin(base_url, '/healthz')
         
-        # Set auth if provided
-        if auth:
-            self.session.auth = auth
-        
         # First check the health endpoint
-        health_result = self.check_http_endpoint(health_url)
+        health_result = self.check_http_endpoint(health_url, auth=auth, timeout=timeout)
         
         if health_result.status != 'healthy':
             return health_result
@@ -184,7 +634,7 @@ class HealthChecker:
         try:
             # Check main interface
             main_url = urljoin(base_url, '/')
-            main_response = self.session.get(main_url)
+            main_response = self.session.get(main_url, auth=auth, timeout=timeout)
             
             # Check if n8n interface is loading
             if 'n8n' in main_response.text.lower() or main_response.status_code == 200:
@@ -205,55 +655,207 @@ class HealthChecker:
             health_result.status = 'warning'
             health_result.message = f"Health endpoint OK, but interface check failed: {str(e)}"
         
-        finally:
-            # Clear auth
-            self.session.auth = None
-        
         return health_result
     
-    def check_database_connection(self, db_config: dict) -> HealthCheckResult:
+    def probe_n8n_executions(self, base_url: str, api_key: str, service_name: str = None,
+                             window_minutes: int = 60, max_pages: int = 20,
+                             timeout: float = None) -> List[MetricData]:
+        """
+        Measure the execution backlog through the n8n public REST API
+        
+        Args:
+            base_url: n8n base URL
+            api_key: n8n API key (sent as X-N8N-API-KEY)
+            service_name: Service name for the metrics (defaults to the host)
+            window_minutes: How far back finished executions are counted
+            max_pages: Upper bound on pages fetched per status
+            timeout: Request timeout in seconds (defaults to checker timeout)
+            
+        Returns:
+            Execution counts, age of the oldest running execution and
+            duration percentiles of recently finished executions
+        """
+        timeout = timeout or self.timeout
+        service_name = service_name or self._extract_service_name(base_url)
+        url = urljoin(base_url, '/api/v1/executions')
+        headers = {'X-N8N-API-KEY': api_key, 'Accept': 'application/json'}
+        now = datetime.now(timezone.utc)
+        window_start = now - timedelta(minutes=window_minutes)
+        
+        def fetch(status: str, since: datetime = None) -> Optional[List[dict]]:
+            """Page through executions with a status, newest first, stopping at since"""
+            executions = []
+            params = {'status': status, 'limit': 250}
+            for _ in range(max_pages):
+                response = self.session.get(url, params=params, headers=headers, timeout=timeout)
+                if response.status_code == 400:
+                    # Older n8n versions reject some status filters (e.g. running)
+                    self.logger.debug(f"n8n at {base_url} does not support status={status}")
+                    return None
+                response.raise_for_status()
+                page = response.json()
+                
+                for execution in page.get('data', []):
+                    started = self._parse_n8n_time(execution.get('startedAt'))
+                    if since and started and started < since:
+                        return executions
+                    executions.append(execution)
+                
+                if not page.get('nextCursor'):
+                    break
+                params['cursor'] = page['nextCursor']
+            return executions
+        
+        timestamp = datetime.now()
+        metrics = []
+        
+        running = fetch('running')
+        waiting = fetch('waiting')
+        failed = fetch('error', window_start)
+        succeeded = fetch('success', window_start)
+        
+        for name, executions, unit in (('executions_running', running, ''),
+                                       ('executions_waiting', waiting, ''),
+                                       ('executions_failed', failed, f'per {window_minutes}m'),
+                                       ('executions_succeeded', succeeded, f'per {window_minutes}m')):
+            if executions is not None:
+                metrics.append(MetricData(timestamp, service_name, name, len(executions), unit))
+        
+        # A long-running execution is the clearest sign of a stuck worker
+        if running is not None:
+            started = [self._parse_n8n_time(e.get('startedAt')) for e in running]
+            started = [s for s in started if s]
+            oldest = (now - min(started)).total_seconds() if started else 0.0
+            metrics.append(MetricData(timestamp, service_name, 'oldest_running_execution_age', oldest, 's'))
+        
+        durations = []
+        for execution in (failed or []) + (succeeded or []):
+            start = self._parse_n8n_time(execution.get('startedAt'))
+            stop = self._parse_n8n_time(execution.get('stoppedAt'))
+            if start and stop:
+                durations.append((stop - start).total_seconds() * 1000)
+        
+        if durations:
+            durations.sort()
+            for name, q in (('p50', 0.5), ('p95', 0.95)):
+                value = durations[min(len(durations) - 1, int(q * len(durations)))]
+                metrics.append(MetricData(timestamp, service_name, f'execution_duration_{name}', value, 'ms'))
+            metrics.append(MetricData(timestamp, service_name, 'execution_duration_max', durations[-1], 'ms'))
+        
+        return metrics
+    
+    @staticmethod
+    def _parse_n8n_time(value: str) -> Optional[datetime]:
+        """Parse an n8n ISO timestamp into an aware UTC datetime"""
+        if not value:
+            return None
+        try:
+            parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+        except ValueError:
+            return None
+        return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+    
+    def probe_webhook(self, url: str, service_name: str = None, method: str = 'POST',
+                      payload: dict = None, expected_status: int = 200, echo: bool = False,
+                      auth: tuple = None, timeout: float = None) -> List[MetricData]:
+        """
+        Time a synthetic webhook round trip through a probe workflow
+        
+        The probe sends a unique nonce with the payload. With echo set, the
+        workflow must return it in its response (e.g. via a Respond to
+        Webhook node), proving the request went through the workflow
+        rather than being answered early.
+        
+        Args:
+            url: Production webhook URL of the probe workflow
+            service_name: Service name for the metrics (defaults to the host)
+            method: HTTP method the webhook listens on
+            payload: Extra JSON fields to send
+            expected_status: Status code the webhook responds with
+            echo: Require the nonce in the response body
+            auth: Optional basic auth tuple (username, password)
+            timeout: Request timeout in seconds (defaults to checker timeout)
+            
+        Returns:
+            webhook_success (1 or 0) and, when it succeeded, webhook_round_trip
+        """
+        timeout = timeout or self.timeout
+        service_name = service_name or self._extract_service_name(url)
+        nonce = os.urandom(8).hex()
+        body = {**(payload or {}), 'probe_nonce': nonce}
+        
+        start_time = time.time()
+        try:
+            if method.upper() == 'GET':
+                response = self.session.get(url, params=body, auth=auth, timeout=timeout)
+            else:
+                response = self.session.request(method.upper(), url, json=body, auth=auth, timeout=timeout)
+            round_trip = (time.time() - start_time) * 1000  # ms
+            
+            success = response.status_code == expected_status and (not echo or nonce in response.text)
+            if not success:
+                self.logger.warning(f"Webhook probe for {service_name} failed: "
+                                    f"status {response.status_code}, echo {'ok' if nonce in response.text else 'missing'}")
+        except requests.exceptions.RequestException as e:
+            self.logger.warning(f"Webhook probe for {service_name} failed: {e}")
+            success = False
+        
+        timestamp = datetime.now()
+        metrics = [MetricData(timestamp, service_name, 'webhook_success', 1.0 if success else 0.0, '')]
+        if success:
+            metrics.append(MetricData(timestamp, service_name, 'webhook_round_trip', round_trip, 'ms'))
+        return metrics
+    
+    def check_database_connection(self, db_config: dict, timeout: float = None) -> HealthCheckResult:
         """
         Check database connection health
         
         Args:
             db_config: Database configuration
+            timeout: Connect timeout in seconds (defaults to checker timeout)
             
         Returns:
             Health check result
         """
+        timeout = timeout or self.timeout
         start_time = time.time()
         
         try:
             if db_config.get('type') == 'postgresql':
-                # Check PostgreSQL connection
-                import psycopg2
-                
-                conn = psycopg2.connect(
-                    host=db_config['host'],
-                    port=db_config.get('port', 5432),
-                    database=db_config['database'],
-                    user=db_config['user'],
-                    password=db_config['password'],
-                    connect_timeout=self.timeout
-                )
-                
-                # Simple query to test connection
-                cursor = conn.cursor()
-                cursor.execute('SELECT 1')
-                cursor.fetchone()
-                cursor.close()
-                conn.close()
+                import psycopg2.pool
                 
-                response_time = (time.time() - start_time) * 1000
+                # Check PostgreSQL on a pooled connection, timing the
+                # handshake separately from the query itself
+                try:
+                    _, connect_ms, query_ms, reused = self._postgres_query(db_config, timeout, 'SELECT 1')
+                except psycopg2.pool.PoolError as e:
+                    # All pooled connections are busy with other checks; the
+                    # database itself may be fine
+                    return HealthCheckResult(
+                        timestamp=datetime.now(),
+                        service_name=db_config.get('name', 'database'),
+                        check_type='database_connection',
+                        status='warning',
+                        response_time=(time.time() - start_time) * 1000,
+                        message=f"Database connection pool exhausted: {str(e)}",
+                        details={'type': 'postgresql', 'host': db_config['host'],
+                                 'pool_size': db_config.get('pool_size', self.pool_size)}
+                    )
                 
                 return HealthCheckResult(
                     timestamp=datetime.now(),
                     service_name=db_config.get('name', 'database'),
                     check_type='database_connection',
                     status='healthy',
-                    response_time=response_time,
+                    response_time=query_ms,
                     message="Database connection successful",
-                    details={'type': 'postgresql', 'host': db_config['host']}
+                    details={
+                        'type': 'postgresql',
+                        'host': db_config['host'],
+                        'connect_ms': round(connect_ms, 2),
+                        'query_ms': round(query_ms, 2),
+                        'pooled': reused
+                    }
                 )
                 
             elif db_config.get('type') == 'sqlite':
@@ -271,13 +873,13 @@ class HealthChecker:
                         details={'type': 'sqlite', 'path': db_path}
                     )
                 
-                # Test SQLite connection
-                conn = sqlite3.connect(db_path, timeout=self.timeout)
-                cursor = conn.cursor()
-                cursor.execute('SELECT 1')
-                cursor.fetchone()
-                cursor.close()
-                conn.close()
+                # Read the schema over a read-only connection so the check
+                # never takes a write lock n8n might be waiting on
+                conn = self._open_sqlite_readonly(db_config, timeout)
+                try:
+                    conn.execute('SELECT COUNT(*) FROM sqlite_master').fetchone()
+                finally:
+                    conn.close()
                 
                 response_time = (time.time() - start_time) * 1000
                 
@@ -326,6 +928,179 @@ class HealthChecker:
                 details={'error': str(e)}
             )
     
+    def collect_postgres_stats(self, db_config: dict, timeout: float = None) -> List[MetricData]:
+        """
+        Collect server-side PostgreSQL statistics for an n8n database
+        
+        Args:
+            db_config: Database configuration; 'table_prefix' matches n8n's
+                DB_TABLE_PREFIX
+            timeout: Statement timeout in seconds (defaults to checker timeout)
+            
+        Returns:
+            Connection counts by state, execution table sizes and dead tuple
+            ratios, cache hit ratio and database size
+        """
+        timeout = timeout or self.timeout
+        service_name = db_config.get('name', 'database')
+        prefix = db_config.get('table_prefix', '')
+        timestamp = datetime.now()
+        metrics = []
+        
+        rows, _, _, _ = self._postgres_query(db_config, timeout, '''
+            SELECT COALESCE(state, 'unknown'), COUNT(*)
+            FROM pg_stat_activity
+            WHERE datname = current_database() AND backend_type = 'client backend'
+            GROUP BY 1
+        ''')
+        states = dict(rows)
+        total = sum(states.values())
+        metrics.append(MetricData(timestamp, service_name, 'connections_active', states.get('active', 0), ''))
+        metrics.append(MetricData(timestamp, service_name, 'connections_idle', states.get('idle', 0), ''))
+        metrics.append(MetricData(timestamp, service_name, 'connections_idle_in_transaction',
+                                  states.get('idle in transaction', 0), ''))
+        metrics.append(MetricData(timestamp, service_name, 'connections_total', total, ''))
+        
+        rows, _, _, _ = self._postgres_query(db_config, timeout, "SELECT current_setting('max_connections')::int")
+        if rows and rows[0][0]:
+            metrics.append(MetricData(timestamp, service_name, 'connections_used_percent',
+                                      total / rows[0][0] * 100, '%'))
+        
+        tables = tuple(f"{prefix}{table}" for table in ('execution_entity', 'execution_data', 'execution_metadata'))
+        rows, _, _, _ = self._postgres_query(db_config, timeout, '''
+            SELECT relname, pg_total_relation_size(relid), n_live_tup, n_dead_tup
+            FROM pg_stat_user_tables
+            WHERE relname IN %s
+        ''', (tables,))
+        for relname, size, live, dead in rows:
+            table = relname[len(prefix):]
+            metrics.append(MetricData(timestamp, service_name, f'{table}_size', size, 'bytes'))
+            metrics.append(MetricData(timestamp, service_name, f'{table}_live_tuples', live, ''))
+            ratio = dead / (live + dead) if live + dead else 0.0
+            metrics.append(MetricData(timestamp, service_name, f'{table}_dead_tuple_ratio', ratio, ''))
+        
+        rows, _, _, _ = self._postgres_query(db_config, timeout, '''
+            SELECT SUM(blks_hit)::float / NULLIF(SUM(blks_hit) + SUM(blks_read), 0),
+                   pg_database_size(current_database())
+            FROM pg_stat_database
+            WHERE datname = current_database()
+        ''')
+        if rows:
+            hit_ratio, db_size = rows[0]
+            if hit_ratio is not None:
+                metrics.append(MetricData(timestamp, service_name, 'cache_hit_ratio', hit_ratio * 100, '%'))
+            metrics.append(MetricData(timestamp, service_name, 'database_size', db_size, 'bytes'))
+        
+        return metrics
+    
+    @staticmethod
+    def _open_sqlite_readonly(db_config: dict, timeout: float) -> sqlite3.Connection:
+        """Open an SQLite database read-only with a short busy timeout and mmap reads"""
+        uri = f"file:{quote(os.path.abspath(db_config['path']))}?mode=ro"
+        conn = sqlite3.connect(uri, uri=True, timeout=min(timeout, db_config.get('busy_timeout', 1.0)))
+        conn.execute('PRAGMA query_only=1')
+        conn.execute(f"PRAGMA mmap_size={int(db_config.get('mmap_size', 64 * 1024 * 1024))}")
+        return conn
+    
+    def collect_sqlite_stats(self, db_config: dict, timeout: float = None) -> List[MetricData]:
+        """
+        Collect file and execution table statistics for an n8n SQLite database
+        
+        Every query is a rowid or index lookup, so the probe costs the same
+        on a multi-GB file as on an empty one. Row counts are estimated from
+        the rowid range, and ages are sampled at evenly spaced rowids.
+        
+        Args:
+            db_config: Database configuration; 'table_prefix' matches n8n's
+                DB_TABLE_PREFIX and 'prune_max_age_hours' its
+                EXECUTIONS_DATA_MAX_AGE (default 336)
+            timeout: Busy timeout ceiling in seconds (defaults to checker timeout)
+            
+        Returns:
+            File and WAL size, freelist ratio, estimated execution counts,
+            execution age percentiles and executions past the prune age
+        """
+        timeout = timeout or self.timeout
+        service_name = db_config.get('name', 'database')
+        db_path = db_config['path']
+        prefix = db_config.get('table_prefix', '')
+        timestamp = datetime.now()
+        metrics = []
+        
+        metrics.append(MetricData(timestamp, service_name, 'file_size', os.path.getsize(db_path), 'bytes'))
+        wal_path = db_path + '-wal'
+        wal_size = os.path.getsize(wal_path) if os.path.exists(wal_path) else 0
+        metrics.append(MetricData(timestamp, service_name, 'wal_size', wal_size, 'bytes'))
+        
+        conn = self._open_sqlite_readonly(db_config, timeout)
+        try:
+            page_count = conn.execute('PRAGMA page_count').fetchone()[0]
+            freelist = conn.execute('PRAGMA freelist_count').fetchone()[0]
+            metrics.append(MetricData(timestamp, service_name, 'freelist_ratio',
+                                      freelist / page_count if page_count else 0.0, ''))
+            
+            tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+            
+            for table in ('execution_entity', 'execution_data'):
+                if f"{prefix}{table}" not in tables:
+                    continue
+                low, high = self._sqlite_rowid_range(conn, f"{prefix}{table}")
+                estimate = high - low + 1 if high is not None else 0
+                metrics.append(MetricData(timestamp, service_name, f'{table}_rows_estimate', estimate, ''))
+            
+            executions = f"{prefix}execution_entity"
+            if executions in tables:
+                columns = [row[1] for row in conn.execute(f'PRAGMA table_info("{executions}")')]
+                if 'startedAt' in columns:
+                    metrics.extend(self._sqlite_execution_ages(
+                        conn, executions, service_name, timestamp,
+                        db_config.get('prune_max_age_hours', 336)))
+        finally:
+            conn.close()
+        
+        return metrics
+    
+    @staticmethod
+    def _sqlite_rowid_range(conn: sqlite3.Connection, table: str) -> tuple:
+        """(min rowid, max rowid); separate subqueries keep both O(log n) instead of a scan"""
+        return conn.execute(f'SELECT (SELECT MIN(rowid) FROM "{table}"), (SELECT MAX(rowid) FROM "{table}")').fetchone()
+    
+    def _sqlite_execution_ages(self, conn: sqlite3.Connection, table: str, service_name: str,
+                               timestamp: datetime, prune_max_age_hours: float) -> List[MetricData]:
+        """Sample execution ages by rowid, assuming rowids grow with startedAt"""
+        low, high = self._sqlite_rowid_range(conn, table)
+        if high is None:
+            return []
+        
+        now = datetime.now(timezone.utc)
+        
+        def row_at(rowid: int) -> tuple:
+            """First row at or after rowid: (rowid, age in hours)"""
+            row = conn.execute(f'SELECT rowid, startedAt FROM "{table}" WHERE rowid >= ? ORDER BY rowid LIMIT 1',
+                               (rowid,)).fetchone()
+            started = self._parse_n8n_time(str(row[1]).replace(' ', 'T')) if row and row[1] else None
+            return (row[0], (now - started).total_seconds() / 3600 if started else None) if row else (high, None)
+        
+        metrics = []
+        for name, q in (('oldest', 0.0), ('p50', 0.5), ('p90', 0.1), ('newest', 1.0)):
+            # Higher rowids are newer, so the p90 age sits at the 10th rowid percentile
+            _, age = row_at(low + int((high - low) * q))
+            if age is not None:
+                metrics.append(MetricData(timestamp, service_name, f'execution_age_{name}', age, 'h'))
+        
+        # Binary search for the first execution younger than the prune age
+        first, last = low, high + 1
+        while first < last:
+            middle = (first + last) // 2
+            rowid, age = row_at(middle)
+            if age is not None and age > prune_max_age_hours:
+                first = rowid + 1
+            else:
+                last = middle
+        metrics.append(MetricData(timestamp, service_name, 'executions_past_prune_age', first - low, ''))
+        
+        return metrics
+    
     def check_system_resources(self, service_name: str = "system") -> List[HealthCheckResult]:
         """
         Check system resource usage
@@ -338,9 +1113,13 @@ class HealthChecker:
         """
         results = []
         timestamp = datetime.now()
+        sample = self.sampler.latest() if self.sampler else None
         
         # CPU usage
-        cpu_percent = psutil.cpu_percent(interval=1)
+        if sample:
+            cpu_percent = sample['cpu_percent']
+        else:
+            cpu_percent = psutil.cpu_percent(interval=1)
         cpu_status = 'healthy'
         if cpu_percent > 90:
             cpu_status = 'critical'
@@ -358,7 +1137,7 @@ class HealthChecker:
         ))
         
         # Memory usage
-        memory = psutil.virtual_memory()
+        memory = sample['memory'] if sample else psutil.virtual_memory()
         memory_status = 'healthy'
         if memory.percent > 90:
             memory_status = 'critical'
@@ -380,7 +1159,7 @@ class HealthChecker:
         ))
         
         # Disk usage
-        disk = psutil.disk_usage('/')
+        disk = sample['disk'] if sample else psutil.disk_usage('/')
         disk_percent = (disk.used / disk.total) * 100
         disk_status = 'healthy'
         if disk_percent > 90:
@@ -402,6 +1181,26 @@ class HealthChecker:
             }
         ))
         
+        # n8n process saturation
+        process = sample.get('process') if sample else None
+        if process:
+            process_status = 'healthy'
+            if process['cpu_percent'] > 95:
+                process_status = 'critical'
+            elif process['cpu_percent'] > 80:
+                process_status = 'warning'
+            
+            results.append(HealthCheckResult(
+                timestamp=timestamp,
+                service_name=service_name,
+                check_type='n8n_process',
+                status=process_status,
+                response_time=0,
+                message=(f"n8n process CPU: {process['cpu_percent']:.1f}% of one core, "
+                         f"RSS: {process['rss'] / 1024 / 1024:.0f} MB"),
+                details=process
+            ))
+        
         return results
     
     def _extract_service_name(self, url: str) -> str:
@@ -420,147 +1219,915 @@ class HealthChecker:
 class MetricsCollector:
     """Collects and stores performance metrics"""
     
-    def __init__(self, db_path: str = "/tmp/n8n_metrics.db"):
+    # Rollup tiers, finest first: name -> bucket width in seconds
+    ROLLUP_TIERS = {'1m': 60, '1h': 3600, '1d': 86400}
+    
+    # Default retention per rollup tier, in days
+    ROLLUP_RETENTION_DAYS = {'1m': 7, '1h': 90, '1d': 730}
+    
+    # Minimum buckets per series a tier must yield to be chosen automatically
+    MIN_ROLLUP_POINTS = 24
+    
+    # PRAGMA user_version of the current schema. Version 3 partitions raw
+    # rows by day and version 2 stores UTC epoch seconds; earlier databases
+    # hold local-time ISO strings. Older databases are migrated in place.
+    SCHEMA_VERSION = 3
+    
+    # Raw tables stored as one partition per UTC day: columns and indexes
+    PARTITIONED_TABLES = {
+        'metrics': {
+            'columns': '''
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                timestamp INTEGER NOT NULL,
+                service_name TEXT NOT NULL,
+                metric_name TEXT NOT NULL,
+                value REAL NOT NULL,
+                unit TEXT
+            ''',
+            'indexes': {
+                'timestamp': 'timestamp',
+                # Covers get_metrics queries so they never touch the table
+                'series': 'service_name, metric_name, timestamp, value, unit',
+            },
+        },
+        'health_checks': {
+            'columns': '''
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                timestamp INTEGER NOT NULL,
+                service_name TEXT NOT NULL,
+                check_type TEXT NOT NULL,
+                status TEXT NOT NULL,
+                response_time REAL,
+                message TEXT,
+                details TEXT,
+                details_hash TEXT
+            ''',
+            'indexes': {
+                'timestamp': 'timestamp',
+                'check': 'service_name, check_type',
+                # Finds details still referenced when a partition is dropped
+                'details': 'details_hash',
+            },
+        },
+    }
+    
+    # Exported columns per table, and file suffix per export format
+    EXPORT_COLUMNS = {
+        'metrics': ('timestamp', 'service_name', 'metric_name', 'value', 'unit'),
+        'health_checks': ('timestamp', 'service_name', 'check_type', 'status', 'response_time',
+                          'message', 'details'),
+    }
+    EXPORT_FORMATS = {'ndjson': '.ndjson.gz', 'parquet': '.parquet', 'arrow': '.arrow'}
+    
+    # Rows deleted and pages vacuumed per transaction during cleanup, so
+    # check storage is never blocked for long
+    CLEANUP_BATCH_ROWS = 10000
+    VACUUM_BATCH_PAGES = 2048
+    
+    # Per-bucket aggregates get_metrics can compute, over raw rows and over
+    # rollup rows respectively
+    AGGREGATES = {
+        'avg': ('AVG(value)', 'SUM(sum_value) / SUM(count)'),
+        'min': ('MIN(value)', 'MIN(min_value)'),
+        'max': ('MAX(value)', 'MAX(max_value)'),
+        'count': ('COUNT(*)', 'SUM(count)'),
+        'sum': ('SUM(value)', 'SUM(sum_value)'),
+    }
+    
+    def __init__(self, db_path: str = "/tmp/n8n_metrics.db", batch_size: int = 500,
+                 flush_interval: float = 5.0, rollup_retention: dict = None,
+                 sketch_persist_interval: float = 60.0, compact_health_checks: bool = True,
+                 store_headers: bool = False, raw_retention_days: int = 30):
         """
         Initialize metrics collector
         
+        Rows are buffered in memory and written in batches over a single
+        long-lived WAL connection, so a cycle costs one commit instead of
+        one per row. 1-minute, 1-hour and 1-day rollups are updated
+        incrementally with each batch, and hourly latency sketches per
+        service and check type are persisted periodically.
+        
+        Timestamps are stored as UTC epoch seconds and rollup buckets are
+        aligned to the epoch, so ranges stay correct across DST changes.
+        Datetimes passed in and returned are naive local time, as before.
+        
+        Raw metrics and health checks go to one table per UTC day of
+        writing, and reads span the partitions overlapping their window,
+        so retention drops whole days instead of deleting rows.
+        
+        In compact mode health check details are stored once per distinct
+        payload in health_check_details and referenced by hash, and rows
+        that repeat the previous message for their check in the same
+        partition leave it out.
+        
         Args:
             db_path: Path to SQLite database for storing metrics
+            batch_size: Number of buffered rows that triggers a flush
+            flush_interval: Seconds since the last flush that trigger a flush
+            rollup_retention: Retention in days per rollup tier
+            sketch_persist_interval: Seconds between latency sketch writes
+            compact_health_checks: Deduplicate health check messages and details
+            store_headers: Keep HTTP response headers in health check details
+            raw_retention_days: Default retention of raw metrics and health
+                checks, in days
         """
         self.db_path = db_path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.rollup_retention = {**self.ROLLUP_RETENTION_DAYS, **(rollup_retention or {})}
+        self.raw_retention_days = raw_retention_days
         self.logger = logging.getLogger(__name__)
+        
+        self._lock = threading.RLock()
+        self._conn = None
+        self._metric_buffer = []
+        self._rollup_buffer = {}
+        self._health_check_buffer = []
+        self._last_flush = time.time()
+        
+        self.sketch_persist_interval = sketch_persist_interval
+        self._sketches = {}  # (bucket, service_name, check_type) -> LatencySketch
+        self._last_sketch_persist = time.time()
+        
+        self.compact_health_checks = compact_health_checks
+        self.store_headers = store_headers
+        self._last_health = {}  # (service_name, check_type) -> (status, message) last written
+        self._health_day = None  # partition day _last_health refers to
+        self._details_buffer = {}  # details hash -> JSON, for the next flush
+        
+        self._partition_names = set()  # partitions known to exist
+        
         self._init_database()
     
+    def _get_connection(self) -> sqlite3.Connection:
+        """Get the shared database connection, opening it on first use"""
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            # Must precede table creation to take effect on a new database
+            self._conn.execute('PRAGMA auto_vacuum=INCREMENTAL')
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute('PRAGMA synchronous=NORMAL')
+        return self._conn
+    
     def _init_database(self):
-        """Initialize the metrics database"""
+        """Initialize the metrics database, migrating older schemas in place"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
+            with self._lock:
+                conn = self._get_connection()
+                cursor = conn.cursor()
+                
+                # One transaction, so a failed migration leaves the old schema intact
+                cursor.execute('BEGIN IMMEDIATE')
+                
+                version = cursor.execute('PRAGMA user_version').fetchone()[0]
+                legacy = self._rename_legacy_tables(cursor) if version < 2 else set()
+                
+                # Raw rows live in one table per day, listed here with the
+                # time range they hold
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS partitions (
+                        name TEXT PRIMARY KEY,
+                        base TEXT NOT NULL,
+                        day INTEGER NOT NULL,
+                        min_timestamp INTEGER,
+                        max_timestamp INTEGER
+                    )
+                ''')
+                
+                # Compact rows reference their details by hash
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS health_check_details (
+                        hash TEXT PRIMARY KEY,
+                        details TEXT NOT NULL
+                    )
+                ''')
+                
+                if 'metrics_legacy' in legacy:
+                    self._migrate_legacy_rows(cursor, legacy)
+                
+                # Version 2 kept raw rows in single tables; split them by day
+                if version < 3:
+                    for base in self.PARTITIONED_TABLES:
+                        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (base,))
+                        if cursor.fetchone():
+                            self._split_into_partitions(cursor, base)
+                
+                # Create rollup tables, backfilling them from raw metrics
+                # when they are added to an existing database
+                for tier, width in self.ROLLUP_TIERS.items():
+                    table = f"metrics_{tier}"
+                    cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table,))
+                    exists = cursor.fetchone() is not None
+                    
+                    # Clustered on the primary key, which every query filters on
+                    cursor.execute(f'''
+                        CREATE TABLE IF NOT EXISTS {table} (
+                            bucket INTEGER NOT NULL,
+                            service_name TEXT NOT NULL,
+                            metric_name TEXT NOT NULL,
+                            unit TEXT,
+                            count INTEGER NOT NULL,
+                            min_value REAL NOT NULL,
+                            max_value REAL NOT NULL,
+                            sum_value REAL NOT NULL,
+                            PRIMARY KEY (service_name, metric_name, bucket)
+                        ) WITHOUT ROWID
+                    ''')
+                    cursor.execute(f'CREATE INDEX IF NOT EXISTS idx_{table}_bucket ON {table}(bucket)')
+                    
+                    source = self._partitioned_sql(cursor, 'metrics')
+                    if f"{table}_legacy" in legacy:
+                        # Keep history beyond raw retention; each local-time bucket
+                        # moves to the epoch bucket holding its midpoint
+                        cursor.execute(f'''
+                            INSERT INTO {table} (bucket, service_name, metric_name, unit, count, min_value, max_value, sum_value)
+                            SELECT {self._bucket_sql('midpoint', width)} AS aligned, service_name, metric_name, MAX(unit),
+                                   SUM(count), MIN(min_value), MAX(max_value), SUM(sum_value)
+                            FROM (SELECT {self._legacy_epoch_sql('bucket')} + {width // 2} AS midpoint, *
+                                  FROM {table}_legacy)
+                            WHERE midpoint IS NOT NULL
+                            GROUP BY service_name, metric_name, aligned
+                        ''')
+                    elif not exists and source:
+                        cursor.execute(f'''
+                            INSERT INTO {table} (bucket, service_name, metric_name, unit, count, min_value, max_value, sum_value)
+                            SELECT {self._bucket_sql('timestamp', width)} AS bucket, service_name, metric_name, MAX(unit),
+                                   COUNT(*), MIN(value), MAX(value), SUM(value)
+                            FROM {source}
+                            GROUP BY service_name, metric_name, bucket
+                        ''')
+                
+                # Hourly latency sketches per service and check type
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS latency_sketches (
+                        bucket INTEGER NOT NULL,
+                        service_name TEXT NOT NULL,
+                        check_type TEXT NOT NULL,
+                        sketch TEXT NOT NULL,
+                        PRIMARY KEY (service_name, check_type, bucket)
+                    )
+                ''')
+                cursor.execute('CREATE INDEX IF NOT EXISTS idx_latency_sketches_bucket ON latency_sketches(bucket)')
+                
+                if 'latency_sketches_legacy' in legacy:
+                    self._migrate_legacy_sketches(cursor)
+                
+                for table in legacy:
+                    cursor.execute(f'DROP TABLE {table}')
+                cursor.execute(f'PRAGMA user_version = {self.SCHEMA_VERSION}')
+                
+                conn.commit()
+                
+                # Databases created before incremental vacuum need one full
+                # VACUUM to switch over
+                if conn.execute('PRAGMA auto_vacuum').fetchone()[0] != 2:
+                    conn.execute('PRAGMA auto_vacuum=INCREMENTAL')
+                    conn.execute('VACUUM')
             
-            # Create metrics table
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS metrics (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    timestamp TEXT NOT NULL,
-                    service_name TEXT NOT NULL,
-                    metric_name TEXT NOT NULL,
-                    value REAL NOT NULL,
-                    unit TEXT
-                )
-            ''')
-            
-            # Create health_checks table
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS health_checks (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    timestamp TEXT NOT NULL,
-                    service_name TEXT NOT NULL,
-                    check_type TEXT NOT NULL,
-                    status TEXT NOT NULL,
-                    response_time REAL,
-                    message TEXT,
-                    details TEXT
-                )
-            ''')
-            
-            # Create indexes
-            cursor.execute('CREATE INDEX IF NOT EXISTS idx_metrics_timestamp ON metrics(timestamp)')
-            cursor.execute('CREATE INDEX IF NOT EXISTS idx_health_checks_timestamp ON health_checks(timestamp)')
-            
-            conn.commit()
-            conn.close()
+            if legacy or 0 < version < self.SCHEMA_VERSION:
+                self.logger.info(f"Migrated {self.db_path} to schema version {self.SCHEMA_VERSION}")
             
         except Exception as e:
+            if self._conn is not None and self._conn.in_transaction:
+                self._conn.rollback()
             self.logger.error(f"Failed to initialize database: {e}")
     
-    def store_metric(self, metric: MetricData):
-        """Store a metric data point"""
-        try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
+    def _create_partition_table(self, cursor: sqlite3.Cursor, base: str, name: str):
+        """Create a table with the columns and indexes of a partitioned table"""
+        cursor.execute(f"CREATE TABLE IF NOT EXISTS {name} ({self.PARTITIONED_TABLES[base]['columns']})")
+        for suffix, columns in self.PARTITIONED_TABLES[base]['indexes'].items():
+            cursor.execute(f"CREATE INDEX IF NOT EXISTS idx_{name}_{suffix} ON {name}({columns})")
+    
+    def _partition(self, cursor: sqlite3.Cursor, base: str, day: int) -> str:
+        """
+        Name of the partition of base for a UTC day, created on first use
+        
+        Must run inside a write transaction. New health check partitions
+        continue the id sequence of the newest one, so ids stay ordered
+        across partitions.
+        """
+        name = f"{base}_p{datetime.fromtimestamp(day * 86400, timezone.utc):%Y%m%d}"
+        if name in self._partition_names:
+            return name
+        
+        cursor.execute("SELECT 1 FROM partitions WHERE name = ?", (name,))
+        if cursor.fetchone() is None:
+            self._create_partition_table(cursor, base, name)
             cursor.execute('''
-                INSERT INTO metrics (timestamp, service_name, metric_name, value, unit)
-                VALUES (?, ?, ?, ?, ?)
-            ''', (
-                metric.timestamp.isoformat(),
+                INSERT INTO sqlite_sequence (name, seq)
+                SELECT ?, MAX(seq) FROM sqlite_sequence
+                WHERE name IN (SELECT name FROM partitions WHERE base = ?)
+                HAVING MAX(seq) IS NOT NULL
+            ''', (name, base))
+            cursor.execute("INSERT INTO partitions (name, base, day) VALUES (?, ?, ?)", (name, base, day))
+        
+        self._partition_names.add(name)
+        return name
+    
+    def _partitions(self, cursor: sqlite3.Cursor, base: str, since: int = None, until: int = None) -> List[str]:
+        """Partitions of base holding rows in [since, until), oldest first"""
+        query = "SELECT name FROM partitions WHERE base = ? AND min_timestamp IS NOT NULL"
+        params = [base]
+        if since is not None:
+            query += " AND max_timestamp >= ?"
+            params.append(since)
+        if until is not None:
+            query += " AND min_timestamp < ?"
+            params.append(until)
+        return [row[0] for row in cursor.execute(query + " ORDER BY day", params)]
+    
+    def _partitioned_sql(self, cursor: sqlite3.Cursor, base: str, since: int = None,
+                         until: int = None) -> Optional[str]:
+        """FROM clause source spanning the partitions of base, or None if none hold rows"""
+        tables = self._partitions(cursor, base, since, until)
+        if not tables:
+            return None
+        if len(tables) == 1:
+            return tables[0]
+        return "(" + " UNION ALL ".join(f"SELECT * FROM {table}" for table in tables) + ")"
+    
+    def _split_into_partitions(self, cursor: sqlite3.Cursor, base: str):
+        """Move the rows of an unpartitioned table into day partitions and drop it"""
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS idx_{base}_split ON {base}(timestamp)")
+        
+        if base == 'health_checks':
+            # Partitions are dropped independently, so the first row of each
+            # check in a day must carry its own message
+            cursor.execute('''
+                UPDATE health_checks SET message = (
+                    SELECT p.message FROM health_checks p
+                    WHERE p.service_name = health_checks.service_name
+                      AND p.check_type = health_checks.check_type
+                      AND p.id < health_checks.id AND p.message IS NOT NULL
+                    ORDER BY p.id DESC LIMIT 1
+                )
+                WHERE message IS NULL AND id IN (
+                    SELECT MIN(id) FROM health_checks GROUP BY service_name, check_type, timestamp / 86400
+                )
+            ''')
+        
+        columns = ', '.join(row[1] for row in cursor.execute(f"PRAGMA table_info({base})"))
+        first = cursor.execute(f"SELECT MIN(timestamp) FROM {base}").fetchone()[0]
+        while first is not None:
+            day = first // 86400
+            start, end = day * 86400, (day + 1) * 86400
+            name = self._partition(cursor, base, day)
+            cursor.execute(f'''
+                INSERT INTO {name} ({columns})
+                SELECT {columns} FROM {base} WHERE timestamp >= ? AND timestamp < ?
+            ''', (start, end))
+            cursor.execute(f'''
+                UPDATE partitions SET min_timestamp = (SELECT MIN(timestamp) FROM {name}),
+                                      max_timestamp = (SELECT MAX(timestamp) FROM {name})
+                WHERE name = ?
+            ''', (name,))
+            first = cursor.execute(f"SELECT MIN(timestamp) FROM {base} WHERE timestamp >= ?", (end,)).fetchone()[0]
+        
+        cursor.execute(f"DROP TABLE {base}")
+    
+    def _rename_legacy_tables(self, cursor: sqlite3.Cursor) -> set:
+        """Move pre-epoch tables aside so the current schema can be created next to them"""
+        tables = ['metrics', 'health_checks', 'latency_sketches'] + [f"metrics_{tier}" for tier in self.ROLLUP_TIERS]
+        existing = {row[0] for row in cursor.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        
+        legacy = set()
+        for table in tables:
+            if table not in existing:
+                continue
+            # Indexes follow a renamed table; drop them so their names are free
+            indexes = cursor.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = ? AND sql IS NOT NULL",
+                (table,)
+            ).fetchall()
+            for (index,) in indexes:
+                cursor.execute(f'DROP INDEX {index}')
+            cursor.execute(f'ALTER TABLE {table} RENAME TO {table}_legacy')
+            legacy.add(f"{table}_legacy")
+        
+        return legacy
+    
+    def _migrate_legacy_rows(self, cursor: sqlite3.Cursor, legacy: set):
+        """Copy raw metrics and health checks to unpartitioned tables, converting their timestamps"""
+        epoch = self._legacy_epoch_sql('timestamp')
+        self._create_partition_table(cursor, 'metrics', 'metrics')
+        cursor.execute(f'''
+            INSERT INTO metrics (id, timestamp, service_name, metric_name, value, unit)
+            SELECT id, {epoch}, service_name, metric_name, value, unit
+            FROM metrics_legacy WHERE {epoch} IS NOT NULL
+        ''')
+        
+        if 'health_checks_legacy' in legacy:
+            columns = [column[1] for column in cursor.execute("PRAGMA table_info(health_checks_legacy)")]
+            details_hash = 'details_hash' if 'details_hash' in columns else 'NULL'
+            self._create_partition_table(cursor, 'health_checks', 'health_checks')
+            cursor.execute(f'''
+                INSERT INTO health_checks (id, timestamp, service_name, check_type, status, response_time,
+                                           message, details, details_hash)
+                SELECT id, {epoch}, service_name, check_type, status, response_time, message, details, {details_hash}
+                FROM health_checks_legacy WHERE {epoch} IS NOT NULL
+            ''')
+    
+    def _migrate_legacy_sketches(self, cursor: sqlite3.Cursor):
+        """Copy latency sketches, merging any that land in the same epoch hour"""
+        sketches = {}
+        rows = cursor.execute(f'''
+            SELECT {self._legacy_epoch_sql('bucket')}, service_name, check_type, sketch
+            FROM latency_sketches_legacy
+        ''').fetchall()
+        for epoch, service_name, check_type, sketch_json in rows:
+            if epoch is None:
+                continue
+            key = (self._bucket_start(epoch + 1800, 3600), service_name, check_type)
+            sketch = LatencySketch.from_dict(json.loads(sketch_json))
+            if key in sketches:
+                sketches[key].merge(sketch)
+            else:
+                sketches[key] = sketch
+        
+        cursor.executemany(
+            "INSERT INTO latency_sketches (bucket, service_name, check_type, sketch) VALUES (?, ?, ?, ?)",
+            [(*key, json.dumps(sketch.to_dict())) for key, sketch in sketches.items()]
+        )
+    
+    @staticmethod
+    def _legacy_epoch_sql(column: str) -> str:
+        """SQL expression converting a pre-epoch ISO timestamp to UTC epoch seconds
+        
+        Legacy values are naive local time unless they carry an offset;
+        unparseable values give NULL.
+        """
+        return (f"CAST(CASE WHEN substr({column}, 20) GLOB '*[+Z-]*' THEN strftime('%s', {column}) "
+                f"ELSE strftime('%s', {column}, 'utc') END AS INTEGER)")
+    
+    @staticmethod
+    def _bucket_sql(column: str, width: int) -> str:
+        """SQL expression truncating an epoch column to buckets of width seconds"""
+        return f"({column} - {column} % {int(width)})"
+    
+    @staticmethod
+    def _epoch(timestamp: datetime) -> int:
+        """UTC epoch seconds of a naive local or aware datetime"""
+        return int(timestamp.timestamp())
+    
+    @staticmethod
+    def _bucket_start(epoch: int, width: int) -> int:
+        """Truncate epoch seconds to the start of their bucket"""
+        return epoch - epoch % width
+    
+    @staticmethod
+    def _partition_day() -> int:
+        """UTC day, since the epoch, whose partitions take rows written now"""
+        return int(time.time()) // 86400
+    
+    def store_metric(self, metric: MetricData):
+        """Buffer a metric data point and fold it into the pending rollups"""
+        with self._lock:
+            epoch = self._epoch(metric.timestamp)
+            self._metric_buffer.append((
+                self._partition_day(),
+                epoch,
                 metric.service_name,
                 metric.metric_name,
                 metric.value,
                 metric.unit
             ))
             
-            conn.commit()
-            conn.close()
+            for tier, width in self.ROLLUP_TIERS.items():
+                key = (tier, self._bucket_start(epoch, width), metric.service_name, metric.metric_name)
+                rollup = self._rollup_buffer.get(key)
+                if rollup is None:
+                    self._rollup_buffer[key] = [metric.unit, 1, metric.value, metric.value, metric.value]
+                else:
+                    rollup[1] += 1
+                    rollup[2] = min(rollup[2], metric.value)
+                    rollup[3] = max(rollup[3], metric.value)
+                    rollup[4] += metric.value
             
-        except Exception as e:
-            self.logger.error(f"Failed to store metric: {e}")
+            self._maybe_flush()
     
     def store_health_check(self, result: HealthCheckResult):
-        """Store a health check result"""
-        try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
+        """Buffer a health check result for the next flush"""
+        with self._lock:
+            details = result.details
+            if details and not self.store_headers and 'headers' in details:
+                details = {key: value for key, value in details.items() if key != 'headers'}
             
-            details_json = json.dumps(result.details) if result.details else None
+            if self.compact_health_checks:
+                details_json = json.dumps(details or {}, sort_keys=True, default=str)
+                details_hash = hashlib.blake2b(details_json.encode(), digest_size=8).hexdigest()
+                self._details_buffer[details_hash] = details_json
+                
+                # A NULL message repeats the previous row's for the same check;
+                # status changes and each partition's first row always carry
+                # their message
+                day = self._partition_day()
+                if day != self._health_day:
+                    self._last_health.clear()
+                    self._health_day = day
+                key = (result.service_name, result.check_type)
+                message = result.message
+                if self._last_health.get(key) == (result.status, message):
+                    message = None
+                else:
+                    self._last_health[key] = (result.status, result.message)
+                
+                row_details = None
+            else:
+                details_hash = None
+                message = result.message
+                row_details = json.dumps(details) if details else None
             
-            cursor.execute('''
-                INSERT INTO health_checks (timestamp, service_name, check_type, status, response_time, message, details)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                result.timestamp.isoformat(),
+            epoch = self._epoch(result.timestamp)
+            self._health_check_buffer.append((
+                self._health_day if self.compact_health_checks else self._partition_day(),
+                epoch,
                 result.service_name,
                 result.check_type,
                 result.status,
                 result.response_time,
-                result.message,
-                details_json
+                message,
+                row_details,
+                details_hash
             ))
             
-            conn.commit()
-            conn.close()
+            # Checks that never got a response carry no latency information
+            if result.response_time and result.response_time > 0:
+                key = (self._bucket_start(epoch, 3600), result.service_name, result.check_type)
+                sketch = self._sketches.get(key)
+                if sketch is None:
+                    sketch = self._sketches[key] = LatencySketch()
+                sketch.add(result.response_time)
             
-        except Exception as e:
-            self.logger.error(f"Failed to store health check: {e}")
+            self._maybe_flush()
     
-    def get_metrics(self, service_name: str = None, metric_name: str = None, 
-                   since: datetime = None, limit: int = 1000) -> List[MetricData]:
-        """Get stored metrics"""
+    def _maybe_flush(self):
+        """Flush if the buffer size or age threshold has been reached"""
+        pending = len(self._metric_buffer) + len(self._health_check_buffer)
+        if pending >= self.batch_size or time.time() - self._last_flush >= self.flush_interval:
+            self.flush()
+    
+    def flush(self):
+        """Write all buffered rows in a single transaction"""
+        with self._lock:
+            self._last_flush = time.time()
+            if time.time() - self._last_sketch_persist >= self.sketch_persist_interval:
+                self.persist_sketches()
+            
+            if not self._metric_buffer and not self._health_check_buffer:
+                return
+            
+            metric_rows, self._metric_buffer = self._metric_buffer, []
+            rollups, self._rollup_buffer = self._rollup_buffer, {}
+            health_check_rows, self._health_check_buffer = self._health_check_buffer, []
+            details_rows, self._details_buffer = self._details_buffer, {}
+            
+            try:
+                conn = self._get_connection()
+                with conn:
+                    # Partitions may be created on the way; keep that atomic
+                    conn.execute('BEGIN IMMEDIATE')
+                    
+                    if metric_rows:
+                        self._insert_partitioned(conn, 'metrics', (
+                            'timestamp', 'service_name', 'metric_name', 'value', 'unit'
+                        ), metric_rows)
+                    
+                    for tier in self.ROLLUP_TIERS:
+                        rows = [(bucket, service, metric, *values)
+                                for (row_tier, bucket, service, metric), values in rollups.items()
+                                if row_tier == tier]
+                        if rows:
+                            conn.executemany(f'''
+                                INSERT INTO metrics_{tier} (bucket, service_name, metric_name, unit, count, min_value, max_value, sum_value)
+                                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                                ON CONFLICT (service_name, metric_name, bucket) DO UPDATE SET
+                                    unit = excluded.unit,
+                                    count = count + excluded.count,
+                                    min_value = MIN(min_value, excluded.min_value),
+                                    max_value = MAX(max_value, excluded.max_value),
+                                    sum_value = sum_value + excluded.sum_value
+                            ''', rows)
+                    
+                    if details_rows:
+                        conn.executemany('''
+                            INSERT OR IGNORE INTO health_check_details (hash, details) VALUES (?, ?)
+                        ''', details_rows.items())
+                    
+                    if health_check_rows:
+                        self._insert_partitioned(conn, 'health_checks', (
+                            'timestamp', 'service_name', 'check_type', 'status', 'response_time',
+                            'message', 'details', 'details_hash'
+                        ), health_check_rows)
+                
+            except Exception as e:
+                # Rows that relied on a lost predecessor must be written in full
+                # next time, and partitions created in the lost batch are gone
+                self._last_health.clear()
+                self._partition_names.clear()
+                self.logger.error(f"Failed to flush {len(metric_rows)} metrics and "
+                                  f"{len(health_check_rows)} health checks: {e}")
+    
+    def _insert_partitioned(self, conn: sqlite3.Connection, base: str, columns: tuple, rows: List[tuple]):
+        """Insert (day, timestamp, ...) rows into their day partitions and widen their time ranges"""
+        by_day = {}
+        for day, *row in rows:
+            by_day.setdefault(day, []).append(row)
+        
+        cursor = conn.cursor()
+        for day, day_rows in by_day.items():
+            name = self._partition(cursor, base, day)
+            cursor.executemany(
+                f"INSERT INTO {name} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})",
+                day_rows
+            )
+            timestamps = [row[0] for row in day_rows]
+            cursor.execute('''
+                UPDATE partitions SET min_timestamp = COALESCE(MIN(min_timestamp, ?), ?),
+                                      max_timestamp = COALESCE(MAX(max_timestamp, ?), ?)
+                WHERE name = ?
+            ''', (min(timestamps), min(timestamps), max(timestamps), max(timestamps), name))
+    
+    def persist_sketches(self):
+        """Merge in-memory latency sketches into their stored hourly rows"""
+        with self._lock:
+            self._last_sketch_persist = time.time()
+            if not self._sketches:
+                return
+            
+            sketches, self._sketches = self._sketches, {}
+            
+            try:
+                conn = self._get_connection()
+                with conn:
+                    rows = []
+                    for (bucket, service_name, check_type), sketch in sketches.items():
+                        stored = conn.execute(
+                            "SELECT sketch FROM latency_sketches WHERE service_name = ? AND check_type = ? AND bucket = ?",
+                            (service_name, check_type, bucket)
+                        ).fetchone()
+                        if stored:
+                            sketch.merge(LatencySketch.from_dict(json.loads(stored[0])))
+                        rows.append((bucket, service_name, check_type, json.dumps(sketch.to_dict())))
+                    
+                    conn.executemany(
+                        "INSERT OR REPLACE INTO latency_sketches (bucket, service_name, check_type, sketch) VALUES (?, ?, ?, ?)",
+                        rows
+                    )
+                
+            except Exception as e:
+                self.logger.error(f"Failed to persist {len(sketches)} latency sketches: {e}")
+    
+    def get_latency_percentiles(self, service_name: str = None, check_type: str = None,
+                                since: datetime = None,
+                                quantiles: tuple = (0.5, 0.95, 0.99)) -> List[dict]:
+        """
+        Get latency percentiles by merging hourly sketches
+        
+        The window starts at the beginning of the hour containing since.
+        
+        Args:
+            service_name: Filter by service name
+            check_type: Filter by check type
+            since: Start of the window
+            quantiles: Quantiles to report
+            
+        Returns:
+            One dict per service and check type with count, max and a
+            'p<N>' key per quantile, in milliseconds
+        """
+        query = "SELECT bucket, service_name, check_type, sketch FROM latency_sketches WHERE 1=1"
+        params = []
+        
+        if service_name:
+            query += " AND service_name = ?"
+            params.append(service_name)
+        
+        if check_type:
+            query += " AND check_type = ?"
+            params.append(check_type)
+        
+        bucket_since = self._bucket_start(self._epoch(since), 3600) if since else None
+        if bucket_since is not None:
+            query += " AND bucket >= ?"
+            params.append(bucket_since)
+        
+        merged = {}
+        
+        def fold(key: tuple, sketch: LatencySketch):
+            if key not in merged:
+                merged[key] = LatencySketch(sketch.relative_accuracy)
+            merged[key].merge(sketch)
+        
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
+            with self._lock:
+                rows = self._get_connection().execute(query, params).fetchall()
+                pending = list(self._sketches.items())
             
-            query = "SELECT timestamp, service_name, metric_name, value, unit FROM metrics WHERE 1=1"
-            params = []
+            for bucket, row_service, row_check, sketch_json in rows:
+                fold((row_service, row_check), LatencySketch.from_dict(json.loads(sketch_json)))
             
-            if service_name:
-                query += " AND service_name = ?"
-                params.append(service_name)
+            for (bucket, row_service, row_check), sketch in pending:
+                if ((service_name and row_service != service_name)
+                        or (check_type and row_check != check_type)
+                        or (bucket_since is not None and bucket < bucket_since)):
+                    continue
+                fold((row_service, row_check), sketch)
             
-            if metric_name:
-                query += " AND metric_name = ?"
-                params.append(metric_name)
+        except Exception as e:
+            self.logger.error(f"Failed to get latency percentiles: {e}")
+            return []
+        
+        results = []
+        for (row_service, row_check), sketch in sorted(merged.items()):
+            entry = {
+                'service_name': row_service,
+                'check_type': row_check,
+                'count': sketch.count,
+                'max': sketch.max,
+            }
+            for q in quantiles:
+                entry[f"p{q * 100:g}"] = sketch.quantile(q)
+            results.append(entry)
+        
+        return results
+    
+    def close(self):
+        """Flush pending rows and sketches and close the database connection"""
+        with self._lock:
+            self.flush()
+            self.persist_sketches()
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+    
+    def select_resolution(self, since: datetime = None, bucket: int = None,
+                          until: datetime = None) -> str:
+        """
+        Pick the coarsest rollup tier suitable for a query window
+        
+        A tier qualifies when its retention still reaches back to since and
+        it yields at least MIN_ROLLUP_POINTS buckets per series over the
+        window or, for aggregated queries, its bucket width divides the
+        requested one. Short windows whose start is past raw retention get
+        the finest tier that still holds them.
+        
+        Args:
+            since: Start of the query window
+            bucket: Aggregation bucket width in seconds, if any
+            until: End of the query window (defaults to now)
             
-            if since:
-                query += " AND timestamp >= ?"
-                params.append(since.isoformat())
+        Returns:
+            Rollup tier name, or 'raw' for short or unbounded windows
+        """
+        if since is None:
+            return 'raw'
+        
+        now = datetime.now()
+        span = ((until or now) - since).total_seconds()
+        age = (now - since).total_seconds()
+        
+        def retained(tier: str) -> bool:
+            return age <= self.rollup_retention[tier] * 86400
+        
+        def divides(width: int) -> bool:
+            return not bucket or bucket % width == 0
+        
+        for tier, width in reversed(self.ROLLUP_TIERS.items()):
+            fits = divides(width) if bucket else width * self.MIN_ROLLUP_POINTS <= span
+            if fits and retained(tier):
+                return tier
+        
+        if age <= self.raw_retention_days * 86400:
+            return 'raw'
+        
+        # Raw data for the window is gone; use the finest tier that still has it
+        for tier, width in self.ROLLUP_TIERS.items():
+            if divides(width) and retained(tier):
+                return tier
+        
+        return 'raw'
+    
+    def get_metrics(self, service_name: str = None, metric_name: str = None, 
+                   since: datetime = None, limit: int = 1000,
+                   resolution: str = 'auto', until: datetime = None,
+                   bucket: int = None, aggregate: str = 'avg') -> List[MetricData]:
+        """
+        Get stored metrics
+        
+        Args:
+            service_name: Filter by service name
+            metric_name: Filter by metric name
+            since: Only return data at or after this time
+            limit: Maximum number of rows to return
+            resolution: 'raw', a rollup tier ('1m', '1h', '1d') or 'auto'
+                to pick the coarsest tier that fits the window
+            until: Only return data before this time
+            bucket: Aggregate in SQL into buckets of this many seconds,
+                aligned to the UTC epoch
+            aggregate: Value reported per bucket: 'avg', 'min', 'max',
+                'count' or 'sum'
             
-            query += " ORDER BY timestamp DESC LIMIT ?"
-            params.append(limit)
+        Returns:
+            Metric data points, newest first. Rollup tiers and bucketed
+            queries return MetricRollup entries; value is the bucket
+            average, or the requested aggregate when bucket is given.
+        """
+        if resolution == 'auto':
+            resolution = self.select_resolution(since, bucket, until)
+        
+        if resolution != 'raw' and resolution not in self.ROLLUP_TIERS:
+            raise ValueError(f"Unknown metrics resolution: {resolution}")
+        
+        if aggregate not in self.AGGREGATES:
+            raise ValueError(f"Unknown metrics aggregate: {aggregate}")
+        
+        width = self.ROLLUP_TIERS.get(resolution, 1)
+        if bucket is not None and (bucket <= 0 or bucket % width):
+            raise ValueError(f"Bucket of {bucket}s is not a multiple of the {resolution} resolution")
+        
+        # Include the partial bucket the window starts in
+        since_epoch = self._bucket_start(self._epoch(since), bucket or width) if since else None
+        until_epoch = self._epoch(until) if until else None
+        
+        try:
+            with self._lock:
+                self.flush()
+                conn = self._get_connection()
+                
+                if resolution == 'raw':
+                    table = self._partitioned_sql(conn.cursor(), 'metrics', since_epoch, until_epoch)
+                    if table is None:
+                        return []
+                    time_column = "timestamp"
+                    columns = "COUNT(*), MIN(value), MAX(value), SUM(value)"
+                else:
+                    table, time_column = f"metrics_{resolution}", "bucket"
+                    columns = "SUM(count), MIN(min_value), MAX(max_value), SUM(sum_value)"
+                
+                if bucket:
+                    value = self.AGGREGATES[aggregate][resolution != 'raw']
+                    query = (f"SELECT {self._bucket_sql(time_column, bucket)} AS period, service_name, metric_name, "
+                             f"{value}, MAX(unit), {columns} FROM {table} WHERE 1=1")
+                elif resolution == 'raw':
+                    query = f"SELECT timestamp, service_name, metric_name, value, unit FROM {table} WHERE 1=1"
+                else:
+                    query = (f"SELECT bucket, service_name, metric_name, sum_value / count, unit, "
+                             f"count, min_value, max_value, sum_value FROM {table} WHERE 1=1")
+                params = []
+                
+                if service_name:
+                    query += " AND service_name = ?"
+                    params.append(service_name)
+                
+                if metric_name:
+                    query += " AND metric_name = ?"
+                    params.append(metric_name)
+                
+                if since_epoch is not None:
+                    query += f" AND {time_column} >= ?"
+                    params.append(since_epoch)
+                
+                if until_epoch is not None:
+                    query += f" AND {time_column} < ?"
+                    params.append(until_epoch)
+                
+                if bucket:
+                    query += " GROUP BY service_name, metric_name, period ORDER BY period DESC LIMIT ?"
+                else:
+                    query += f" ORDER BY {time_column} DESC LIMIT ?"
+                params.append(limit)
+                
+                rows = conn.execute(query, params).fetchall()
             
-            cursor.execute(query, params)
-            rows = cursor.fetchall()
-            conn.close()
+            if bucket:
+                label = next((tier for tier, tier_width in self.ROLLUP_TIERS.items() if tier_width == bucket),
+                             f"{bucket}s")
+            else:
+                label = resolution
             
             metrics = []
             for row in rows:
-                metrics.append(MetricData(
-                    timestamp=datetime.fromisoformat(row[0]),
-                    service_name=row[1],
-                    metric_name=row[2],
-                    value=row[3],
-                    unit=row[4] or ""
-                ))
+                if resolution == 'raw' and not bucket:
+                    metrics.append(MetricData(
+                        timestamp=datetime.fromtimestamp(row[0]),
+                        service_name=row[1],
+                        metric_name=row[2],
+                        value=row[3],
+                        unit=row[4] or ""
+                    ))
+                else:
+                    metrics.append(MetricRollup(
+                        timestamp=datetime.fromtimestamp(row[0]),
+                        service_name=row[1],
+                        metric_name=row[2],
+                        value=row[3],
+                        unit=row[4] or "",
+                        resolution=label,
+                        count=row[5],
+                        min_value=row[6],
+                        max_value=row[7],
+                        sum_value=row[8]
+                    ))
             
             return metrics
             
@@ -568,127 +2135,1265 @@ class MetricsCollector:
             self.logger.error(f"Failed to get metrics: {e}")
             return []
     
-    def cleanup_old_data(self, days: int = 30):
-        """Clean up old metrics and health check data"""
+    def get_health_checks(self, service_name: str = None, check_type: str = None,
+                          since: datetime = None, limit: int = 1000) -> List[HealthCheckResult]:
+        """
+        Get stored health check results
+        
+        Args:
+            service_name: Filter by service name
+            check_type: Filter by check type
+            since: Only return results at or after this time
+            limit: Maximum number of rows to return
+            
+        Returns:
+            Health check results, newest first, reconstructed in full from
+            compact rows
+        """
+        since_epoch = self._epoch(since) if since else None
+        
         try:
-            cutoff_date = datetime.now() - timedelta(days=days)
+            with self._lock:
+                self.flush()
+                conn = self._get_connection()
+                cursor = conn.cursor()
+                
+                source = self._partitioned_sql(cursor, 'health_checks', since_epoch)
+                if source is None:
+                    return []
+                
+                # Pick the rows first so only those are joined with their details
+                query = f"SELECT * FROM {source} WHERE 1=1"
+                params = []
+                
+                if service_name:
+                    query += " AND service_name = ?"
+                    params.append(service_name)
+                
+                if check_type:
+                    query += " AND check_type = ?"
+                    params.append(check_type)
+                
+                if since_epoch is not None:
+                    query += " AND timestamp >= ?"
+                    params.append(since_epoch)
+                
+                query += " ORDER BY id DESC LIMIT ?"
+                params.append(limit)
+                
+                rows = cursor.execute(f'''
+                    SELECT h.id, h.timestamp, h.service_name, h.check_type, h.status, h.response_time,
+                           h.message, COALESCE(d.details, h.details)
+                    FROM ({query}) h LEFT JOIN health_check_details d ON d.hash = h.details_hash
+                    ORDER BY h.id DESC
+                ''', params).fetchall()
+                
+
+                # Fill in omitted messages from the nearest older row of the same check
+                messages = {}
+                results = []
+                for row_id, timestamp, service, check, status, response_time, message, details in reversed(rows):
+                    key = (service, check)
+                    if message is None:
+                        if key not in messages:
+                            # Partitions are self-contained, so the row's own one has it
+                            partition = self._partitioned_sql(cursor, 'health_checks', timestamp, timestamp + 1)
+                            messages[key] = self._previous_message(conn, partition, service, check, row_id)
+                        message = messages[key]
+                    else:
+                        messages[key] = message
+                    
+                    results.append(HealthCheckResult(
+                        timestamp=datetime.fromtimestamp(timestamp),
+                        service_name=service,
+                        check_type=check,
+                        status=status,
+                        response_time=response_time,
+                        message=message,
+                        details=json.loads(details) if details else {}
+                    ))
             
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
+            results.reverse()
+            return results
             
-            cursor.execute("DELETE FROM metrics WHERE timestamp < ?", (cutoff_date.isoformat(),))
-            cursor.execute("DELETE FROM health_checks WHERE timestamp < ?", (cutoff_date.isoformat(),))
+        except Exception as e:
+            self.logger.error(f"Failed to get health checks: {e}")
+            return []
+    
+    def _previous_message(self, conn: sqlite3.Connection, source: str, service_name: str,
+                          check_type: str, row_id: int) -> str:
+        """Message of the nearest older row of the same check that carries one"""
+        previous = conn.execute(f'''
+            SELECT message FROM {source}
+            WHERE service_name = ? AND check_type = ? AND id < ? AND message IS NOT NULL
+            ORDER BY id DESC LIMIT 1
+        ''', (service_name, check_type, row_id)).fetchone()
+        return previous[0] if previous else ""
+    
+    def iter_export_batches(self, table: str, since: datetime = None, until: datetime = None,
+                            service_name: str = None, batch_size: int = 20000) -> Iterator[List[tuple]]:
+        """
+        Stream the raw rows of a table in batches, oldest partition first
+        
+        Each batch is a separate short read that resumes after the last id
+        seen, so memory is bounded by batch_size however many rows match
+        and no read transaction is held open for the whole export. Health
+        check rows come back complete, with omitted messages filled in and
+        details resolved from their hash.
+        
+        Args:
+            table: 'metrics' or 'health_checks'
+            since: Only export rows at or after this time
+            until: Only export rows before this time
+            service_name: Filter by service name
+            batch_size: Maximum rows per batch
             
-            conn.commit()
-            conn.close()
+        Yields:
+            Lists of row tuples in EXPORT_COLUMNS order; timestamps are UTC
+            epoch seconds
+        """
+        if table not in self.EXPORT_COLUMNS:
+            raise ValueError(f"Unknown export table: {table}")
+        
+        since_epoch = self._epoch(since) if since else None
+        until_epoch = self._epoch(until) if until else None
+        
+        with self._lock:
+            self.flush()
+            partitions = self._partitions(self._get_connection().cursor(), table, since_epoch, until_epoch)
+        
+        if table == 'metrics':
+            select = "SELECT id, timestamp, service_name, metric_name, value, unit FROM {partition} WHERE id > ?"
+        else:
+            select = '''
+                SELECT h.id, h.timestamp, h.service_name, h.check_type, h.status, h.response_time,
+                       h.message, COALESCE(d.details, h.details)
+                FROM {partition} h LEFT JOIN health_check_details d ON d.hash = h.details_hash
+                WHERE h.id > ?
+            '''
+        filters = ""
+        params = []
+        
+        if since_epoch is not None:
+            filters += " AND timestamp >= ?"
+            params.append(since_epoch)
+        
+        if until_epoch is not None:
+            filters += " AND timestamp < ?"
+            params.append(until_epoch)
+        
+        if service_name:
+            filters += " AND service_name = ?"
+            params.append(service_name)
+        
+        for partition in partitions:
+            query = select.format(partition=partition) + filters + " ORDER BY id LIMIT ?"
+            messages = {}  # (service_name, check_type) -> message; partitions are self-contained
+            last_id = 0
+            
+            while True:
+                with self._lock:
+                    conn = self._get_connection()
+                    try:
+                        rows = conn.execute(query, (last_id, *params, batch_size)).fetchall()
+                    except sqlite3.OperationalError as e:
+                        # Cleanup in the monitor may drop an expired partition mid-export
+                        if 'no such table' not in str(e):
+                            raise
+                        self.logger.warning(f"Partition {partition} was dropped during export")
+                        break
+                    
+                    if table == 'health_checks':
+                        for index, row in enumerate(rows):
+                            row_id, timestamp, service, check, status, response_time, message, details = row
+                            key = (service, check)
+                            if message is None:
+                                if key not in messages:
+                                    messages[key] = self._previous_message(conn, partition, service, check, row_id)
+                                rows[index] = (row_id, timestamp, service, check, status, response_time,
+                                               messages[key], details)
+                            else:
+                                messages[key] = message
+                
+                if not rows:
+                    break
+                last_id = rows[-1][0]
+                yield [row[1:] for row in rows]
+                if len(rows) < batch_size:
+                    break
+    
+    def export(self, table: str, path: str, fmt: str = 'ndjson', since: datetime = None,
+               until: datetime = None, service_name: str = None, batch_size: int = 20000) -> int:
+        """
+        Export the raw rows of a table to a file without loading them all
+        
+        NDJSON is gzip-compressed, one object per row with ISO 8601 UTC
+        timestamps. Parquet and Arrow IPC files, which need pyarrow, get
+        one row group or record batch per batch of rows. The file is
+        written under a temporary name and only renamed into place once
+        complete.
+        
+        Args:
+            table: 'metrics' or 'health_checks'
+            path: Output file path
+            fmt: 'ndjson', 'parquet' or 'arrow'
+            since: Only export rows at or after this time
+            until: Only export rows before this time
+            service_name: Filter by service name
+            batch_size: Rows read and written per batch
             
-            self.logger.info(f"Cleaned up data older than {days} days")
+        Returns:
+            Number of rows written
+        """
+        if fmt not in self.EXPORT_FORMATS:
+            raise ValueError(f"Unknown export format: {fmt}")
+        if fmt != 'ndjson' and not PYARROW_AVAILABLE:
+            raise RuntimeError(f"pyarrow is required for {fmt} export")
+        
+        batches = self.iter_export_batches(table, since=since, until=until,
+                                           service_name=service_name, batch_size=batch_size)
+        temp_path = f"{path}.tmp"
+        try:
+            if fmt == 'ndjson':
+                count = self._write_ndjson(temp_path, self.EXPORT_COLUMNS[table], batches)
+            else:
+                count = self._write_arrow(temp_path, table, fmt, batches)
+            os.replace(temp_path, path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        
+        self.logger.info(f"Exported {count} {table} rows to {path}")
+        return count
+    
+    @staticmethod
+    def _write_ndjson(path: str, columns: tuple, batches: Iterator[List[tuple]]) -> int:
+        # Details repeat heavily, so parse each distinct payload once
+        parse_details = functools.lru_cache(maxsize=4096)(json.loads)
+        count = 0
+        with gzip.open(path, 'wt', encoding='utf-8', compresslevel=6) as f:
+            for batch in batches:
+                lines = []
+                for row in batch:
+                    record = dict(zip(columns, row))
+                    record['timestamp'] = datetime.fromtimestamp(row[0], timezone.utc).isoformat()
+                    if 'details' in record:
+                        record['details'] = parse_details(record['details']) if record['details'] else {}
+                    lines.append(json.dumps(record))
+                f.write('\n'.join(lines) + '\n')
+                count += len(batch)
+        return count
+    
+    @staticmethod
+    def _write_arrow(path: str, table: str, fmt: str, batches: Iterator[List[tuple]]) -> int:
+        text = pa.string()
+        fields = {
+            'timestamp': pa.timestamp('s', tz='UTC'),
+            'value': pa.float64(),
+            'response_time': pa.float64(),
+        }
+        schema = pa.schema([(column, fields.get(column, text)) for column in MetricsCollector.EXPORT_COLUMNS[table]])
+        
+        if fmt == 'parquet':
+            writer = pq.ParquetWriter(path, schema, compression='zstd')
+        else:
+            writer = pa.ipc.new_file(path, schema, options=pa.ipc.IpcWriteOptions(compression='zstd'))
+        
+        count = 0
+        with writer:
+            for batch in batches:
+                arrays = [pa.array(values, type=field.type) for values, field in zip(zip(*batch), schema)]
+                writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+                count += len(batch)
+        return count
+    
+    def cleanup_old_data(self, days: int = None):
+        """
+        Drop raw data and rollups past their retention
+        
+        Raw partitions are dropped whole once their newest row is older than
+        days (defaults to raw_retention_days). Rollups and sketches are
+        deleted, and freed pages vacuumed, in small batches that each take
+        the write lock only briefly.
+        """
+        if days is None:
+            days = self.raw_retention_days
+        
+        try:
+            cutoff = self._epoch(datetime.now() - timedelta(days=days))
+            
+            with self._lock:
+                self.flush()
+                conn = self._get_connection()
+                with conn:
+                    conn.execute('BEGIN IMMEDIATE')
+                    cursor = conn.cursor()
+                    expired = cursor.execute(
+                        "SELECT name, base FROM partitions WHERE max_timestamp < ?", (cutoff,)
+                    ).fetchall()
+                    
+                    # Details referenced only by dropped rows go with them; probe
+                    # the newest partitions first, where live details show up
+                    expired_checks = [name for name, base in expired if base == 'health_checks']
+                    if expired_checks:
+                        candidates = " UNION ".join(f"SELECT details_hash FROM {name}" for name in expired_checks)
+                        query = f"DELETE FROM health_check_details WHERE hash IN ({candidates})"
+                        for name in reversed(self._partitions(cursor, 'health_checks')):
+                            if name not in expired_checks:
+                                query += (f" AND NOT EXISTS (SELECT 1 FROM {name} "
+                                          f"WHERE details_hash = health_check_details.hash)")
+                        cursor.execute(query)
+                    
+                    for name, _ in expired:
+                        cursor.execute(f"DROP TABLE {name}")
+                        cursor.execute("DELETE FROM partitions WHERE name = ?", (name,))
+                        self._partition_names.discard(name)
+            
+            now = datetime.now()
+            retention = [(f"metrics_{tier}", "service_name, metric_name, bucket", self.rollup_retention[tier])
+                         for tier in self.ROLLUP_TIERS]
+            # Latency sketches are hourly and share the 1h tier's retention
+            retention.append(("latency_sketches", "service_name, check_type, bucket", self.rollup_retention['1h']))
+            
+            for table, key, retention_days in retention:
+                table_cutoff = self._epoch(now - timedelta(days=retention_days))
+                deleted = self.CLEANUP_BATCH_ROWS
+                while deleted == self.CLEANUP_BATCH_ROWS:
+                    with self._lock:
+                        conn = self._get_connection()
+                        with conn:
+                            deleted = conn.execute(f'''
+                                DELETE FROM {table} WHERE ({key}) IN (
+                                    SELECT {key} FROM {table} WHERE bucket < ? LIMIT ?
+                                )
+                            ''', (table_cutoff, self.CLEANUP_BATCH_ROWS)).rowcount
+            
+            self._incremental_vacuum()
+            
+            self.logger.info(f"Cleaned up data older than {days} days, dropping {len(expired)} partitions")
             
         except Exception as e:
             self.logger.error(f"Failed to cleanup old data: {e}")
+    
+    def _incremental_vacuum(self):
+        """Return free pages to the filesystem a batch at a time"""
+        previous = None
+        while True:
+            with self._lock:
+                conn = self._get_connection()
+                free = conn.execute('PRAGMA freelist_count').fetchone()[0]
+                # Stop when done, or when the database is not in incremental mode
+                if not free or free == previous:
+                    if previous is not None:
+                        # The file only shrinks once the WAL is checkpointed
+                        conn.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+                    return
+                previous = free
+                # executescript steps the pragma to completion; execute frees one page
+                conn.executescript(f'PRAGMA incremental_vacuum({self.VACUUM_BATCH_PAGES})')
+
+
+class LogArchive:
+    """Full-text indexed local archive of service logs"""
+    
+    def __init__(self, db_path: str = "/tmp/n8n_logs.db", max_bytes: int = 256 * 1024 * 1024,
+                 prune_fraction: float = 0.1):
+        """
+        Initialize the log archive
+        
+        Lines are indexed with SQLite FTS5 when the sqlite3 build supports
+        it (falling back to LIKE scans otherwise). Once the database grows
+        past max_bytes the oldest lines are dropped.
+        
+        Args:
+            db_path: Path to SQLite database for storing logs
+            max_bytes: Size the archive is kept under
+            prune_fraction: Share of max_bytes freed when the limit is hit
+        """
+        self.db_path = db_path
+        self.max_bytes = max_bytes
+        self.prune_fraction = prune_fraction
+        self.fts_enabled = False
+        self.logger = logging.getLogger(__name__)
+        
+        self._lock = threading.RLock()
+        self._conn = None
+        self._resumed = set()  # services whose first batch was aligned with the archive
+        
+        self._init_database()
+    
+    def _get_connection(self) -> sqlite3.Connection:
+        """Get the shared database connection, opening it on first use"""
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            # Must precede table creation to take effect on a new database
+            self._conn.execute('PRAGMA auto_vacuum=INCREMENTAL')
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute('PRAGMA synchronous=NORMAL')
+        return self._conn
+    
+    def _init_database(self):
+        """Initialize the log database"""
+        try:
+            with self._lock:
+                conn = self._get_connection()
+                cursor = conn.cursor()
+                
+                # Lines with a timestamp or ID get a fingerprint so that
+                # overlapping fetches are ignored on insert
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS logs (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        service_name TEXT NOT NULL,
+                        timestamp REAL NOT NULL,
+                        level TEXT,
+                        message TEXT NOT NULL,
+                        fingerprint TEXT
+                    )
+                ''')
+                
+                cursor.execute('''
+                    CREATE UNIQUE INDEX IF NOT EXISTS idx_logs_fingerprint
+                    ON logs(fingerprint)
+                ''')
+                
+                cursor.execute('''
+                    CREATE INDEX IF NOT EXISTS idx_logs_service_timestamp
+                    ON logs(service_name, timestamp)
+                ''')
+                
+                cursor.execute('''
+                    CREATE INDEX IF NOT EXISTS idx_logs_timestamp
+                    ON logs(timestamp)
+                ''')
+                
+                try:
+                    cursor.execute('''
+                        CREATE VIRTUAL TABLE IF NOT EXISTS logs_fts
+                        USING fts5(message, content='logs', content_rowid='id')
+                    ''')
+                    
+                    cursor.execute('''
+                        CREATE TRIGGER IF NOT EXISTS logs_fts_insert AFTER INSERT ON logs BEGIN
+                            INSERT INTO logs_fts(rowid, message) VALUES (new.id, new.message);
+                        END
+                    ''')
+                    
+                    cursor.execute('''
+                        CREATE TRIGGER IF NOT EXISTS logs_fts_delete AFTER DELETE ON logs BEGIN
+                            INSERT INTO logs_fts(logs_fts, rowid, message) VALUES ('delete', old.id, old.message);
+                        END
+                    ''')
+                    self.fts_enabled = True
+                except sqlite3.OperationalError as e:
+                    self.logger.warning(f"FTS5 unavailable, log search will scan: {e}")
+                
+                conn.commit()
+            
+        except Exception as e:
+            self.logger.error(f"Failed to initialize log database: {e}")
+    
+    def ingest(self, service_name: str, records: List[dict]) -> int:
+        """
+        Store new log lines for a service
+        
+        Args:
+            service_name: Service the lines belong to
+            records: Dicts with message and optional timestamp (epoch
+                seconds), level and id, oldest first
+            
+        Returns:
+            Number of lines stored
+        """
+        if not records:
+            return 0
+        
+        try:
+            with self._lock:
+                conn = self._get_connection()
+                
+                # After a restart the first fetch repeats lines already
+                # archived; drop the overlap for lines without a fingerprint
+                if service_name not in self._resumed:
+                    self._resumed.add(service_name)
+                    records = self._skip_archived(conn, service_name, records)
+                
+                now = time.time()
+                rows = [(service_name, record.get('timestamp') or now, record.get('level'),
+                         record['message'], self._fingerprint(service_name, record))
+                        for record in records]
+                
+                with conn:
+                    stored = conn.executemany('''
+                        INSERT OR IGNORE INTO logs (service_name, timestamp, level, message, fingerprint)
+                        VALUES (?, ?, ?, ?, ?)
+                    ''', rows).rowcount
+                
+                self._enforce_size(conn)
+                return stored
+            
+        except Exception as e:
+            self.logger.error(f"Failed to store logs for {service_name}: {e}")
+            return 0
+    
+    @staticmethod
+    def _fingerprint(service_name: str, record: dict) -> Optional[str]:
+        if record.get('id'):
+            key = f"{service_name}\0id\0{record['id']}"
+        elif record.get('timestamp'):
+            key = f"{service_name}\0{record['timestamp']}\0{record['message']}"
+        else:
+            return None
+        return hashlib.sha1(key.encode()).hexdigest()
+    
+    def _skip_archived(self, conn: sqlite3.Connection, service_name: str, records: List[dict]) -> List[dict]:
+        """Drop the leading records that repeat the archive's newest lines"""
+        rows = conn.execute('''
+            SELECT message FROM logs WHERE service_name = ?
+            ORDER BY id DESC LIMIT ?
+        ''', (service_name, len(records))).fetchall()
+        archived = [row[0] for row in reversed(rows)]
+        messages = [record['message'] for record in records]
+        
+        for size in range(min(len(archived), len(messages)), 0, -1):
+            if archived[-size:] == messages[:size]:
+                return records[size:]
+        return records
+    
+    def _size_bytes(self, conn: sqlite3.Connection) -> int:
+        page_size = conn.execute('PRAGMA page_size').fetchone()[0]
+        page_count = conn.execute('PRAGMA page_count').fetchone()[0]
+        freelist = conn.execute('PRAGMA freelist_count').fetchone()[0]
+        return (page_count - freelist) * page_size
+    
+    def _enforce_size(self, conn: sqlite3.Connection):
+        """Delete the oldest lines once the archive exceeds max_bytes"""
+        size = self._size_bytes(conn)
+        if size <= self.max_bytes:
+            return
+        
+        row_count = conn.execute('SELECT COUNT(*) FROM logs').fetchone()[0]
+        if not row_count:
+            return
+        
+        # Free enough to land prune_fraction below the limit in one pass
+        target = self.max_bytes * (1 - self.prune_fraction)
+        excess = math.ceil(row_count * (size - target) / size)
+        
+        with conn:
+            conn.execute('''
+                DELETE FROM logs WHERE id IN (SELECT id FROM logs ORDER BY id LIMIT ?)
+            ''', (excess,))
+        # executescript steps the pragma to completion; execute frees one page
+        conn.executescript('PRAGMA incremental_vacuum')
+        self.logger.info(f"Pruned {excess} archived log lines to stay under {self.max_bytes} bytes")
+    
+    def _search_query(self, columns: str, term: str = None, service_name: str = None,
+                      since: datetime = None, until: datetime = None,
+                      level: str = None) -> tuple:
+        """Build the FROM/WHERE clause shared by search and count_by_service"""
+        if term and self.fts_enabled:
+            query = f"SELECT {columns} FROM logs_fts JOIN logs ON logs.id = logs_fts.rowid WHERE logs_fts MATCH ?"
+            # Quote as a phrase so punctuation in the term is not FTS syntax
+            params = ['"' + term.replace('"', '""') + '"']
+        elif term:
+            query = f"SELECT {columns} FROM logs WHERE logs.message LIKE ?"
+            params = [f"%{term}%"]
+        else:
+            query = f"SELECT {columns} FROM logs WHERE 1=1"
+            params = []
+        
+        if service_name:
+            query += " AND logs.service_name = ?"
+            params.append(service_name)
+        
+        if since:
+            query += " AND logs.timestamp >= ?"
+            params.append(since.timestamp())
+        
+        if until:
+            query += " AND logs.timestamp < ?"
+            params.append(until.timestamp())
+        
+        if level:
+            query += " AND logs.level = ?"
+            params.append(level.lower())
+        
+        return query, params
+    
+    def search(self, term: str = None, service_name: str = None, since: datetime = None,
+               until: datetime = None, level: str = None, limit: int = 100) -> List[dict]:
+        """
+        Search archived log lines, newest first
+        
+        Args:
+            term: Word or phrase the line must contain
+            service_name: Filter by service
+            since: Earliest line time
+            until: Latest line time (exclusive)
+            level: Filter by log level
+            limit: Maximum lines returned
+            
+        Returns:
+            Dicts with service_name, timestamp, level and message
+        """
+        query, params = self._search_query(
+            'logs.service_name, logs.timestamp, logs.level, logs.message',
+            term, service_name, since, until, level
+        )
+        query += " ORDER BY logs.timestamp DESC LIMIT ?"
+        params.append(limit)
+        
+        try:
+            with self._lock:
+                rows = self._get_connection().execute(query, params).fetchall()
+        except Exception as e:
+            self.logger.error(f"Failed to search logs: {e}")
+            return []
+        
+        return [{'service_name': row[0], 'timestamp': datetime.fromtimestamp(row[1]),
+                 'level': row[2], 'message': row[3]} for row in rows]
+    
+    def count_by_service(self, term: str = None, since: datetime = None, until: datetime = None,
+                         level: str = None) -> Dict[str, int]:
+        """
+        Count matching lines per service, e.g. which tenants logged a given error
+        
+        Returns:
+            Service name -> matching line count, most matches first
+        """
+        query, params = self._search_query('logs.service_name, COUNT(*)', term, None, since, until, level)
+        query += " GROUP BY logs.service_name ORDER BY COUNT(*) DESC"
+        
+        try:
+            with self._lock:
+                rows = self._get_connection().execute(query, params).fetchall()
+        except Exception as e:
+            self.logger.error(f"Failed to search logs: {e}")
+            return {}
+        
+        return dict(rows)
+    
+    def close(self):
+        """Close the database connection"""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
 
 
 class AlertManager:
     """Manages alerts and notifications"""
     
+    # Defaults for the transition, grouping and delivery settings
+    DEFAULTS = {
+        'confirm_cycles': 1,    # consecutive cycles before a problem is reported
+        'recover_cycles': 2,    # consecutive healthy cycles before a recovery is reported
+        'flap_window': 3600,    # seconds of state changes considered for flap detection
+        'flap_threshold': 4,    # state changes within flap_window that mark a check flapping
+        'group_window': 60,     # seconds notifications are collected into one email
+        'max_retries': 3,
+        'retry_delay': 10,      # seconds, doubled after each failed attempt
+        'smtp_idle_timeout': 240,  # close the pooled SMTP connection after this idle time
+    }
+    
+    # Check types the monitor reports on behalf of a service when its checks
+    # could not run; they are never reported again once the service recovers
+    SYNTHETIC_CHECKS = ('cycle_deadline', 'service_check')
+    
     def __init__(self, config: dict = None):
         """
         Initialize alert manager
         
+        Alerts are sent when a check changes state, not on every cycle it
+        stays unhealthy. Checks that flap are reported once and then muted
+        until they settle. Notifications are grouped and delivered from a
+        background thread over a reused SMTP connection, so a slow mail
+        server never holds up the health-check cycle.
+        
         Args:
             config: Alert configuration
         """
         self.config = config or {}
+        self.settings = {key: self.config.get(key, default) for key, default in self.DEFAULTS.items()}
         self.logger = logging.getLogger(__name__)
+        
+        self._states = {}  # (service_name, check_type) -> transition state
+        self._queue = queue.Queue()
+        self._thread = None
+        self._smtp = None
+        self._smtp_last_used = 0.0
+        self._warned_unavailable = False
     
     def should_alert(self, result: HealthCheckResult) -> bool:
         """
-        Determine if an alert should be sent
+        Determine if an alert should be sent
+        
+        Args:
+            result: Health check result
+            
+        Returns:
+            True if alert should be sent
+        """
+        # Alert on critical status
+        if result.status == 'critical':
+            return True
+        
+        # Alert on warnings based on configuration
+        if result.status == 'warning' and self.config.get('alert_on_warning', False):
+            return True
+        
+        return False
+    
+    def handle_results(self, results: List[HealthCheckResult]) -> List[dict]:
+        """
+        Update per-check state and queue notifications for transitions
+        
+        Args:
+            results: Health check results from one cycle
+            
+        Returns:
+            Notification events queued for delivery
+        """
+        now = time.time()
+        events = []
+        
+        for result in results + self._resolved_synthetic(results):
+            event = self._update_state(result, now)
+            if event:
+                events.append(event)
+        
+        if events and self._email_enabled():
+            for event in events:
+                self._queue.put(event)
+            self._ensure_worker()
+        
+        return events
+    
+    def _resolved_synthetic(self, results: List[HealthCheckResult]) -> List[HealthCheckResult]:
+        """Healthy results for synthetic checks of services whose checks ran again"""
+        reported = {result.service_name for result in results
+                    if result.check_type not in self.SYNTHETIC_CHECKS}
+        resolved = []
+        for (service_name, check_type), state in self._states.items():
+            if (service_name in reported and check_type in self.SYNTHETIC_CHECKS
+                    and (state['level'] != 'ok' or state['candidate'] is not None)):
+                resolved.append(HealthCheckResult(
+                    timestamp=datetime.now(),
+                    service_name=service_name,
+                    check_type=check_type,
+                    status='healthy',
+                    response_time=0,
+                    message="Service checks completed again",
+                    details={}
+                ))
+        return resolved
+    
+    def _update_state(self, result: HealthCheckResult, now: float) -> Optional[dict]:
+        """Apply one result to its check's state, returning an event if one is due"""
+        key = (result.service_name, result.check_type)
+        state = self._states.get(key)
+        if state is None:
+            state = self._states[key] = {'level': 'ok', 'notified': 'ok', 'candidate': None,
+                                         'streak': 0, 'changes': deque(), 'flapping': False}
+        
+        level = result.status if self.should_alert(result) else 'ok'
+        
+        # Require a streak of results before accepting a new level
+        if level == state['level']:
+            state['candidate'] = None
+            state['streak'] = 0
+        else:
+            if level == state['candidate']:
+                state['streak'] += 1
+            else:
+                state['candidate'] = level
+                state['streak'] = 1
+            
+            needed = self.settings['recover_cycles'] if level == 'ok' else self.settings['confirm_cycles']
+            if state['streak'] >= needed:
+                state['level'] = level
+                state['candidate'] = None
+                state['streak'] = 0
+                state['changes'].append(now)
+        
+        changes = state['changes']
+        while changes and changes[0] < now - self.settings['flap_window']:
+            changes.popleft()
+        
+        if not state['flapping'] and len(changes) >= self.settings['flap_threshold']:
+            state['flapping'] = True
+            return {'kind': 'flapping', 'result': result, 'previous': state['notified']}
+        
+        if state['flapping']:
+            if changes:
+                return None
+            state['flapping'] = False
+        
+        if state['level'] == state['notified']:
+            return None
+        
+        event = {'kind': 'problem' if state['level'] != 'ok' else 'recovery',
+                 'result': result, 'previous': state['notified']}
+        state['notified'] = state['level']
+        return event
+    
+    def _email_enabled(self) -> bool:
+        if not self.config.get('email', {}).get('enabled', False):
+            return False
+        
+        if not SMTP_AVAILABLE:
+            if not self._warned_unavailable:
+                self.logger.warning("SMTP not available, cannot send email alerts")
+                self._warned_unavailable = True
+            return False
+        
+        return True
+    
+    def _ensure_worker(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name='alert-delivery', daemon=True)
+            self._thread.start()
+    
+    def _run(self):
+        """Collect events for group_window seconds, then deliver them as one email"""
+        stopping = False
+        
+        while not stopping:
+            try:
+                event = self._queue.get(timeout=self.settings['smtp_idle_timeout'])
+            except queue.Empty:
+                self._close_smtp()
+                continue
+            
+            if event is None:
+                break
+            
+            group = [event]
+            deadline = time.monotonic() + self.settings['group_window']
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    event = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if event is None:
+                    stopping = True
+                    break
+                group.append(event)
+            
+            self._deliver(group)
+        
+        self._close_smtp()
+    
+    def _deliver(self, events: List[dict]):
+        """Send one email for a group of events, retrying with backoff"""
+        # Only the latest event per check matters
+        latest = {}
+        for event in events:
+            latest[(event['result'].service_name, event['result'].check_type)] = event
+        
+        problems = [e['result'] for e in latest.values() if e['kind'] == 'problem']
+        recovered = [e['result'] for e in latest.values() if e['kind'] == 'recovery']
+        flapping = [e['result'] for e in latest.values() if e['kind'] == 'flapping']
+        
+        delay = self.settings['retry_delay']
+        for attempt in range(self.settings['max_retries'] + 1):
+            if self.send_email_alert(problems, recovered, flapping):
+                return
+            if attempt < self.settings['max_retries']:
+                self.logger.info(f"Retrying email alert in {delay}s")
+                time.sleep(delay)
+                delay *= 2
+        
+        self.logger.error(f"Giving up on email alert for {len(latest)} checks")
+    
+    def _get_smtp(self, email_config: dict) -> 'smtplib.SMTP':
+        """Return the pooled SMTP connection, reconnecting if it went stale"""
+        if self._smtp is not None:
+            try:
+                if self._smtp.noop()[0] == 250:
+                    return self._smtp
+            except smtplib.SMTPException:
+                pass
+            self._close_smtp()
+        
+        server = smtplib.SMTP(email_config['smtp_server'], email_config.get('smtp_port', 587),
+                              timeout=email_config.get('timeout', 30))
+        server.starttls()
+        server.login(email_config['username'], email_config['password'])
+        self._smtp = server
+        return server
+    
+    def _close_smtp(self):
+        if self._smtp is not None:
+            try:
+                self._smtp.quit()
+            except Exception:
+                pass
+            self._smtp = None
+    
+    def send_email_alert(self, results: List[HealthCheckResult],
+                         recovered: List[HealthCheckResult] = None,
+                         flapping: List[HealthCheckResult] = None) -> bool:
+        """
+        Send one email for the given problems, recoveries and flapping checks
+        
+        Returns:
+            True if the email was sent or there was nothing to send
+        """
+        if not self._email_enabled():
+            return True
+        
+        email_config = self.config.get('email', {})
+        recovered = recovered or []
+        flapping = flapping or []
+        if not (results or recovered or flapping):
+            return True
+        
+        try:
+            # Create email message
+            msg = MIMEMultipart()
+            msg['From'] = email_config['from']
+            msg['To'] = ', '.join(email_config['to'])
+            if results:
+                msg['Subject'] = f"n8n Health Alert - {len(results)} issues detected"
+            elif flapping:
+                msg['Subject'] = f"n8n Health Alert - {len(flapping)} checks flapping"
+            else:
+                msg['Subject'] = f"n8n Health Recovery - {len(recovered)} issues resolved"
+            
+            # Create email body
+            body = self._create_email_body(results, recovered, flapping)
+            msg.attach(MIMEText(body, 'plain'))
+            
+            # Send email
+            self._get_smtp(email_config).send_message(msg)
+            
+            self.logger.info(f"Sent email alert for {len(results)} issues, "
+                             f"{len(recovered)} recoveries, {len(flapping)} flapping checks")
+            return True
+            
+        except Exception as e:
+            self.logger.error(f"Failed to send email alert: {e}")
+            self._close_smtp()
+            return False
+    
+    def close(self, timeout: float = 10.0):
+        """Deliver queued notifications immediately and stop the delivery thread"""
+        if self._thread is not None and self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join(timeout)
+        self._thread = None
+    
+    def _create_email_body(self, results: List[HealthCheckResult],
+                           recovered: List[HealthCheckResult] = None,
+                           flapping: List[HealthCheckResult] = None) -> str:
+        """Create email body for alerts"""
+        recovered = recovered or []
+        flapping = flapping or []
+        
+        body = "n8n Health Check Alert\n"
+        body += "=" * 50 + "\n\n"
+        body += f"Alert Time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n"
+        body += f"Number of Issues: {len(results)}\n\n"
+        
+        # Group by status
+        critical_results = [r for r in results if r.status == 'critical']
+        warning_results = [r for r in results if r.status == 'warning']
+        
+        if critical_results:
+            body += "CRITICAL ISSUES:\n"
+            body += "-" * 20 + "\n"
+            for result in critical_results:
+                body += self._format_result(result)
+        
+        if warning_results:
+            body += "WARNING ISSUES:\n"
+            body += "-" * 20 + "\n"
+            for result in warning_results:
+                body += self._format_result(result)
+        
+        if flapping:
+            body += "FLAPPING (notifications muted until stable):\n"
+            body += "-" * 20 + "\n"
+            for result in flapping:
+                body += self._format_result(result)
+        
+        if recovered:
+            body += "RECOVERED:\n"
+            body += "-" * 20 + "\n"
+            for result in recovered:
+                body += self._format_result(result)
+        
+        return body
+    
+    @staticmethod
+    def _format_result(result: HealthCheckResult) -> str:
+        text = f"Service: {result.service_name}\n"
+        text += f"Check: {result.check_type}\n"
+        text += f"Message: {result.message}\n"
+        text += f"Response Time: {result.response_time:.2f}ms\n\n"
+        return text
+
+
+class MetricsExporter:
+    """Serves the latest health and metric snapshot in OpenMetrics text format"""
+    
+    CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+    
+    STATUSES = ('healthy', 'warning', 'critical')
+    
+    def __init__(self, host: str = "0.0.0.0", port: int = 9464):
+        """
+        Initialize the exporter
+        
+        Scrapes are answered from a pre-rendered in-memory payload that is
+        rebuilt whenever new results arrive, so they never touch SQLite.
+        
+        Args:
+            host: Address to listen on
+            port: Port to listen on
+        """
+        self.host = host
+        self.port = port
+        self.logger = logging.getLogger(__name__)
+        
+        self._health = {}  # (service_name, check_type) -> HealthCheckResult
+        self._metrics = {}  # (service_name, metric_name) -> MetricData
+        self._lock = threading.Lock()
+        self._payload = b"# EOF\n"
+        self._server = None
+        self._thread = None
+    
+    def start(self):
+        """Start serving scrapes in the background"""
+        if self._server is not None:
+            return
+        
+        exporter = self
+        
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?', 1)[0] not in ('/metrics', '/'):
+                    self.send_error(404)
+                    return
+                
+                payload = exporter._payload
+                self.send_response(200)
+                self.send_header('Content-Type', exporter.CONTENT_TYPE)
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+            
+            def log_message(self, format, *args):
+                exporter.logger.debug(f"Exporter: {format % args}")
+        
+        self._server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, name='metrics-exporter', daemon=True)
+        self._thread.start()
+        self.logger.info(f"Serving OpenMetrics on http://{self.host}:{self._server.server_port}/metrics")
+    
+    def stop(self):
+        """Stop serving scrapes"""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+            self._thread = None
+    
+    def update_health(self, results: List[HealthCheckResult]):
+        """Record the latest health check results"""
+        with self._lock:
+            for result in results:
+                self._health[(result.service_name, result.check_type)] = result
+            self._render()
+    
+    def update_metrics(self, metrics: List[MetricData]):
+        """Record the latest metric values"""
+        with self._lock:
+            for metric in metrics:
+                self._metrics[(metric.service_name, metric.metric_name)] = metric
+            self._render()
+    
+    @staticmethod
+    def _escape(value: str) -> str:
+        """Escape a label value"""
+        return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+    
+    @staticmethod
+    def _number(value: float) -> str:
+        """Format a sample value, spelling non-finite values the OpenMetrics way"""
+        value = float(value)
+        if math.isnan(value):
+            return 'NaN'
+        if math.isinf(value):
+            return '+Inf' if value > 0 else '-Inf'
+        return repr(value)
+    
+    def _labels(self, **labels) -> str:
+        """Format a label set"""
+        return '{' + ','.join(f'{name}="{self._escape(value)}"' for name, value in labels.items()) + '}'
+    
+    def _render(self):
+        """Rebuild the scrape payload from the current snapshot"""
+        lines = [
+            "# TYPE n8n_health_check_status stateset",
+            "# HELP n8n_health_check_status Latest health check status.",
+        ]
+        for (service, check), result in sorted(self._health.items()):
+            for status in self.STATUSES:
+                labels = self._labels(service=service, check=check, n8n_health_check_status=status)
+                lines.append(f"n8n_health_check_status{labels} {int(result.status == status)}")
+        
+        lines += [
+            "# TYPE n8n_health_check_response_time_seconds gauge",
+            "# UNIT n8n_health_check_response_time_seconds seconds",
+            "# HELP n8n_health_check_response_time_seconds Latest health check response time.",
+        ]
+        for (service, check), result in sorted(self._health.items()):
+            labels = self._labels(service=service, check=check)
+            lines.append(f"n8n_health_check_response_time_seconds{labels} {result.response_time / 1000:.6f}")
+        
+        lines += [
+            "# TYPE n8n_health_check_timestamp_seconds gauge",
+            "# UNIT n8n_health_check_timestamp_seconds seconds",
+            "# HELP n8n_health_check_timestamp_seconds Time of the latest health check.",
+        ]
+        for (service, check), result in sorted(self._health.items()):
+            labels = self._labels(service=service, check=check)
+            lines.append(f"n8n_health_check_timestamp_seconds{labels} {result.timestamp.timestamp():.3f}")
+        
+        lines += [
+            "# TYPE n8n_monitor_metric gauge",
+            "# HELP n8n_monitor_metric Latest collected metric value.",
+        ]
+        for (service, name), metric in sorted(self._metrics.items()):
+            labels = self._labels(service=service, metric=name, unit=metric.unit)
+            lines.append(f"n8n_monitor_metric{labels} {self._number(metric.value)}")
+        
+        lines.append("# EOF")
+        self._payload = ('\n'.join(lines) + '\n').encode('utf-8')
+
+
+class CheckScheduler:
+    """Priority-queue scheduler giving each service its own adaptive check interval"""
+    
+    # Statuses from worst to best; a service is scheduled by its worst result
+    SEVERITY = {'critical': 2, 'warning': 1, 'healthy': 0}
+    
+    def __init__(self, base_interval: float, min_interval: float = None, max_interval: float = None,
+                 backoff: float = 1.5, jitter: float = 0.1):
+        """
+        Initialize the scheduler
+        
+        Failing services are re-checked at min_interval and degraded ones
+        at half their base interval. Healthy services start at their base
+        interval and back off by `backoff` per stable check up to
+        max_interval. Every due time is jittered so that checks spread out
+        instead of firing together.
+        
+        Args:
+            base_interval: Default interval in seconds for services without their own
+            min_interval: Interval for failing services (default base / 10, at least 10s)
+            max_interval: Upper bound for stable services (default 4x base)
+            backoff: Interval multiplier after each healthy check
+            jitter: Random fraction added to or removed from each interval
+        """
+        self.base_interval = base_interval
+        self.min_interval = min_interval or max(10.0, base_interval / 10)
+        self.max_interval = max_interval or base_interval * 4
+        self.backoff = backoff
+        self.jitter = jitter
+        
+        self._entries = {}  # name -> entry
+        self._heap = []  # (due, seq, name)
+        self._seq = 0
+    
+    def add(self, name: str, payload: Any = None, interval: float = None):
+        """
+        Schedule a service, with its first check spread over one interval
+        
+        Args:
+            name: Unique service name
+            payload: Value returned with the entry when it is due
+            interval: Base interval for this service
+        """
+        base = interval or self.base_interval
+        entry = {'name': name, 'payload': payload, 'base': base, 'interval': base, 'due': 0.0, 'seq': 0}
+        self._entries[name] = entry
+        self._push(entry, time.monotonic() + random.uniform(0, min(base, self.max_interval)))
+    
+    def remove(self, name: str):
+        """Stop scheduling a service; a check already running is not rescheduled"""
+        self._entries.pop(name, None)
+    
+    def names(self) -> List[str]:
+        return list(self._entries)
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def _push(self, entry: dict, due: float):
+        entry['due'] = due
+        self._seq += 1
+        entry['seq'] = self._seq
+        heapq.heappush(self._heap, (due, self._seq, entry['name']))
+    
+    def next_due(self) -> Optional[float]:
+        """Monotonic time the next entry is due, or None if none are queued"""
+        return self._heap[0][0] if self._heap else None
+    
+    def pop_due(self, now: float = None) -> List[dict]:
+        """Remove and return all entries due at or before now"""
+        now = time.monotonic() if now is None else now
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            _, seq, name = heapq.heappop(self._heap)
+            entry = self._entries.get(name)
+            # Skip heap items left behind by removed or re-added services
+            if entry is not None and entry['seq'] == seq:
+                due.append(entry)
+        return due
+    
+    def reschedule(self, entry: dict, status: str, now: float = None) -> float:
+        """
+        Queue an entry again after a check finished
         
         Args:
-            result: Health check result
+            entry: Entry returned by pop_due
+            status: Worst status of the check's results
+            now: Completion time (monotonic)
             
         Returns:
-            True if alert should be sent
+            The new interval in seconds
         """
-        # Alert on critical status
-        if result.status == 'critical':
-            return True
-        
-        # Alert on warnings based on configuration
-        if result.status == 'warning' and self.config.get('alert_on_warning', False):
-            return True
-        
-        return False
-    
-    def send_email_alert(self, results: List[HealthCheckResult]):
-        """Send email alert for health check results"""
-        if not SMTP_AVAILABLE:
-            self.logger.warning("SMTP not available, cannot send email alerts")
-            return
-        
-        email_config = self.config.get('email', {})
-        if not email_config.get('enabled', False):
-            return
+        now = time.monotonic() if now is None else now
+        if self._entries.get(entry['name']) is not entry:
+            return entry['interval']
         
-        # Filter results that need alerts
-        alert_results = [r for r in results if self.should_alert(r)]
-        if not alert_results:
-            return
+        if status == 'critical':
+            interval = self.min_interval
+        elif status == 'warning':
+            interval = max(self.min_interval, entry['base'] / 2)
+        elif entry['interval'] < entry['base']:
+            # Recovered: resume from the base interval before backing off
+            interval = entry['base']
+        else:
+            interval = min(entry['interval'] * self.backoff, max(self.max_interval, entry['base']))
         
-        try:
-            # Create email message
-            msg = MimeMultipart()
-            msg['From'] = email_config['from']
-            msg['To'] = ', '.join(email_config['to'])
-            msg['Subject'] = f"n8n Health Alert - {len(alert_results)} issues detected"
-            
-            # Create email body
-            body = self._create_email_body(alert_results)
-            msg.attach(MimeText(body, 'plain'))
-            
-            # Send email
-            server = smtplib.SMTP(email_config['smtp_server'], email_config.get('smtp_port', 587))
-            server.starttls()
-            server.login(email_config['username'], email_config['password'])
-            server.send_message(msg)
-            server.quit()
-            
-            self.logger.info(f"Sent email alert for {len(alert_results)} issues")
-            
-        except Exception as e:
-            self.logger.error(f"Failed to send email alert: {e}")
+        entry['interval'] = interval
+        self._push(entry, now + interval * random.uniform(1 - self.jitter, 1 + self.jitter))
+        return interval
     
-    def _create_email_body(self, results: List[HealthCheckResult]) -> str:
-        """Create email body for alerts"""
-        body = "n8n Health Check Alert\n"
-        body += "=" * 50 + "\n\n"
-        body += f"Alert Time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n"
-        body += f"Number of Issues: {len(results)}\n\n"
-        
-        # Group by status
-        critical_results = [r for r in results if r.status == 'critical']
-        warning_results = [r for r in results if r.status == 'warning']
-        
-        if critical_results:
-            body += "CRITICAL ISSUES:\n"
-            body += "-" * 20 + "\n"
-            for result in critical_results:
-                body += f"Service: {result.service_name}\n"
-                body += f"Check: {result.check_type}\n"
-                body += f"Message: {result.message}\n"
-                body += f"Response Time: {result.response_time:.2f}ms\n\n"
-        
-        if warning_results:
-            body += "WARNING ISSUES:\n"
-            body += "-" * 20 + "\n"
-            for result in warning_results:
-                body += f"Service: {result.service_name}\n"
-                body += f"Check: {result.check_type}\n"
-                body += f"Message: {result.message}\n"
-                body += f"Response Time: {result.response_time:.2f}ms\n\n"
-        
-        return body
+    @classmethod
+    def worst_status(cls, results: List[HealthCheckResult]) -> str:
+        statuses = [result.status for result in results] or ['healthy']
+        return max(statuses, key=lambda status: cls.SEVERITY.get(status, 2))
 
 
 class N8nMonitor:
@@ -702,26 +3407,77 @@ class N8nMonitor:
             config_file: Path to configuration file
         """
         self.config = self._load_config(config_file)
-        self.health_checker = HealthChecker(timeout=self.config.get('timeout', 10))
-        self.metrics_collector = MetricsCollector(self.config.get('metrics_db', '/tmp/n8n_metrics.db'))
+        self.max_concurrency = max(1, int(self.config.get('max_concurrency', 20)))
+        self.resource_sampler = ResourceSampler(
+            interval=self.config.get('resource_sample_interval', 1.0),
+            process_pattern=self.config.get('n8n_process_pattern', 'n8n')
+        )
+        self.health_checker = HealthChecker(
+            timeout=self.config.get('timeout', 10),
+            pool_size=self.max_concurrency,
+            sampler=self.resource_sampler
+        )
+        self.metrics_collector = MetricsCollector(
+            self.config.get('metrics_db', '/tmp/n8n_metrics.db'),
+            batch_size=self.config.get('metrics_batch_size', 500),
+            flush_interval=self.config.get('metrics_flush_interval', 5.0),
+            rollup_retention=self.config.get('rollup_retention'),
+            sketch_persist_interval=self.config.get('sketch_persist_interval', 60.0),
+            compact_health_checks=self.config.get('health_check_storage', 'compact') == 'compact',
+            store_headers=self.config.get('store_response_headers', False),
+            raw_retention_days=self.config.get('metrics_retention_days', 30)
+        )
         self.alert_manager = AlertManager(self.config.get('alerts', {}))
         self.logger = logging.getLogger(__name__)
+        self._last_cleanup = None  # date of the last daily cleanup
+        
+        # Optional OpenMetrics endpoint
+        self.exporter = None
+        exporter_config = self.config.get('exporter', {})
+        if exporter_config.get('enabled', False):
+            self.exporter = MetricsExporter(
+                host=exporter_config.get('host', '0.0.0.0'),
+                port=exporter_config.get('port', 9464)
+            )
         
         # Initialize Render API if available
         self.render_manager = None
         if RENDER_API_AVAILABLE and self.config.get('render_api_key'):
-            self.render_manager = N8nRenderManager(self.config['render_api_key'])
+            rate_limit = self.config.get('render_api_rate_limit')
+            self.render_manager = N8nRenderManager(
+                self.config['render_api_key'],
+                rate_limiter=RateLimiter(rate=rate_limit) if rate_limit else None
+            )
+        
+        # Optional local log archive, fed from services with a render_service_id
+        self.log_archive = None
+        self._log_tail = None
+        self._log_services = {}
+        log_config = self.config.get('log_archive', {})
+        if log_config.get('enabled', False):
+            self.log_archive = LogArchive(
+                log_config.get('path', '/tmp/n8n_logs.db'),
+                max_bytes=int(log_config.get('max_mb', 256) * 1024 * 1024)
+            )
+            if self.render_manager is None:
+                reason = ("render-api.py could not be loaded" if not RENDER_API_AVAILABLE
+                          else "render_api_key is not set")
+                self.logger.error(f"Log archive is enabled but {reason}; no logs will be collected")
     
     def _load_config(self, config_file: str) -> dict:
         """Load configuration from file"""
         default_config = {
             'timeout': 10,
             'check_interval': 300,  # 5 minutes
+            'max_concurrency': 20,
+            'cycle_deadline': None,  # seconds, defaults to check_interval
             'metrics_db': '/tmp/n8n_metrics.db',
             'services': [],
             'alerts': {
                 'email': {'enabled': False}
-            }
+            },
+            'exporter': {'enabled': False, 'host': '0.0.0.0', 'port': 9464},
+            'log_archive': {'enabled': False, 'path': '/tmp/n8n_logs.db', 'max_mb': 256, 'lines': 100}
         }
         
         if config_file and os.path.exists(config_file):
@@ -739,28 +3495,109 @@ class N8nMonitor:
         results = []
         
         # Check configured services
-        for service_config in self.config.get('services', []):
-            service_results = self._check_service(service_config)
-            results.extend(service_results)
+        results.extend(self._check_services_concurrently(self.config.get('services', [])))
         
         # Check system resources
         if self.config.get('check_system_resources', True):
+            self.resource_sampler.start()
             system_results = self.health_checker.check_system_resources()
             results.extend(system_results)
         
-        # Store results
+        self._record_results(results)
+        self.metrics_collector.flush()
+        
+        return results
+    
+    def _record_results(self, results: List[HealthCheckResult]):
+        """Store results, publish them and queue alerts"""
         for result in results:
             self.metrics_collector.store_health_check(result)
         
-        # Handle alerts
-        self.alert_manager.send_email_alert(results)
+        if self.exporter:
+            self.exporter.update_health(results)
+        
+        # Queue notifications for state changes; delivery happens in the background
+        self.alert_manager.handle_results(results)
+    
+    def _check_services_concurrently(self, services: List[dict]) -> List[HealthCheckResult]:
+        """
+        Check services on a bounded worker pool
+        
+        A sweep takes roughly as long as the slowest single check. Services
+        that have not finished when the cycle deadline expires are reported
+        as critical instead of holding up the cycle.
+        
+        Args:
+            services: Service configurations
+            
+        Returns:
+            Health check results, in the order services are configured
+        """
+        if not services:
+            return []
+        
+        deadline = self.config.get('cycle_deadline') or self.config.get('check_interval', 300)
+        
+        executor = ThreadPoolExecutor(
+            max_workers=min(self.max_concurrency, len(services)),
+            thread_name_prefix='health-check'
+        )
+        try:
+            futures = [executor.submit(self._check_service, service_config)
+                       for service_config in services]
+            wait(futures, timeout=deadline)
+        finally:
+            # Don't block the cycle on checks that overran the deadline
+            executor.shutdown(wait=False, cancel_futures=True)
+        
+        results = []
+        for service_config, future in zip(services, futures):
+            service_name = service_config.get('name', 'unknown')
+            
+            if not future.done() or future.cancelled():
+                self.logger.warning(f"Health check for {service_name} exceeded cycle deadline ({deadline}s)")
+                results.append(HealthCheckResult(
+                    timestamp=datetime.now(),
+                    service_name=service_name,
+                    check_type='cycle_deadline',
+                    status='critical',
+                    response_time=deadline * 1000,
+                    message=f"Check did not complete within cycle deadline ({deadline}s)",
+                    details={'deadline': deadline}
+                ))
+                continue
+            
+            results.extend(self._service_results(service_name, future))
         
         return results
     
+    @staticmethod
+    def _service_results(service_name: str, future) -> List[HealthCheckResult]:
+        """Results of a finished check, or a critical result if it raised"""
+        try:
+            return future.result()
+        except Exception as e:
+            logging.getLogger(__name__).error(f"Health check for {service_name} failed: {e}")
+            return [HealthCheckResult(
+                timestamp=datetime.now(),
+                service_name=service_name,
+                check_type='service_check',
+                status='critical',
+                response_time=0,
+                message=f"Health check failed: {str(e)}",
+                details={'error': str(e)}
+            )]
+    
     def _check_service(self, service_config: dict) -> List[HealthCheckResult]:
         """Check a single service"""
+        return self.check_service(self.health_checker, service_config, self.config.get('timeout', 10))
+    
+    @staticmethod
+    def check_service(health_checker: HealthChecker, service_config: dict,
+                      default_timeout: float = 10) -> List[HealthCheckResult]:
+        """Check a single service with the given checker"""
         results = []
-        service_name = service_config.get('name', 'unknown')
+        timeout = service_config.get('timeout', default_timeout)
         
         # HTTP endpoint check
         if 'url' in service_config:
@@ -769,15 +3606,15 @@ class N8nMonitor:
                 auth = (service_config['auth']['username'], service_config['auth']['password'])
             
             if service_config.get('type') == 'n8n':
-                result = self.health_checker.check_n8n_health(service_config['url'], auth)
+                result = health_checker.check_n8n_health(service_config['url'], auth, timeout=timeout)
             else:
-                result = self.health_checker.check_http_endpoint(service_config['url'])
+                result = health_checker.check_http_endpoint(service_config['url'], auth=auth, timeout=timeout)
             
             results.append(result)
         
         # Database check
         if 'database' in service_config:
-            db_result = self.health_checker.check_database_connection(service_config['database'])
+            db_result = health_checker.check_database_connection(service_config['database'], timeout=timeout)
             results.append(db_result)
         
         return results
@@ -786,57 +3623,661 @@ class N8nMonitor:
         """Collect performance metrics"""
         timestamp = datetime.now()
         
-        # Collect system metrics
-        if psutil:
-            cpu_percent = psutil.cpu_percent()
-            memory = psutil.virtual_memory()
-            disk = psutil.disk_usage('/')
+        # Collect system metrics from the latest background sample
+        self.resource_sampler.start()
+        sample = self.resource_sampler.latest()
+        if sample:
+            memory = sample['memory']
+            disk = sample['disk']
             
             metrics = [
-                MetricData(timestamp, 'system', 'cpu_percent', cpu_percent, '%'),
+                MetricData(timestamp, 'system', 'cpu_percent', sample['cpu_percent'], '%'),
                 MetricData(timestamp, 'system', 'memory_percent', memory.percent, '%'),
-                MetricData(timestamp, 'system', 'disk_percent', (disk.used / disk.total) * 100, '%'),
+                MetricData(timestamp, 'system', 'disk_percent', sample['disk_percent'], '%'),
                 MetricData(timestamp, 'system', 'memory_available', memory.available, 'bytes'),
                 MetricData(timestamp, 'system', 'disk_free', disk.free, 'bytes'),
             ]
             
+            cpu_avg = self.resource_sampler.average('cpu_percent')
+            if cpu_avg is not None:
+                metrics.append(MetricData(timestamp, 'system', 'cpu_percent_avg', cpu_avg, '%'))
+            
+            if sample['net_bytes_sent_per_sec'] is not None:
+                metrics.append(MetricData(timestamp, 'system', 'net_bytes_sent', sample['net_bytes_sent_per_sec'], 'bytes/s'))
+                metrics.append(MetricData(timestamp, 'system', 'net_bytes_recv', sample['net_bytes_recv_per_sec'], 'bytes/s'))
+            
+            process = sample['process']
+            if process:
+                metrics.append(MetricData(timestamp, 'n8n_process', 'cpu_percent', process['cpu_percent'], '%'))
+                metrics.append(MetricData(timestamp, 'n8n_process', 'rss', process['rss'], 'bytes'))
+                metrics.append(MetricData(timestamp, 'n8n_process', 'num_threads', process['num_threads'], ''))
+                if process['num_fds'] is not None:
+                    metrics.append(MetricData(timestamp, 'n8n_process', 'num_fds', process['num_fds'], ''))
+                if process['involuntary_ctx_switches_per_sec'] is not None:
+                    metrics.append(MetricData(timestamp, 'n8n_process', 'involuntary_ctx_switches',
+                                              process['involuntary_ctx_switches_per_sec'], '1/s'))
+            
             for metric in metrics:
                 self.metrics_collector.store_metric(metric)
+            self.metrics_collector.flush()
+            
+            if self.exporter:
+                self.exporter.update_metrics(metrics)
+    
+    def collect_n8n_metrics(self) -> List[MetricData]:
+        """
+        Run deep n8n probes for services that configure them
+        
+        Services with 'n8n_api_key' get execution backlog metrics,
+        services with 'webhook_probe' get a synthetic webhook round trip and
+        PostgreSQL and SQLite databases get size and execution table stats
+        (unless collect_stats is false). Probes run concurrently on the same bounded pool size as
+        checks. A warning is raised when execution_entity's dead tuple
+        ratio exceeds the database's bloat_warning_ratio (default 0.2).
+        """
+        probes = []
+        for service_config in self.config.get('services', []):
+            service_name = service_config.get('name', 'unknown')
+            timeout = service_config.get('timeout', self.config.get('timeout', 10))
+            
+            if service_config.get('n8n_api_key') and 'url' in service_config:
+                probes.append((service_name, self.health_checker.probe_n8n_executions, {
+                    'base_url': service_config['url'],
+                    'api_key': service_config['n8n_api_key'],
+                    'service_name': service_name,
+                    'window_minutes': service_config.get('execution_window_minutes', 60),
+                    'timeout': timeout
+                }))
+            
+            webhook = service_config.get('webhook_probe')
+            if webhook:
+                auth = None
+                if 'auth' in webhook:
+                    auth = (webhook['auth']['username'], webhook['auth']['password'])
+                probes.append((service_name, self.health_checker.probe_webhook, {
+                    'url': webhook['url'],
+                    'service_name': service_name,
+                    'method': webhook.get('method', 'POST'),
+                    'payload': webhook.get('payload'),
+                    'expected_status': webhook.get('expected_status', 200),
+                    'echo': webhook.get('echo', False),
+                    'auth': auth,
+                    'timeout': webhook.get('timeout', timeout)
+                }))
+        
+            database = service_config.get('database', {})
+            if database.get('collect_stats', True):
+                collect_stats = {'postgresql': self.health_checker.collect_postgres_stats,
+                                 'sqlite': self.health_checker.collect_sqlite_stats}.get(database.get('type'))
+                if collect_stats:
+                    probes.append((service_name, collect_stats, {'db_config': database, 'timeout': timeout}))
+        
+        if not probes:
+            return []
+        
+        metrics = []
+        with ThreadPoolExecutor(max_workers=min(self.max_concurrency, len(probes)),
+                                thread_name_prefix='n8n-probe') as executor:
+            futures = [(service_name, executor.submit(probe, **kwargs)) for service_name, probe, kwargs in probes]
+            for service_name, future in futures:
+                try:
+                    metrics.extend(future.result())
+                except Exception as e:
+                    self.logger.error(f"n8n probe for {service_name} failed: {e}")
+        
+        for metric in metrics:
+            self.metrics_collector.store_metric(metric)
+        
+        if self.exporter:
+            self.exporter.update_metrics(metrics)
+        
+        self._record_results(self._bloat_results(metrics))
+        self.metrics_collector.flush()
+        
+        return metrics
+    
+    def _bloat_results(self, metrics: List[MetricData]) -> List[HealthCheckResult]:
+        """Health results for execution_entity dead tuple ratios"""
+        thresholds = {service.get('database', {}).get('name', 'database'):
+                      service.get('database', {}).get('bloat_warning_ratio', 0.2)
+                      for service in self.config.get('services', [])}
+        
+        results = []
+        for metric in metrics:
+            if metric.metric_name != 'execution_entity_dead_tuple_ratio':
+                continue
+            
+            threshold = thresholds.get(metric.service_name, 0.2)
+            status = 'warning' if metric.value > threshold else 'healthy'
+            results.append(HealthCheckResult(
+                timestamp=metric.timestamp,
+                service_name=metric.service_name,
+                check_type='database_bloat',
+                status=status,
+                response_time=0,
+                message=f"execution_entity dead tuple ratio: {metric.value:.1%}",
+                details={'dead_tuple_ratio': metric.value, 'threshold': threshold}
+            ))
+        return results
+    
+    def collect_logs(self) -> int:
+        """
+        Archive log lines that arrived since the last cycle
+        
+        Returns:
+            Number of lines stored
+        """
+        if not self.log_archive or not self.render_manager:
+            return 0
+        
+        if self._log_tail is None:
+            self._log_services = {service['render_service_id']: service.get('name', service['render_service_id'])
+                                  for service in self.config.get('services', [])
+                                  if service.get('render_service_id')}
+            if not self._log_services:
+                return 0
+            
+            lines = self.config.get('log_archive', {}).get('lines', 100)
+            self._log_tail = self.render_manager.client.follow_service_logs(list(self._log_services), lines=lines)
+        
+        batches = {}
+        for service_id, entry in self._log_tail.poll_once():
+            batches.setdefault(service_id, []).append(self._log_record(entry))
+        
+        stored = 0
+        for service_id, records in batches.items():
+            stored += self.log_archive.ingest(self._log_services[service_id], records)
+        
+        if stored:
+            self.logger.debug(f"Archived {stored} log lines")
+        return stored
+    
+    @staticmethod
+    def _log_record(entry: Any) -> dict:
+        """Normalize a Render log entry for the archive"""
+        record = {'message': LogTail.message(entry), 'level': LogTail.level(entry)}
+        
+        if isinstance(entry, dict):
+            record['id'] = entry.get('id')
+            if entry.get('timestamp'):
+                try:
+                    timestamp = datetime.fromisoformat(str(entry['timestamp']).replace('Z', '+00:00'))
+                    record['timestamp'] = timestamp.timestamp()
+                except ValueError:
+                    pass
+        
+        return record
     
     def run_continuous(self, interval: int = None):
         """Run monitoring continuously"""
         interval = interval or self.config.get('check_interval', 300)
+        scheduler_config = self.config.get('scheduler', {})
+        
+        if self.exporter:
+            self.exporter.start()
+        
+        try:
+            shards = int(self.config.get('shards', 1))
+            if shards > 1:
+                ShardedMonitor(self, shards).run(interval)
+            elif scheduler_config.get('mode', 'adaptive') == 'adaptive':
+                self._run_adaptive(interval, scheduler_config)
+            else:
+                self._run_fixed(interval)
+                
+        except KeyboardInterrupt:
+            self.logger.info("Monitoring stopped by user")
         
+        finally:
+            if self.exporter:
+                self.exporter.stop()
+            self.resource_sampler.stop()
+            self.health_checker.close()
+            self.alert_manager.close()
+            self.metrics_collector.close()
+            if self.log_archive:
+                self.log_archive.close()
+    
+    def _run_fixed(self, interval: int):
+        """Check every service once per interval in a fixed sleep loop"""
         self.logger.info(f"Starting continuous monitoring (interval: {interval}s)")
         
+        while True:
+            start_time = time.time()
+            
+            # Run health checks
+            results = self.run_health_checks()
+            
+            # Collect metrics, logs and clean up
+            self._housekeeping()
+            
+            # Log summary
+            healthy_count = sum(1 for r in results if r.status == 'healthy')
+            warning_count = sum(1 for r in results if r.status == 'warning')
+            critical_count = sum(1 for r in results if r.status == 'critical')
+            
+            self.logger.info(f"Health check complete: {healthy_count} healthy, {warning_count} warnings, {critical_count} critical")
+            
+            # Wait for next interval
+            elapsed = time.time() - start_time
+            sleep_time = max(0, interval - elapsed)
+            time.sleep(sleep_time)
+    
+    def _run_adaptive(self, interval: int, scheduler_config: dict):
+        """
+        Check each service on its own adaptive schedule
+        
+        System checks, metrics collection, log archiving and cleanup still
+        run once per interval. A check that starts more than its tolerance
+        after its due time counts as a missed deadline; per-check lag and
+        per-interval totals are stored as metrics.
+        """
+        scheduler = CheckScheduler(
+            interval,
+            min_interval=scheduler_config.get('min_interval'),
+            max_interval=scheduler_config.get('max_interval'),
+            backoff=scheduler_config.get('backoff', 1.5),
+            jitter=scheduler_config.get('jitter', 0.1)
+        )
+        for service_config in self.config.get('services', []):
+            scheduler.add(service_config.get('name', 'unknown'), service_config, service_config.get('interval'))
+        
+        self.logger.info(f"Starting adaptive monitoring of {len(scheduler)} services "
+                         f"(base interval: {interval}s, min {scheduler.min_interval:.0f}s, "
+                         f"max {scheduler.max_interval:.0f}s)")
+        
+        executor = ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix='health-check')
+        running = {}  # future -> scheduler entry
+        checks_run = missed = 0
+        next_housekeeping = time.monotonic()
+        
         try:
             while True:
-                start_time = time.time()
+                now = time.monotonic()
                 
-                # Run health checks
-                results = self.run_health_checks()
+                for entry in scheduler.pop_due(now):
+                    running[executor.submit(self._run_scheduled_check, entry)] = entry
                 
-                # Collect metrics
-                self.collect_metrics()
+                if now >= next_housekeeping:
+                    self._scheduled_housekeeping(checks_run, missed)
+                    checks_run = missed = 0
+                    next_housekeeping = time.monotonic() + interval
                 
-                # Clean up old data periodically
-                if datetime.now().hour == 2:  # 2 AM
-                    self.metrics_collector.cleanup_old_data()
+                wake = min(filter(None, [scheduler.next_due(), next_housekeeping]))
+                timeout = max(0.0, wake - time.monotonic())
+                if running:
+                    done, _ = wait(running, timeout=timeout, return_when=FIRST_COMPLETED)
+                else:
+                    time.sleep(timeout)
+                    done = ()
                 
-                # Log summary
-                healthy_count = sum(1 for r in results if r.status == 'healthy')
-                warning_count = sum(1 for r in results if r.status == 'warning')
-                critical_count = sum(1 for r in results if r.status == 'critical')
+                for future in done:
+                    entry = running.pop(future)
+                    results = self._service_results(entry['name'], future)
+                    checks_run += 1
+                    missed += self._record_scheduled_check(entry['name'], results,
+                                                           entry.get('lag', 0.0), entry['interval'])
+                    
+                    status = CheckScheduler.worst_status(results)
+                    new_interval = scheduler.reschedule(entry, status)
+                    self.logger.debug(f"{entry['name']} is {status}, next check in ~{new_interval:.0f}s")
+        
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+    
+    def _run_scheduled_check(self, entry: dict) -> List[HealthCheckResult]:
+        """Worker entry point for the adaptive scheduler"""
+        entry['lag'] = max(0.0, time.monotonic() - entry['due'])
+        return self._check_service(entry['payload'])
+    
+    def _record_scheduled_check(self, service_name: str, results: List[HealthCheckResult],
+                                lag: float, interval: float) -> bool:
+        """
+        Record a scheduled check's results and its start lag
+        
+        Lag is measured when a worker picks the check up, so a saturated
+        pool shows up as missed deadlines too.
+        
+        Returns:
+            True if the check missed its deadline
+        """
+        self._record_results(results)
+        self.metrics_collector.store_metric(
+            MetricData(datetime.now(), service_name, 'schedule_lag', lag * 1000, 'ms'))
+        
+        if lag > max(1.0, interval * 0.1):
+            self.logger.warning(f"Check for {service_name} started {lag:.1f}s late")
+            return True
+        return False
+    
+    def _scheduled_housekeeping(self, checks_run: int, missed: int, extra_metrics: List[MetricData] = None):
+        """Per-interval work for scheduled modes: system checks, scheduler stats, housekeeping"""
+        system_results = []
+        if self.config.get('check_system_resources', True):
+            self.resource_sampler.start()
+            system_results = self.health_checker.check_system_resources()
+        self._record_results(system_results)
+        
+        timestamp = datetime.now()
+        scheduler_metrics = [
+            MetricData(timestamp, 'scheduler', 'checks_run', checks_run, ''),
+            MetricData(timestamp, 'scheduler', 'missed_deadlines', missed, ''),
+        ] + (extra_metrics or [])
+        for metric in scheduler_metrics:
+            self.metrics_collector.store_metric(metric)
+        if self.exporter:
+            self.exporter.update_metrics(scheduler_metrics)
+        self.logger.info(f"Ran {checks_run} checks, {missed} missed deadlines in the last interval")
+        
+        self._housekeeping()
+    
+    def _housekeeping(self):
+        """Collect metrics and logs, and clean up old data once a day"""
+        self.collect_metrics()
+        self.collect_n8n_metrics()
+        
+        # Archive new service logs
+        self.collect_logs()
+        
+        # Clean up old data once a day, at the first cycle after cleanup_hour
+        now = datetime.now()
+        if now.hour >= self.config.get('cleanup_hour', 2) and self._last_cleanup != now.date():
+            self._last_cleanup = now.date()
+            self.metrics_collector.cleanup_old_data()
+
+
+class HashRing:
+    """Consistent hash ring mapping service names to shards"""
+    
+    def __init__(self, nodes: List[int] = (), replicas: int = 64):
+        """
+        Initialize the ring
+        
+        Args:
+            nodes: Initial shard IDs
+            replicas: Virtual points per shard; more gives a more even split
+        """
+        self.replicas = replicas
+        self._points = []  # sorted (hash, node)
+        for node in nodes:
+            self.add(node)
+    
+    @staticmethod
+    def _hash(key: str) -> int:
+        return int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), 'big')
+    
+    def add(self, node: int):
+        points = [(self._hash(f"{node}#{i}"), node) for i in range(self.replicas)]
+        self._points = sorted(set(self._points) | set(points))
+    
+    def remove(self, node: int):
+        self._points = [point for point in self._points if point[1] != node]
+    
+    def nodes(self) -> set:
+        return {node for _, node in self._points}
+    
+    def get(self, key: str) -> Optional[int]:
+        """Shard owning a key, or None if the ring is empty"""
+        if not self._points:
+            return None
+        index = bisect.bisect(self._points, (self._hash(key),))
+        return self._points[index % len(self._points)][1]
+
+
+def run_shard_worker(shard_id: int, config: dict, services: List[dict], results, control, parent_pid: int):
+    """
+    Entry point of a sharded monitor worker process
+    
+    Runs the adaptive scheduler over the services assigned to this shard
+    with its own checker and HTTP session, and sends each check's results
+    back to the supervisor over this worker's own pipe. The supervisor may
+    send a new service list on the control queue at any time; None stops
+    the worker.
+    """
+    # Ctrl-C goes to the whole process group; let the supervisor stop us
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    setup_logging(config.get('verbose', False))
+    logger = logging.getLogger(__name__)
+    
+    max_concurrency = max(1, int(config.get('max_concurrency', 20)))
+    default_timeout = config.get('timeout', 10)
+    scheduler_config = config.get('scheduler', {})
+    checker = HealthChecker(timeout=default_timeout, pool_size=max_concurrency)
+    scheduler = CheckScheduler(
+        config.get('check_interval', 300),
+        min_interval=scheduler_config.get('min_interval'),
+        max_interval=scheduler_config.get('max_interval'),
+        backoff=scheduler_config.get('backoff', 1.5),
+        jitter=scheduler_config.get('jitter', 0.1)
+    )
+    
+    def assign(assigned: List[dict]):
+        by_name = {service.get('name', 'unknown'): service for service in assigned}
+        for name in scheduler.names():
+            if name not in by_name:
+                scheduler.remove(name)
+        current = set(scheduler.names())
+        for name, service in by_name.items():
+            if name not in current:
+                scheduler.add(name, service, service.get('interval'))
+        logger.info(f"Shard {shard_id} checking {len(by_name)} services")
+    
+    def run_check(entry: dict) -> List[HealthCheckResult]:
+        entry['lag'] = max(0.0, time.monotonic() - entry['due'])
+        return N8nMonitor.check_service(checker, entry['payload'], default_timeout)
+    
+    assign(services)
+    executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix=f'shard-{shard_id}')
+    running = {}  # future -> scheduler entry
+    
+    try:
+        while os.getppid() == parent_pid:
+            try:
+                while True:
+                    message = control.get_nowait()
+                    if message is None:
+                        return
+                    assign(message)
+            except queue.Empty:
+                pass
+            
+            for entry in scheduler.pop_due():
+                running[executor.submit(run_check, entry)] = entry
+            
+            # Wake at least once a second to pick up control messages
+            next_due = scheduler.next_due()
+            timeout = min(1.0, max(0.0, next_due - time.monotonic())) if next_due else 1.0
+            if running:
+                done, _ = wait(running, timeout=timeout, return_when=FIRST_COMPLETED)
+            else:
+                time.sleep(timeout)
+                done = ()
+            
+            for future in done:
+                entry = running.pop(future)
+                check_results = N8nMonitor._service_results(entry['name'], future)
+                try:
+                    results.send((shard_id, entry['name'], check_results, entry.get('lag', 0.0), entry['interval']))
+                except OSError:
+                    return  # Supervisor is gone
+                scheduler.reschedule(entry, CheckScheduler.worst_status(check_results))
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+        checker.close()
+        results.close()
+
+
+class ShardedMonitor:
+    """Supervises worker processes that each check a shard of the services"""
+    
+    def __init__(self, monitor: 'N8nMonitor', shards: int, restart_delay: float = 1.0,
+                 max_restart_delay: float = 60.0):
+        """
+        Initialize the supervisor
+        
+        Services are split across shards by consistent hashing on their
+        name. Each worker sends its results back over its own pipe, so a
+        worker killed mid-write cannot wedge the others; this process alone
+        writes metrics and runs the alert pipeline.
+        When a worker dies its services move to the surviving shards at
+        once; the worker is restarted with exponential backoff and takes
+        its shard back when it is up.
+        
+        Args:
+            monitor: Monitor providing storage, alerting and configuration
+            shards: Number of worker processes
+            restart_delay: Initial delay before restarting a dead worker
+            max_restart_delay: Upper bound for the restart delay
+        """
+        self.monitor = monitor
+        self.shards = shards
+        self.restart_delay = restart_delay
+        self.max_restart_delay = max_restart_delay
+        self.logger = logging.getLogger(__name__)
+        
+        # Spawn rather than fork: the supervisor runs threads (sampler,
+        # exporter, alert delivery) that must not be copied mid-operation
+        self._context = multiprocessing.get_context('spawn')
+        self._ring = HashRing()
+        self._workers = {}  # shard -> {'process', 'control', 'results', 'services', 'started', 'restarts', 'restart_at'}
+        self._config = monitor.config
+        self._services = {service.get('name', 'unknown'): service
+                          for service in monitor.config.get('services', [])}
+    
+    def _assignments(self) -> Dict[int, List[dict]]:
+        assignments = {shard: [] for shard in self._ring.nodes()}
+        for name, service in self._services.items():
+            shard = self._ring.get(name)
+            if shard is not None:
+                assignments[shard].append(service)
+        return assignments
+    
+    def _rebalance(self):
+        """Send each live worker its services if they changed"""
+        for shard, services in self._assignments().items():
+            worker = self._workers.get(shard)
+            if worker is None or worker['restart_at'] is not None:
+                continue  # Not started yet; it gets its services at start
+            names = {service.get('name', 'unknown') for service in services}
+            if names != worker['services']:
+                worker['services'] = names
+                worker['control'].put(services)
+    
+    def _start_worker(self, shard: int):
+        self._ring.add(shard)
+        services = self._assignments()[shard]
+        control = self._context.Queue()
+        results, sender = self._context.Pipe(duplex=False)
+        process = self._context.Process(
+            target=run_shard_worker,
+            args=(shard, self._config, services, sender, control, os.getpid()),
+            name=f'n8n-monitor-shard-{shard}',
+            daemon=True
+        )
+        process.start()
+        sender.close()  # Only the worker writes, so its exit shows up as EOF
+        
+        worker = self._workers.setdefault(shard, {'restarts': 0, 'restart_at': None})
+        if worker.get('results') is not None:
+            worker['results'].close()
+        worker.update(process=process, control=control, results=results, restart_at=None,
+                      started=time.monotonic(),
+                      services={service.get('name', 'unknown') for service in services})
+        
+        # Shards that covered for this one give its services back
+        self._rebalance()
+    
+    def _check_workers(self):
+        """Move a dead worker's services to the other shards and schedule its restart"""
+        now = time.monotonic()
+        for shard, worker in self._workers.items():
+            if worker['restart_at'] is None and not worker['process'].is_alive():
+                delay = min(self.restart_delay * 2 ** worker['restarts'], self.max_restart_delay)
+                worker['restarts'] += 1
+                worker['restart_at'] = now + delay
+                self.logger.error(f"Shard {shard} worker exited with code {worker['process'].exitcode}, "
+                                  f"restarting in {delay:.0f}s")
                 
-                self.logger.info(f"Health check complete: {healthy_count} healthy, {warning_count} warnings, {critical_count} critical")
+                self._ring.remove(shard)
+                if self._ring.nodes():
+                    self._rebalance()
+            
+            elif worker['restart_at'] is not None and now >= worker['restart_at']:
+                self._start_worker(shard)
+            
+            elif worker['restarts'] and now - worker['started'] > self.max_restart_delay * 10:
+                # Stable again: the next crash restarts quickly
+                worker['restarts'] = 0
+    
+    def run(self, interval: int):
+        """Run until interrupted"""
+        self.logger.info(f"Starting sharded monitoring of {len(self._services)} services "
+                         f"across {self.shards} worker processes")
+        
+        self._config = {**self.monitor.config, 'check_interval': interval,
+                        'verbose': logging.getLogger().isEnabledFor(logging.DEBUG)}
+        # Place every shard on the ring first so workers start with their final split
+        for shard in range(self.shards):
+            self._ring.add(shard)
+        for shard in range(self.shards):
+            self._start_worker(shard)
+        
+        checks_run = missed = 0
+        next_housekeeping = time.monotonic()
+        
+        try:
+            while True:
+                now = time.monotonic()
+                if now >= next_housekeeping:
+                    alive = sum(1 for worker in self._workers.values() if worker['process'].is_alive())
+                    self.monitor._scheduled_housekeeping(checks_run, missed, [
+                        MetricData(datetime.now(), 'scheduler', 'workers_alive', alive, '')
+                    ])
+                    checks_run = missed = 0
+                    next_housekeeping = time.monotonic() + interval
                 
-                # Wait for next interval
-                elapsed = time.time() - start_time
-                sleep_time = max(0, interval - elapsed)
-                time.sleep(sleep_time)
+                self._check_workers()
                 
-        except KeyboardInterrupt:
-            self.logger.info("Monitoring stopped by user")
+                # Drain results until the next housekeeping or worker check
+                deadline = min(next_housekeeping, time.monotonic() + 1.0)
+                while True:
+                    remaining = deadline - time.monotonic()
+                    readers = [worker['results'] for worker in self._workers.values()
+                               if worker.get('results') is not None]
+                    if remaining <= 0 or not readers:
+                        break
+                    for reader in multiprocessing.connection.wait(readers, timeout=remaining):
+                        try:
+                            _, name, results, lag, check_interval = reader.recv()
+                        except (EOFError, OSError):
+                            # Worker exited; _check_workers schedules the restart
+                            self._close_results(reader)
+                            continue
+                        checks_run += 1
+                        missed += self.monitor._record_scheduled_check(name, results, lag, check_interval)
+        
+        finally:
+            self.stop()
+    
+    def _close_results(self, reader):
+        reader.close()
+        for worker in self._workers.values():
+            if worker.get('results') is reader:
+                worker['results'] = None
+    
+    def stop(self, timeout: float = 5.0):
+        """Stop all workers"""
+        for worker in self._workers.values():
+            if worker['process'].is_alive():
+                worker['control'].put(None)
+        
+        deadline = time.monotonic() + timeout
+        for worker in self._workers.values():
+            worker['process'].join(max(0.0, deadline - time.monotonic()))
+            if worker['process'].is_alive():
+                worker['process'].terminate()
+            if worker.get('results') is not None:
+                worker['results'].close()
 
 
 def setup_logging(verbose: bool = False):
@@ -865,12 +4306,49 @@ def main():
     
     # Monitor command
     monitor_parser = subparsers.add_parser("monitor", help="Run continuous monitoring")
+    monitor_parser.add_argument("--exporter-port", type=int,
+                                help="Serve OpenMetrics on this port (overrides config)")
+    monitor_parser.add_argument("--shards", type=int,
+                                help="Split services across this many worker processes (overrides config)")
     
     # Metrics command
     metrics_parser = subparsers.add_parser("metrics", help="Show metrics")
     metrics_parser.add_argument("--service", help="Filter by service name")
     metrics_parser.add_argument("--metric", help="Filter by metric name")
     metrics_parser.add_argument("--hours", type=int, default=24, help="Hours of data to show")
+    metrics_parser.add_argument("--resolution", choices=["auto", "raw", "1m", "1h", "1d"], default="auto",
+                                help="Data resolution (auto picks the coarsest rollup that fits --hours)")
+    metrics_parser.add_argument("--bucket", type=int,
+                                help="Aggregate into buckets of this many seconds (e.g. 3600 for hourly)")
+    metrics_parser.add_argument("--aggregate", choices=list(MetricsCollector.AGGREGATES), default="avg",
+                                help="Value reported per --bucket")
+    metrics_parser.add_argument("--latency", action="store_true",
+                                help="Show health check latency percentiles instead of metric values")
+    metrics_parser.add_argument("--check-type", help="Filter latency percentiles by check type")
+    
+    # Export command
+    export_parser = subparsers.add_parser("export", help="Export raw metrics and health check history")
+    export_parser.add_argument("--table", choices=["all", *MetricsCollector.EXPORT_COLUMNS], default="all",
+                               help="Table to export")
+    export_parser.add_argument("--format", choices=list(MetricsCollector.EXPORT_FORMATS), default="ndjson",
+                               help="Output format (ndjson is gzip-compressed; parquet and arrow need pyarrow)")
+    export_parser.add_argument("--since", type=datetime.fromisoformat,
+                               help="Start of the range, ISO 8601 local time (default: all data)")
+    export_parser.add_argument("--until", type=datetime.fromisoformat,
+                               help="End of the range, exclusive (default: now)")
+    export_parser.add_argument("--service", help="Filter by service name")
+    export_parser.add_argument("--output-dir", default=".", help="Directory for the exported files")
+    export_parser.add_argument("--batch-size", type=int, default=20000, help="Rows read and written per batch")
+    
+    # Logs command
+    logs_parser = subparsers.add_parser("logs", help="Search the local log archive")
+    logs_parser.add_argument("term", nargs="?", help="Word or phrase to search for")
+    logs_parser.add_argument("--service", help="Filter by service name")
+    logs_parser.add_argument("--level", help="Filter by log level")
+    logs_parser.add_argument("--hours", type=float, default=24, help="Hours of logs to search")
+    logs_parser.add_argument("--limit", type=int, default=100, help="Maximum lines to show")
+    logs_parser.add_argument("--by-service", action="store_true",
+                             help="Show matching line counts per service instead of lines")
     
     args = parser.parse_args()
     
@@ -902,8 +4380,34 @@ def main():
         
         elif args.command == "monitor":
             monitor = N8nMonitor(args.config)
+            if args.shards:
+                monitor.config['shards'] = args.shards
+            if args.exporter_port:
+                monitor.exporter = MetricsExporter(
+                    host=monitor.config.get('exporter', {}).get('host', '0.0.0.0'),
+                    port=args.exporter_port
+                )
             monitor.run_continuous(args.interval)
         
+        elif args.command == "metrics" and args.latency:
+            monitor = N8nMonitor(args.config)
+            since = datetime.now() - timedelta(hours=args.hours)
+            
+            percentiles = monitor.metrics_collector.get_latency_percentiles(
+                service_name=args.service,
+                check_type=args.check_type,
+                since=since
+            )
+            
+            if percentiles:
+                print(f"Latency over the last {args.hours}h (ms):")
+                print(f"{'service':<30} {'check':<20} {'count':>8} {'p50':>10} {'p95':>10} {'p99':>10} {'max':>10}")
+                for entry in percentiles:
+                    print(f"{entry['service_name']:<30} {entry['check_type']:<20} {entry['count']:>8} "
+                          f"{entry['p50']:>10.2f} {entry['p95']:>10.2f} {entry['p99']:>10.2f} {entry['max']:>10.2f}")
+            else:
+                print("No latency data found")
+        
         elif args.command == "metrics":
             monitor = N8nMonitor(args.config)
             since = datetime.now() - timedelta(hours=args.hours)
@@ -911,18 +4415,65 @@ def main():
             metrics = monitor.metrics_collector.get_metrics(
                 service_name=args.service,
                 metric_name=args.metric,
-                since=since
+                since=since,
+                resolution=args.resolution,
+                bucket=args.bucket,
+                aggregate=args.aggregate
             )
             
             if metrics:
                 print(f"Found {len(metrics)} metrics:")
                 for metric in metrics[-20:]:  # Show last 20
-                    print(f"{metric.timestamp.strftime('%Y-%m-%d %H:%M:%S')} - "
-                          f"{metric.service_name}.{metric.metric_name}: "
-                          f"{metric.value} {metric.unit}")
+                    line = (f"{metric.timestamp.strftime('%Y-%m-%d %H:%M:%S')} - "
+                            f"{metric.service_name}.{metric.metric_name}: "
+                            f"{metric.value} {metric.unit}")
+                    if isinstance(metric, MetricRollup):
+                        aggregate = args.aggregate if args.bucket else 'avg'
+                        line += (f" ({aggregate} over {metric.count} samples per {metric.resolution}, "
+                                 f"min {metric.min_value}, max {metric.max_value})")
+                    print(line)
             else:
                 print("No metrics found")
         
+        elif args.command == "export":
+            monitor = N8nMonitor(args.config)
+            tables = list(MetricsCollector.EXPORT_COLUMNS) if args.table == "all" else [args.table]
+            
+            for table in tables:
+                path = os.path.join(args.output_dir, table + MetricsCollector.EXPORT_FORMATS[args.format])
+                start = time.time()
+                count = monitor.metrics_collector.export(
+                    table, path, args.format,
+                    since=args.since,
+                    until=args.until,
+                    service_name=args.service,
+                    batch_size=args.batch_size
+                )
+                print(f"Exported {count} {table} rows to {path} in {time.time() - start:.1f}s")
+        
+        elif args.command == "logs":
+            monitor = N8nMonitor(args.config)
+            log_config = monitor.config.get('log_archive', {})
+            archive = monitor.log_archive or LogArchive(log_config.get('path', '/tmp/n8n_logs.db'))
+            since = datetime.now() - timedelta(hours=args.hours)
+            
+            if args.by_service:
+                counts = archive.count_by_service(args.term, since=since, level=args.level)
+                if counts:
+                    for service_name, count in counts.items():
+                        print(f"{service_name:<30} {count:>8}")
+                else:
+                    print("No matching logs found")
+            else:
+                entries = archive.search(args.term, service_name=args.service, since=since,
+                                         level=args.level, limit=args.limit)
+                if entries:
+                    for entry in reversed(entries):
+                        print(f"{entry['timestamp'].strftime('%Y-%m-%d %H:%M:%S')} "
+                              f"[{entry['service_name']}] {entry['message']}")
+                else:
+                    print("No matching logs found")
+        
         else:
             parser.print_help()
     
@@ -9,12 +9,22 @@ n8n deployments, including service creation, monitoring, and maintenance.
 import os
 import sys
 import json
+import math
 import time
 import argparse
+import asyncio
 import logging
-from typing import Dict, List, Optional, Any
+import re
+import sqlite3
+import random
+import threading
+from collections import OrderedDict
+from email.utils import parsedate_to_datetime
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from itertools import islice
+from typing import Dict, List, Optional, Any, Iterator, Callable, Iterable
 from dataclasses import dataclass
-from urllib.parse import urljoin
+from urllib.parse import urljoin, urlsplit, urlencode
 import requests
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
@@ -42,33 +52,333 @@ class RenderAPIError(Exception):
         self.response_data = response_data
 
 
+class ResponseCache:
+    """LRU cache of GET responses with optional SQLite backing"""
+    
+    def __init__(self, max_entries: int = 256, path: str = None,
+                 persist: Callable[[str], bool] = None):
+        """
+        Initialize the response cache
+        
+        Args:
+            max_entries: Maximum number of entries kept in memory
+            path: Optional SQLite file that persists entries across runs,
+                readable by the owner only
+            persist: Whether a key may be written to the SQLite file;
+                entries it rejects are kept in memory only
+        """
+        self.max_entries = max_entries
+        self.path = path
+        self.persist = persist or (lambda key: True)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn = None
+        
+        if path:
+            os.close(os.open(path, os.O_RDWR | os.O_CREAT, 0o600))
+            os.chmod(path, 0o600)
+            self._conn = sqlite3.connect(path, check_same_thread=False)
+            self._conn.execute('''
+                CREATE TABLE IF NOT EXISTS response_cache (
+                    key TEXT PRIMARY KEY,
+                    etag TEXT,
+                    expires_at REAL NOT NULL,
+                    data TEXT NOT NULL
+                )
+            ''')
+            self._conn.commit()
+            
+            # Drop entries an earlier version persisted but should not have
+            keys = [row[0] for row in self._conn.execute("SELECT key FROM response_cache")]
+            with self._conn:
+                self._conn.executemany(
+                    "DELETE FROM response_cache WHERE key = ?",
+                    [(key,) for key in keys if not self.persist(key)]
+                )
+    
+    def get(self, key: str) -> Optional[dict]:
+        """
+        Look up a cache entry
+        
+        Args:
+            key: Request path including query string
+            
+        Returns:
+            Entry with 'data', 'etag' and 'expires_at' keys, or None
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                return entry
+            
+            if self._conn is None or not self.persist(key):
+                return None
+            
+            row = self._conn.execute(
+                "SELECT etag, expires_at, data FROM response_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            
+            entry = {'etag': row[0], 'expires_at': row[1], 'data': json.loads(row[2])}
+            self._remember(key, entry)
+            return entry
+    
+    def set(self, key: str, data: dict, ttl: float, etag: str = None):
+        """
+        Store a response
+        
+        Args:
+            key: Request path including query string
+            data: Parsed response body
+            ttl: Seconds the entry is served without revalidation
+            etag: ETag returned by the API, if any
+        """
+        entry = {'etag': etag, 'expires_at': time.time() + ttl, 'data': data}
+        
+        with self._lock:
+            self._remember(key, entry)
+            if self._conn is not None and self.persist(key):
+                with self._conn:
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO response_cache (key, etag, expires_at, data) VALUES (?, ?, ?, ?)",
+                        (key, etag, entry['expires_at'], json.dumps(data))
+                    )
+    
+    def invalidate(self, path: str, prefix: bool = False):
+        """
+        Drop cached entries for a path
+        
+        Args:
+            path: Request path without query string
+            prefix: Also drop entries for every sub-path
+        """
+        def matches(key: str) -> bool:
+            key_path = key.split('?', 1)[0]
+            return key_path == path or (prefix and key_path.startswith(path + '/'))
+        
+        with self._lock:
+            for key in [k for k in self._entries if matches(k)]:
+                del self._entries[key]
+            
+            if self._conn is not None:
+                keys = [row[0] for row in self._conn.execute("SELECT key FROM response_cache")]
+                with self._conn:
+                    self._conn.executemany(
+                        "DELETE FROM response_cache WHERE key = ?",
+                        [(key,) for key in keys if matches(key)]
+                    )
+    
+    def clear(self):
+        """Drop all cached entries"""
+        with self._lock:
+            self._entries.clear()
+            if self._conn is not None:
+                with self._conn:
+                    self._conn.execute("DELETE FROM response_cache")
+    
+    def _remember(self, key: str, entry: dict):
+        """Insert into the in-memory LRU, evicting the oldest entries"""
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+class RateLimiter:
+    """
+    Thread-safe token bucket shared by every caller of a RenderAPIClient
+    
+    Callers reserve a token and then sleep until it is due, so concurrent
+    callers are queued in arrival order instead of all retrying at once.
+    The bucket learns from Retry-After and RateLimit-* response headers:
+    by default requests are unthrottled until the server reports its
+    limits, and the pace follows what it reports, up or down.
+    """
+    
+    def __init__(self, rate: float = float('inf'), burst: int = 20):
+        """
+        Initialize the rate limiter
+        
+        Args:
+            rate: Maximum sustained requests per second; unlimited by default
+            burst: Maximum tokens accumulated while idle
+        """
+        self.rate = rate
+        self.burst = burst
+        self.logger = logging.getLogger(__name__)
+        
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._paced_rate = None
+        self._paced_until = 0.0
+        self._lock = threading.Lock()
+    
+    def _current_rate(self, now: float) -> float:
+        """Pace learned from headers, capped at the configured rate"""
+        if self._paced_rate is not None and now < self._paced_until:
+            return min(self.rate, self._paced_rate)
+        return self.rate
+    
+    def reserve(self) -> float:
+        """
+        Reserve a token
+        
+        Returns:
+            Seconds the caller must wait before sending its request
+        """
+        with self._lock:
+            now = time.monotonic()
+            rate = self._current_rate(now)
+            
+            # No tokens accrue while paused
+            elapsed = max(0.0, now - max(self._updated, self._paused_until))
+            if math.isinf(rate):
+                if elapsed > 0:
+                    self._tokens = float(self.burst)
+            else:
+                self._tokens = min(self.burst, self._tokens + elapsed * rate)
+            self._updated = now
+            
+            # The balance may go negative: each reservation queues behind
+            # the ones already waiting, spaced out after any pause
+            self._tokens -= 1
+            wait = -self._tokens / rate if self._tokens < 0 else 0.0
+            return max(0.0, self._paused_until - now) + wait
+    
+    def acquire(self):
+        """Block until a request may be sent"""
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+    
+    async def acquire_async(self):
+        """Wait until a request may be sent without blocking the event loop"""
+        wait = self.reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+    
+    def pause(self, seconds: float):
+        """Hold all requests for the given number of seconds"""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+            self._tokens = min(self._tokens, 0.0)
+    
+    def observe(self, status_code: int, headers: dict):
+        """
+        Learn from a response's rate limit headers
+        
+        Args:
+            status_code: HTTP status code
+            headers: Response headers
+        """
+        retry_after = self._parse_retry_after(headers.get('Retry-After'))
+        if status_code == 429:
+            wait = retry_after if retry_after is not None else 1.0
+            self.logger.warning(f"Rate limited by Render API, pausing requests for {wait:.1f}s")
+            self.pause(wait)
+        
+        try:
+            remaining = int(headers['Ratelimit-Remaining'])
+            reset = float(headers['Ratelimit-Reset'])
+        except (KeyError, TypeError, ValueError):
+            return
+        
+        if remaining <= 0:
+            self.pause(reset)
+            return
+        
+        with self._lock:
+            # Never spend more than the server says is left in this window,
+            # and spread what is left over the time until it resets
+            now = time.monotonic()
+            self._tokens = min(self._tokens, float(remaining))
+            if reset > 0:
+                self._paced_rate = remaining / reset
+                self._paced_until = now + reset
+    
+    @staticmethod
+    def _parse_retry_after(value: str) -> Optional[float]:
+        """Parse a Retry-After header given in seconds or as an HTTP date"""
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+        except (TypeError, ValueError):
+            return None
+
+
 class RenderAPIClient:
     """Render API client for n8n deployment management"""
     
     BASE_URL = "https://api.render.com/v1"
     
-    def __init__(self, api_key: str, timeout: int = 30):
+    # Seconds a cached GET response is served before revalidation
+    DEFAULT_CACHE_TTLS = {
+        'services': 30,
+        'service': 5,
+        'env_vars': 60,
+        'deploys': 10,
+    }
+    
+    # Cacheable endpoints; anything else (e.g. logs) is always fetched
+    CACHE_ROUTES = [
+        ('services', re.compile(r'^/services$')),
+        ('service', re.compile(r'^/services/[^/]+$')),
+        ('env_vars', re.compile(r'^/services/[^/]+/env-vars$')),
+        ('deploys', re.compile(r'^/services/[^/]+/deploys$')),
+    ]
+    
+    # Cached endpoints whose responses hold secrets; never written to cache_path
+    MEMORY_ONLY_CACHE = {'env_vars'}
+    
+    # Times a rate-limited (429) request is queued again before failing
+    MAX_RATE_LIMIT_RETRIES = 5
+    
+    def __init__(self, api_key: str, timeout: int = 30, cache: bool = True,
+                 cache_ttls: dict = None, cache_size: int = 256, cache_path: str = None,
+                 rate_limiter: RateLimiter = None):
         """
         Initialize the Render API client
         
         Args:
             api_key: Render API key
             timeout: Request timeout in seconds
+            cache: Cache GET responses
+            cache_ttls: Per-endpoint TTL overrides (see DEFAULT_CACHE_TTLS)
+            cache_size: Maximum number of responses kept in memory
+            cache_path: Optional SQLite file persisting the cache across runs
+            rate_limiter: Rate limiter to share with other clients (a
+                default one is created per client otherwise)
         """
         self.api_key = api_key
         self.timeout = timeout
+        self.rate_limiter = rate_limiter or RateLimiter()
         self.session = self._create_session()
         self.logger = logging.getLogger(__name__)
+        
+        self.cache_ttls = {**self.DEFAULT_CACHE_TTLS, **(cache_ttls or {})}
+        self.cache = ResponseCache(cache_size, cache_path, persist=self._cache_persists) if cache else None
+        
+        self._waiter = None
+        self._waiter_lock = threading.Lock()
     
     def _create_session(self) -> requests.Session:
         """Create a requests session with retry strategy"""
         session = requests.Session()
         
-        # Configure retry strategy
+        # Configure retry strategy; 429s are queued by the rate limiter
+        # instead, so concurrent callers don't retry in lockstep
         retry_strategy = Retry(
             total=3,
             backoff_factor=1,
-            status_forcelist=[429, 500, 502, 503, 504],
+            status_forcelist=[500, 502, 503, 504],
         )
         
         adapter = HTTPAdapter(max_retries=retry_strategy)
@@ -84,7 +394,8 @@ class RenderAPIClient:
         
         return session
     
-    def _make_request(self, method: str, endpoint: str, data: dict = None) -> dict:
+    def _make_request(self, method: str, endpoint: str, data: Any = None,
+                      refresh: bool = False) -> Any:
         """
         Make a request to the Render API
         
@@ -92,6 +403,7 @@ class RenderAPIClient:
             method: HTTP method
             endpoint: API endpoint
             data: Request data
+            refresh: Bypass fresh cache entries (ETag revalidation still applies)
             
         Returns:
             Response data
@@ -100,18 +412,42 @@ class RenderAPIClient:
             RenderAPIError: On API errors
         """
         url = urljoin(self.BASE_URL, endpoint.lstrip('/'))
+        cache_key = '/' + endpoint.lstrip('/')
+        path = urlsplit(cache_key).path
+        
+        ttl = self._cache_ttl(path) if method == "GET" and self.cache is not None else None
+        cached = self.cache.get(cache_key) if ttl is not None else None
+        
+        if cached is not None and not refresh and cached['expires_at'] > time.time():
+            self.logger.debug(f"Cache hit for {cache_key}")
+            return cached['data']
+        
+        headers = {}
+        if cached is not None and cached['etag']:
+            headers['If-None-Match'] = cached['etag']
         
         try:
-            self.logger.debug(f"Making {method} request to {url}")
+            for attempt in range(self.MAX_RATE_LIMIT_RETRIES + 1):
+                self.rate_limiter.acquire()
+                self.logger.debug(f"Making {method} request to {url}")
+                
+                if data is not None:
+                    response = self.session.request(
+                        method, url, json=data, headers=headers, timeout=self.timeout
+                    )
+                else:
+                    response = self.session.request(
+                        method, url, headers=headers, timeout=self.timeout
+                    )
+                
+                self.rate_limiter.observe(response.status_code, response.headers)
+                if response.status_code != 429:
+                    break
             
-            if data:
-                response = self.session.request(
-                    method, url, json=data, timeout=self.timeout
-                )
-            else:
-                response = self.session.request(
-                    method, url, timeout=self.timeout
-                )
+            # Revalidated: the cached body is still current
+            if response.status_code == 304 and cached is not None:
+                self.cache.set(cache_key, cached['data'], ttl, cached['etag'])
+                return cached['data']
             
             # Handle response
             if response.status_code >= 400:
@@ -124,73 +460,149 @@ class RenderAPIClient:
                 error_message = error_data.get('message', f'API request failed with status {response.status_code}')
                 raise RenderAPIError(error_message, response.status_code, error_data)
             
-            # Return JSON response
-            return response.json() if response.text else {}
+            result = response.json() if response.text else {}
+            
+            if ttl is not None:
+                self.cache.set(cache_key, result, ttl, response.headers.get('ETag'))
+            elif method != "GET" and self.cache is not None:
+                self._invalidate_cache(path)
+            
+            return result
             
         except requests.exceptions.RequestException as e:
             raise RenderAPIError(f"Request failed: {str(e)}")
     
-    def get_services(self, service_type: str = None) -> List[RenderService]:
+    def _cache_route(self, path: str) -> Optional[str]:
+        """Name of the cacheable endpoint a path belongs to, if any"""
+        for name, pattern in self.CACHE_ROUTES:
+            if pattern.match(path):
+                return name
+        return None
+    
+    def _cache_ttl(self, path: str) -> Optional[float]:
+        """Get the cache TTL for a GET path, or None if it is not cacheable"""
+        name = self._cache_route(path)
+        ttl = self.cache_ttls.get(name) if name else None
+        return ttl if ttl and ttl > 0 else None
+    
+    def _cache_persists(self, key: str) -> bool:
+        """Whether a cache key may be written to the persistent cache file"""
+        return self._cache_route(urlsplit(key).path) not in self.MEMORY_ONLY_CACHE
+    
+    def _invalidate_cache(self, path: str):
         """
-        Get list of services
+        Invalidate cached reads affected by a write to path
+        
+        Any write under /services/{id} drops everything cached for that
+        service, and every write drops the cached service lists.
+        """
+        self.cache.invalidate('/services')
+        
+        match = re.match(r'^/services/([^/]+)', path)
+        if match:
+            self.cache.invalidate(f"/services/{match.group(1)}", prefix=True)
+    
+    def _paginate(self, endpoint: str, item_key: str, params: dict = None,
+                  page_size: int = 100, refresh: bool = False) -> Iterator[dict]:
+        """
+        Lazily follow Render's cursor pagination
+        
+        List endpoints return an array of {"cursor": ..., "<item_key>": ...}
+        entries; the cursor of the last entry fetches the next page. Pages
+        are only requested as the caller consumes items.
+        
+        Args:
+            endpoint: API endpoint
+            item_key: Key holding the item in each entry (e.g. 'service')
+            params: Additional query parameters
+            page_size: Items requested per page (Render allows up to 100)
+            refresh: Bypass fresh cache entries
+            
+        Yields:
+            Item data
+        """
+        cursor = None
+        
+        while True:
+            query = dict(params or {}, limit=page_size)
+            if cursor:
+                query['cursor'] = cursor
+            
+            response = self._make_request("GET", f"{endpoint}?{urlencode(query)}", refresh=refresh)
+            
+            # Older responses wrap a single page in {"<item_key>s": [...]}
+            if isinstance(response, dict):
+                yield from response.get(f"{item_key}s", [])
+                return
+            
+            for entry in response:
+                yield entry.get(item_key, entry)
+            
+            cursor = response[-1].get('cursor') if response else None
+            if len(response) < page_size or not cursor:
+                return
+    
+    @staticmethod
+    def _parse_service(service_data: dict, default_status: str = 'unknown') -> RenderService:
+        """Build a RenderService from API service data"""
+        details = service_data.get('serviceDetails', {})
+        return RenderService(
+            id=service_data['id'],
+            name=service_data['name'],
+            type=service_data['type'],
+            status=details.get('status', default_status),
+            url=details.get('url'),
+            plan=details.get('plan'),
+            region=details.get('region'),
+            created_at=service_data.get('createdAt'),
+            updated_at=service_data.get('updatedAt')
+        )
+    
+    def iter_services(self, service_type: str = None, page_size: int = 100,
+                      refresh: bool = False) -> Iterator[RenderService]:
+        """
+        Iterate over all services, fetching pages as they are consumed
         
         Args:
             service_type: Filter by service type (web, pserv, cron, worker)
+            page_size: Services requested per page
+            refresh: Bypass fresh cache entries
             
-        Returns:
-            List of services
+        Yields:
+            Services
         """
         params = {}
         if service_type:
             params['type'] = service_type
         
-        endpoint = "/services"
-        if params:
-            query_string = "&".join(f"{k}={v}" for k, v in params.items())
-            endpoint += f"?{query_string}"
-        
-        response = self._make_request("GET", endpoint)
-        
-        services = []
-        for service_data in response.get('services', []):
-            service = RenderService(
-                id=service_data['id'],
-                name=service_data['name'],
-                type=service_data['type'],
-                status=service_data.get('serviceDetails', {}).get('status', 'unknown'),
-                url=service_data.get('serviceDetails', {}).get('url'),
-                plan=service_data.get('serviceDetails', {}).get('plan'),
-                region=service_data.get('serviceDetails', {}).get('region'),
-                created_at=service_data.get('createdAt'),
-                updated_at=service_data.get('updatedAt')
-            )
-            services.append(service)
+        for service_data in self._paginate("/services", 'service', params, page_size, refresh):
+            yield self._parse_service(service_data)
+    
+    def get_services(self, service_type: str = None) -> List[RenderService]:
+        """
+        Get list of services
         
-        return services
+        Args:
+            service_type: Filter by service type (web, pserv, cron, worker)
+            
+        Returns:
+            List of services
+        """
+        return list(self.iter_services(service_type))
     
-    def get_service(self, service_id: str) -> RenderService:
+    def get_service(self, service_id: str, refresh: bool = False) -> RenderService:
         """
         Get service details
         
         Args:
             service_id: Service ID
+            refresh: Bypass fresh cache entries
             
         Returns:
             Service details
         """
-        response = self._make_request("GET", f"/services/{service_id}")
-        
-        return RenderService(
-            id=response['id'],
-            name=response['name'],
-            type=response['type'],
-            status=response.get('serviceDetails', {}).get('status', 'unknown'),
-            url=response.get('serviceDetails', {}).get('url'),
-            plan=response.get('serviceDetails', {}).get('plan'),
-            region=response.get('serviceDetails', {}).get('region'),
-            created_at=response.get('createdAt'),
-            updated_at=response.get('updatedAt')
-        )
+        response = self._make_request("GET", f"/services/{service_id}", refresh=refresh)
+        return self._parse_service(response)
     
     def create_web_service(self, config: dict) -> RenderService:
         """
@@ -204,17 +616,7 @@ class RenderAPIClient:
         """
         response = self._make_request("POST", "/services", config)
         
-        return RenderService(
-            id=response['id'],
-            name=response['name'],
-            type=response['type'],
-            status=response.get('serviceDetails', {}).get('status', 'creating'),
-            url=response.get('serviceDetails', {}).get('url'),
-            plan=response.get('serviceDetails', {}).get('plan'),
-            region=response.get('serviceDetails', {}).get('region'),
-            created_at=response.get('createdAt'),
-            updated_at=response.get('updatedAt')
-        )
+        return self._parse_service(response, default_status='creating')
     
     def create_database_service(self, config: dict) -> RenderService:
         """
@@ -244,24 +646,69 @@ class RenderAPIClient:
         except RenderAPIError:
             return False
     
-    def get_environment_variables(self, service_id: str) -> dict:
+    def get_environment_variables(self, service_id: str, refresh: bool = False) -> dict:
         """
         Get environment variables for a service
         
         Args:
             service_id: Service ID
+            refresh: Bypass fresh cache entries
             
         Returns:
             Environment variables
         """
-        response = self._make_request("GET", f"/services/{service_id}/env-vars")
-        
         env_vars = {}
-        for env_var in response.get('envVars', []):
+        for env_var in self._paginate(f"/services/{service_id}/env-vars", 'envVar', refresh=refresh):
             env_vars[env_var['key']] = env_var.get('value', '')
         
         return env_vars
     
+    def sync_environment_variables(self, service_id: str, desired: Dict[str, Optional[str]],
+                                   prune: bool = False) -> dict:
+        """
+        Bring a service's environment variables to a desired state
+        
+        The current set is fetched once and diffed against desired; if
+        anything differs, the complete new set is written in a single bulk
+        request. A sync with nothing to change sends no writes.
+        
+        Args:
+            service_id: Service ID
+            desired: Variables to set; a value of None removes the variable
+            prune: Also remove variables that are not in desired
+            
+        Returns:
+            Dict with 'added', 'updated' and 'removed' key lists
+            
+        Raises:
+            RenderAPIError: If reading or writing the variables fails
+        """
+        current = self.get_environment_variables(service_id, refresh=True)
+        
+        target = {} if prune else dict(current)
+        for key, value in desired.items():
+            if value is None:
+                target.pop(key, None)
+            else:
+                target[key] = value
+        
+        changes = {
+            'added': sorted(key for key in target if key not in current),
+            'updated': sorted(key for key in target if key in current and current[key] != target[key]),
+            'removed': sorted(key for key in current if key not in target),
+        }
+        
+        if any(changes.values()):
+            self._make_request(
+                "PUT", f"/services/{service_id}/env-vars",
+                [{"key": key, "value": value} for key, value in target.items()]
+            )
+            self.logger.info(f"Synced environment for {service_id}: "
+                             f"{len(changes['added'])} added, {len(changes['updated'])} updated, "
+                             f"{len(changes['removed'])} removed")
+        
+        return changes
+    
     def set_environment_variable(self, service_id: str, key: str, value: str) -> bool:
         """
         Set an environment variable
@@ -281,6 +728,19 @@ class RenderAPIClient:
         except RenderAPIError:
             return False
     
+    def iter_deployments(self, service_id: str, page_size: int = 20) -> Iterator[dict]:
+        """
+        Iterate over a service's deployments, newest first
+        
+        Args:
+            service_id: Service ID
+            page_size: Deployments requested per page
+            
+        Yields:
+            Deployments
+        """
+        yield from self._paginate(f"/services/{service_id}/deploys", 'deploy', page_size=page_size)
+    
     def get_deployments(self, service_id: str, limit: int = 10) -> List[dict]:
         """
         Get deployments for a service
@@ -292,8 +752,8 @@ class RenderAPIClient:
         Returns:
             List of deployments
         """
-        response = self._make_request("GET", f"/services/{service_id}/deploys?limit={limit}")
-        return response.get('deploys', [])
+        page_size = max(1, min(limit, 100))
+        return list(islice(self.iter_deployments(service_id, page_size), limit))
     
     def trigger_deployment(self, service_id: str) -> dict:
         """
@@ -316,29 +776,33 @@ class RenderAPIClient:
             timeout: Maximum wait time in seconds
             
         Returns:
-            True if service is ready, False if timeout
+            True if service is ready, False if failed or timeout
+        """
+        return self.wait_for_many([service_id], timeout)[service_id].result()
+    
+    def wait_for_many(self, service_ids: Iterable[str], timeout: int = 600,
+                      callback: Callable[[str, bool], None] = None) -> Dict[str, Future]:
         """
-        start_time = time.time()
+        Wait for several services to be ready without blocking
         
-        while time.time() - start_time < timeout:
-            try:
-                service = self.get_service(service_id)
-                
-                if service.status in ['live', 'running']:
-                    return True
-                elif service.status in ['failed', 'error']:
-                    self.logger.error(f"Service {service_id} failed to deploy")
-                    return False
-                
-                self.logger.info(f"Service {service_id} status: {service.status}, waiting...")
-                time.sleep(10)
-                
-            except RenderAPIError as e:
-                self.logger.error(f"Error checking service status: {e}")
-                time.sleep(5)
+        All pending services share one poller, which answers them from a
+        single service list request per tick.
         
-        self.logger.error(f"Timeout waiting for service {service_id} to be ready")
-        return False
+        Args:
+            service_ids: Service IDs
+            timeout: Maximum wait time in seconds per service
+            callback: Optional callable(service_id, ready) run on completion
+            
+        Returns:
+            Future per service ID resolving to True if the service is ready,
+            False if it failed or timed out
+        """
+        with self._waiter_lock:
+            if self._waiter is None:
+                self._waiter = DeploymentWaiter(self)
+        
+        return {service_id: self._waiter.watch(service_id, timeout, callback)
+                for service_id in service_ids}
     
     def get_service_logs(self, service_id: str, lines: int = 100) -> List[str]:
         """
@@ -352,25 +816,346 @@ class RenderAPIClient:
             List of log lines
         """
         try:
-            response = self._make_request("GET", f"/services/{service_id}/logs?lines={lines}")
-            return response.get('logs', [])
+            return self._fetch_logs(service_id, lines)[0]
         except RenderAPIError:
             return []
+    
+    def _fetch_logs(self, service_id: str, lines: int, start_time: str = None) -> tuple:
+        """Fetch one page of logs, returning (entries, next start time or None)"""
+        params = {'lines': lines}
+        if start_time:
+            params['startTime'] = start_time
+        
+        response = self._make_request("GET", f"/services/{service_id}/logs?{urlencode(params)}")
+        if isinstance(response, list):
+            return response, None
+        return response.get('logs', []), response.get('nextStartTime')
+    
+    def follow_service_logs(self, service_ids: Iterable[str], pattern: str = None,
+                            levels: Iterable[str] = None, lines: int = 100,
+                            interval: float = 2.0, max_interval: float = 15.0,
+                            backlog: bool = True) -> 'LogTail':
+        """
+        Follow logs for one or more services as new lines arrive
+        
+        Args:
+            service_ids: Service IDs to tail
+            pattern: Optional regex a line must match
+            levels: Optional log levels to keep (e.g. error, warn)
+            lines: Lines requested per poll; also the per-service memory bound
+            interval: Poll interval in seconds while logs are active
+            max_interval: Upper bound for the poll interval while idle
+            backlog: Yield the lines already present on the first poll
+            
+        Returns:
+            LogTail iterator yielding (service_id, entry) tuples
+        """
+        return LogTail(self, service_ids, pattern, levels, lines, interval, max_interval, backlog)
+
+
+class DeploymentWaiter:
+    """Tracks in-flight deployments for many services with one shared poller"""
+    
+    READY_STATUSES = ('live', 'running')
+    FAILED_STATUSES = ('failed', 'error')
+    
+    def __init__(self, client: RenderAPIClient, initial_delay: float = 2.0,
+                 max_delay: float = 30.0, backoff: float = 1.5, jitter: float = 0.2):
+        """
+        Initialize the deployment waiter
+        
+        Args:
+            client: Render API client used for polling
+            initial_delay: Seconds before the first poll after a new watch
+            max_delay: Upper bound for the poll interval in seconds
+            backoff: Multiplier applied to the poll interval after each tick
+            jitter: Random fraction added to or removed from each interval
+        """
+        self.client = client
+        self.initial_delay = initial_delay
+        self.max_delay = max_delay
+        self.backoff = backoff
+        self.jitter = jitter
+        self.logger = logging.getLogger(__name__)
+        
+        self._pending = {}  # service_id -> (future, deadline)
+        self._delay = initial_delay
+        self._condition = threading.Condition()
+        self._thread = None
+    
+    def watch(self, service_id: str, timeout: float = 600,
+              callback: Callable[[str, bool], None] = None) -> Future:
+        """
+        Start waiting for a service to be ready
+        
+        Args:
+            service_id: Service ID
+            timeout: Maximum wait time in seconds
+            callback: Optional callable(service_id, ready) run on completion
+            
+        Returns:
+            Future resolving to True if ready, False if failed or timed out
+        """
+        with self._condition:
+            if service_id in self._pending:
+                future = self._pending[service_id][0]
+            else:
+                future = Future()
+                self._pending[service_id] = (future, time.time() + timeout)
+            
+            # Poll soon so fast deployments are noticed within seconds
+            self._delay = self.initial_delay
+            self._condition.notify()
+            
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='deployment-waiter', daemon=True)
+                self._thread.start()
+        
+        if callback:
+            future.add_done_callback(lambda f: callback(service_id, f.result()))
+        
+        return future
+    
+    def _run(self):
+        """Poll until no services are pending"""
+        while True:
+            with self._condition:
+                if not self._pending:
+                    self._thread = None
+                    return
+                
+                delay = self._delay * random.uniform(1 - self.jitter, 1 + self.jitter)
+                self._delay = min(self._delay * self.backoff, self.max_delay)
+                self._condition.wait(delay)
+                pending = dict(self._pending)
+            
+            self._poll(pending)
+    
+    def _poll(self, pending: dict):
+        """Fetch current statuses once and resolve finished services"""
+        try:
+            if len(pending) == 1:
+                service_id = next(iter(pending))
+                statuses = {service_id: self.client.get_service(service_id, refresh=True).status}
+            else:
+                statuses = {service.id: service.status
+                            for service in self.client.iter_services(refresh=True)}
+        except Exception as e:
+            # Keep polling: an error here must not strand the pending futures
+            self.logger.error(f"Error checking service status: {e}")
+            statuses = {}
+        
+        now = time.time()
+        for service_id, (future, deadline) in pending.items():
+            status = statuses.get(service_id)
+            
+            if status in self.READY_STATUSES:
+                ready = True
+            elif status in self.FAILED_STATUSES:
+                self.logger.error(f"Service {service_id} failed to deploy")
+                ready = False
+            elif now >= deadline:
+                self.logger.error(f"Timeout waiting for service {service_id} to be ready")
+                ready = False
+            else:
+                self.logger.info(f"Service {service_id} status: {status or 'unknown'}, waiting...")
+                continue
+            
+            with self._condition:
+                self._pending.pop(service_id, None)
+            future.set_result(ready)
+
+
+class LogTail:
+    """Incrementally tails logs for several services from one poll loop"""
+    
+    LEVEL_PATTERN = re.compile(r'\b(TRACE|DEBUG|INFO|WARN(?:ING)?|ERROR|FATAL|CRITICAL)\b', re.IGNORECASE)
+    LEVEL_ALIASES = {'warning': 'warn', 'critical': 'fatal'}
+    
+    def __init__(self, client: RenderAPIClient, service_ids: Iterable[str], pattern: str = None,
+                 levels: Iterable[str] = None, lines: int = 100, interval: float = 2.0,
+                 max_interval: float = 15.0, backlog: bool = True):
+        """
+        Initialize the log tail
+        
+        Args:
+            client: Render API client used for polling
+            service_ids: Service IDs to tail
+            pattern: Optional regex a line must match
+            levels: Optional log levels to keep
+            lines: Lines requested per poll
+            interval: Poll interval in seconds while logs are active
+            max_interval: Upper bound for the poll interval while idle
+            backlog: Yield the lines already present on the first poll
+        """
+        self.client = client
+        self.pattern = re.compile(pattern) if pattern else None
+        self.levels = {self._normalize_level(level) for level in levels} if levels else None
+        self.lines = lines
+        self.interval = interval
+        self.max_interval = max_interval
+        self.backlog = backlog
+        self.logger = logging.getLogger(__name__)
+        
+        # Per service: keys of the last poll (at most `lines`), the next
+        # start time if the API provides one, current interval and due time
+        self._state = {service_id: {'keys': None, 'start_time': None,
+                                    'interval': interval, 'due': 0.0}
+                       for service_id in service_ids}
+        self._stop = threading.Event()
+    
+    def stop(self):
+        """Stop following; the iterator finishes after the current poll"""
+        self._stop.set()
+    
+    def poll_once(self) -> Iterator[tuple]:
+        """Poll every service once and yield new, matching entries"""
+        for service_id in self._state:
+            yield from self._poll(service_id)
+    
+    def __iter__(self) -> Iterator[tuple]:
+        while not self._stop.is_set():
+            now = time.monotonic()
+            due = [service_id for service_id, state in self._state.items() if state['due'] <= now]
+            
+            for service_id in due:
+                yield from self._poll(service_id)
+            
+            next_due = min(state['due'] for state in self._state.values())
+            self._stop.wait(max(0.0, next_due - time.monotonic()))
+    
+    def _poll(self, service_id: str) -> Iterator[tuple]:
+        """Fetch one page for a service and yield only unseen, matching entries"""
+        state = self._state[service_id]
+        
+        try:
+            entries, next_start = self.client._fetch_logs(service_id, self.lines, state['start_time'])
+        except RenderAPIError as e:
+            self.logger.error(f"Error fetching logs for {service_id}: {e}")
+            entries, next_start = None, None
+        
+        if entries is None:
+            fresh = []
+        else:
+            keys = [self._entry_key(entry) for entry in entries]
+            previous = state['keys']
+            
+            if previous is None:
+                fresh = entries if self.backlog else []
+            else:
+                overlap = self._overlap(previous, keys)
+                if overlap == 0 and previous and keys and not next_start:
+                    self.logger.debug(f"No overlap with the previous poll for {service_id}; lines may have been missed")
+                fresh = entries[overlap:]
+            
+            state['keys'] = keys
+            state['start_time'] = next_start or self._latest_timestamp(entries) or state['start_time']
+        
+        # Poll at the base rate while lines keep arriving, back off when idle
+        if fresh:
+            state['interval'] = self.interval
+        else:
+            state['interval'] = min(state['interval'] * 1.5, self.max_interval)
+        state['due'] = time.monotonic() + state['interval']
+        
+        for entry in fresh:
+            if self._matches(entry):
+                yield service_id, entry
+    
+    @staticmethod
+    def _overlap(previous: list, current: list) -> int:
+        """Length of the longest suffix of the previous poll that prefixes this one"""
+        for size in range(min(len(previous), len(current)), 0, -1):
+            if previous[-size:] == current[:size]:
+                return size
+        return 0
+    
+    @staticmethod
+    def _entry_key(entry: Any):
+        """Comparable identity for a log entry"""
+        if isinstance(entry, dict):
+            return entry.get('id') or (entry.get('timestamp'), entry.get('message'))
+        return entry
+    
+    @staticmethod
+    def _latest_timestamp(entries: list) -> Optional[str]:
+        timestamps = [entry['timestamp'] for entry in entries
+                      if isinstance(entry, dict) and entry.get('timestamp')]
+        return max(timestamps) if timestamps else None
+    
+    def _matches(self, entry: Any) -> bool:
+        """Apply the level and regex filters"""
+        message = self.message(entry)
+        
+        if self.levels is not None and self.level(entry) not in self.levels:
+            return False
+        if self.pattern is not None and not self.pattern.search(message):
+            return False
+        return True
+    
+    @staticmethod
+    def message(entry: Any) -> str:
+        if isinstance(entry, dict):
+            return str(entry.get('message', ''))
+        return str(entry)
+    
+    @classmethod
+    def level(cls, entry: Any) -> Optional[str]:
+        """Log level from structured labels, or parsed from the line text"""
+        if isinstance(entry, dict):
+            if entry.get('level'):
+                return cls._normalize_level(entry['level'])
+            for label in entry.get('labels', []):
+                if label.get('name') == 'level':
+                    return cls._normalize_level(label.get('value', ''))
+        
+        match = cls.LEVEL_PATTERN.search(cls.message(entry))
+        return cls._normalize_level(match.group(1)) if match else None
+    
+    @classmethod
+    def _normalize_level(cls, level: str) -> str:
+        level = level.lower()
+        return cls.LEVEL_ALIASES.get(level, level)
+    
+    @classmethod
+    def format(cls, entry: Any) -> str:
+        """Render an entry as a single printable line"""
+        if isinstance(entry, dict):
+            parts = [entry.get('timestamp'), cls.message(entry)]
+            return ' '.join(str(part) for part in parts if part)
+        return str(entry)
 
 
 class N8nRenderManager:
     """High-level manager for n8n deployments on Render"""
     
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str, cache_path: str = None, rate_limiter: 'RateLimiter' = None):
         """
         Initialize the n8n Render manager
         
         Args:
             api_key: Render API key
+            cache_path: Optional SQLite file persisting the API read cache
+            rate_limiter: Optional limiter shared with other clients using the same key
         """
-        self.client = RenderAPIClient(api_key)
+        self.client = RenderAPIClient(api_key, cache_path=cache_path, rate_limiter=rate_limiter)
         self.logger = logging.getLogger(__name__)
     
+    def iter_n8n_services(self, service_type: str = None) -> Iterator[RenderService]:
+        """
+        Iterate over n8n-related services as pages arrive
+        
+        Args:
+            service_type: Filter by service type (web, pserv, cron, worker)
+            
+        Yields:
+            n8n services
+        """
+        # Filter services that look like n8n deployments
+        for service in self.client.iter_services(service_type):
+            if any(keyword in service.name.lower() for keyword in ['n8n', 'automation']):
+                yield service
+    
     def list_n8n_services(self) -> List[RenderService]:
         """
         List all n8n-related services
@@ -378,28 +1163,23 @@ class N8nRenderManager:
         Returns:
             List of n8n services
         """
-        all_services = self.client.get_services()
-        
-        # Filter services that look like n8n deployments
-        n8n_services = []
-        for service in all_services:
-            if any(keyword in service.name.lower() for keyword in ['n8n', 'automation']):
-                n8n_services.append(service)
-        
-        return n8n_services
+        return list(self.iter_n8n_services())
     
-    def create_postgres_deployment(self, name: str, config: dict) -> dict:
+    def create_postgres_deployment(self, name: str, config: dict,
+                                   progress: Callable[[str, str], None] = None) -> dict:
         """
         Create a complete n8n deployment with PostgreSQL
         
         Args:
             name: Deployment name
             config: Deployment configuration
+            progress: Optional callable(name, message) notified after each step
             
         Returns:
             Deployment details
         """
         self.logger.info(f"Creating PostgreSQL deployment: {name}")
+        progress = progress or (lambda *args: None)
         
         # Create database service
         db_config = {
@@ -419,10 +1199,12 @@ class N8nRenderManager:
         
         database = self.client.create_database_service(db_config)
         self.logger.info(f"Created database service: {database.id}")
+        progress(name, f"database {database.id} created")
         
         # Wait for database to be ready
-        if not self.client.wait_for_deployment(database.id, timeout=300):
+        if not self.client.wait_for_deployment(database.id, timeout=config.get('database_timeout', 300)):
             raise RenderAPIError("Database failed to become ready")
+        progress(name, "database ready")
         
         # Create web service
         web_config = {
@@ -445,6 +1227,7 @@ class N8nRenderManager:
         
         web_service = self.client.create_web_service(web_config)
         self.logger.info(f"Created web service: {web_service.id}")
+        progress(name, f"web service {web_service.id} created")
         
         return {
             'database': database,
@@ -452,18 +1235,21 @@ class N8nRenderManager:
             'deployment_name': name
         }
     
-    def create_disk_deployment(self, name: str, config: dict) -> dict:
+    def create_disk_deployment(self, name: str, config: dict,
+                               progress: Callable[[str, str], None] = None) -> dict:
         """
         Create a complete n8n deployment with persistent disk
         
         Args:
             name: Deployment name
             config: Deployment configuration
+            progress: Optional callable(name, message) notified after each step
             
         Returns:
             Deployment details
         """
         self.logger.info(f"Creating disk deployment: {name}")
+        progress = progress or (lambda *args: None)
         
         # Create web service with persistent disk
         web_config = {
@@ -491,12 +1277,75 @@ class N8nRenderManager:
         
         web_service = self.client.create_web_service(web_config)
         self.logger.info(f"Created web service: {web_service.id}")
+        progress(name, f"web service {web_service.id} created")
         
         return {
             'web_service': web_service,
             'deployment_name': name
         }
     
+    def provision_fleet(self, tenants: List[dict], concurrency: int = 5, wait: bool = False,
+                        wait_timeout: int = 600,
+                        progress: Callable[[str, str], None] = None) -> List[dict]:
+        """
+        Provision many tenant deployments concurrently
+        
+        Up to concurrency tenants are in flight at once, each running its own
+        database -> web service pipeline. Waits for databases (and, with
+        wait, web services) go through the client's shared deployment
+        waiter, so in-flight tenants are polled together.
+        
+        Args:
+            tenants: Tenant configurations, each with a 'name' and optional
+                'type' ('postgres' or 'disk') plus deployment options
+            concurrency: Maximum number of tenants provisioned at once
+            wait: Also wait for each web service to go live
+            wait_timeout: Maximum wait for a web service in seconds
+            progress: Optional callable(name, message) for progress updates
+            
+        Returns:
+            One result per tenant, in manifest order, with 'name', 'status'
+            ('created', 'live' or 'failed'), 'seconds' and either
+            'deployment' or 'error'
+        """
+        progress = progress or (lambda *args: None)
+        
+        def provision(tenant: dict) -> dict:
+            name = tenant['name']
+            start_time = time.time()
+            progress(name, "starting")
+            
+            try:
+                if tenant.get('type', 'postgres') == 'disk':
+                    deployment = self.create_disk_deployment(name, tenant, progress)
+                else:
+                    deployment = self.create_postgres_deployment(name, tenant, progress)
+                
+                status = 'created'
+                if wait:
+                    web_id = deployment['web_service'].id
+                    if not self.client.wait_for_deployment(web_id, timeout=wait_timeout):
+                        raise RenderAPIError(f"Web service {web_id} failed to become ready")
+                    status = 'live'
+                
+                progress(name, status)
+                return {'name': name, 'status': status, 'deployment': deployment,
+                        'seconds': time.time() - start_time}
+                
+            except Exception as e:
+                self.logger.error(f"Provisioning {name} failed: {e}")
+                progress(name, f"failed: {e}")
+                return {'name': name, 'status': 'failed', 'error': str(e),
+                        'seconds': time.time() - start_time}
+        
+        with ThreadPoolExecutor(max_workers=max(1, concurrency), thread_name_prefix='provision') as executor:
+            futures = {executor.submit(provision, tenant): index for index, tenant in enumerate(tenants)}
+            results = [None] * len(tenants)
+            for future in as_completed(futures):
+                results[futures[future]] = future.result()
+        
+        return results
+    
     def _get_postgres_env_vars(self, service_name: str, database_id: str) -> List[dict]:
         """Get environment variables for PostgreSQL deployment"""
         return [
@@ -560,9 +1409,10 @@ class N8nRenderManager:
             "N8N_ENCRYPTION_KEY": encryption_key
         }
         
-        for key, value in env_vars.items():
-            if not self.client.set_environment_variable(service_id, key, value):
-                self.logger.error(f"Failed to set {key}")
+        try:
+            self.client.sync_environment_variables(service_id, env_vars)
+        except RenderAPIError as e:
+            self.logger.error(f"Failed to set authentication variables: {e}")
         
         return {
             "username": username,
@@ -606,6 +1456,45 @@ class N8nRenderManager:
         }
 
 
+def load_fleet_manifest(path: str) -> List[dict]:
+    """
+    Load a fleet manifest
+    
+    The manifest is JSON or YAML, either a list of tenants or a mapping with
+    'tenants' and optional 'defaults' applied to every tenant:
+    
+        defaults: {type: postgres, region: oregon, web_plan: starter}
+        tenants:
+          - name: acme-n8n
+          - name: globex-n8n
+            type: disk
+    
+    Args:
+        path: Manifest file path
+        
+    Returns:
+        Tenant configurations with defaults applied
+    """
+    with open(path, 'r') as f:
+        if path.endswith(('.yaml', '.yml')):
+            import yaml
+            manifest = yaml.safe_load(f)
+        else:
+            manifest = json.load(f)
+    
+    if isinstance(manifest, list):
+        manifest = {'tenants': manifest}
+    
+    defaults = manifest.get('defaults', {})
+    tenants = []
+    for tenant in manifest.get('tenants', []):
+        if 'name' not in tenant:
+            raise ValueError(f"Fleet manifest tenant without a name: {tenant}")
+        tenants.append({**defaults, **tenant})
+    
+    return tenants
+
+
 def setup_logging(verbose: bool = False):
     """Set up logging configuration"""
     level = logging.DEBUG if verbose else logging.INFO
@@ -621,6 +1510,10 @@ def main():
     parser.add_argument("--api-key", help="Render API key", 
                        default=os.getenv("RENDER_API_KEY"))
     parser.add_argument("--verbose", "-v", action="store_true", help="Verbose output")
+    parser.add_argument("--cache-file", help="SQLite file persisting API read cache between runs (env vars are never persisted)",
+                       default=os.getenv("RENDER_API_CACHE"))
+    parser.add_argument("--rate-limit", type=float, default=os.getenv("RENDER_API_RATE_LIMIT"),
+                       help="Maximum requests per second (default: paced by the API's rate limit headers only)")
     
     subparsers = parser.add_subparsers(dest="command", help="Available commands")
     
@@ -638,14 +1531,27 @@ def main():
     create_parser.add_argument("--github-repo", help="GitHub repository URL")
     create_parser.add_argument("--github-branch", default="main", help="GitHub branch")
     
+    # Fleet provisioning command
+    fleet_parser = subparsers.add_parser("fleet", help="Provision deployments from a manifest")
+    fleet_parser.add_argument("manifest", help="Fleet manifest (JSON or YAML)")
+    fleet_parser.add_argument("--concurrency", type=int, default=5,
+                              help="Maximum tenants provisioned at once")
+    fleet_parser.add_argument("--wait", action="store_true", help="Wait for web services to go live")
+    fleet_parser.add_argument("--timeout", type=int, default=600,
+                              help="Maximum wait for each web service in seconds")
+    
     # Status command
     status_parser = subparsers.add_parser("status", help="Get deployment status")
     status_parser.add_argument("name", help="Deployment name")
     
     # Logs command
     logs_parser = subparsers.add_parser("logs", help="Get service logs")
-    logs_parser.add_argument("service_id", help="Service ID")
+    logs_parser.add_argument("service_ids", nargs="+", metavar="service_id", help="Service ID(s)")
     logs_parser.add_argument("--lines", type=int, default=100, help="Number of log lines")
+    logs_parser.add_argument("-f", "--follow", action="store_true", help="Keep printing new lines as they arrive")
+    logs_parser.add_argument("--grep", help="Only show lines matching this regex")
+    logs_parser.add_argument("--level", action="append", help="Only show lines at this level (repeatable)")
+    logs_parser.add_argument("--interval", type=float, default=2.0, help="Follow poll interval in seconds")
     
     args = parser.parse_args()
     
@@ -656,18 +1562,21 @@ def main():
     setup_logging(args.verbose)
     
     try:
-        manager = N8nRenderManager(args.api_key)
+        rate_limiter = RateLimiter(rate=float(args.rate_limit)) if args.rate_limit else None
+        manager = N8nRenderManager(args.api_key, cache_path=args.cache_file, rate_limiter=rate_limiter)
         
         if args.command == "list":
-            services = manager.list_n8n_services()
-            if args.type:
-                services = [s for s in services if s.type == args.type]
-            
-            print(f"Found {len(services)} n8n services:")
-            for service in services:
-                print(f"  {service.name} ({service.type}) - {service.status}")
+            count = 0
+            for service in manager.iter_n8n_services():
+                if args.type and service.type != args.type:
+                    continue
+                
+                print(f"  {service.name} ({service.type}) - {service.status}", flush=True)
                 if service.url:
                     print(f"    URL: {service.url}")
+                count += 1
+            
+            print(f"Found {count} n8n services")
         
         elif args.command == "create":
             config = {
@@ -688,6 +1597,30 @@ def main():
                 print(f"Created disk deployment: {args.name}")
                 print(f"  Web Service ID: {deployment['web_service'].id}")
         
+        elif args.command == "fleet":
+            tenants = load_fleet_manifest(args.manifest)
+            print(f"Provisioning {len(tenants)} deployments (concurrency {args.concurrency})")
+            
+            print_lock = threading.Lock()
+            
+            def report(name: str, message: str):
+                with print_lock:
+                    print(f"  [{name}] {message}", flush=True)
+            
+            results = manager.provision_fleet(tenants, args.concurrency, args.wait, args.timeout, report)
+            
+            failed = [r for r in results if r['status'] == 'failed']
+            print(f"Provisioned {len(results) - len(failed)}/{len(results)} deployments:")
+            for result in results:
+                if result['status'] == 'failed':
+                    print(f"  {result['name']}: failed after {result['seconds']:.0f}s - {result['error']}")
+                else:
+                    print(f"  {result['name']}: {result['status']} in {result['seconds']:.0f}s "
+                          f"(web service {result['deployment']['web_service'].id})")
+            
+            if failed:
+                sys.exit(1)
+        
         elif args.command == "status":
             status = manager.get_deployment_status(args.name)
             print(f"Deployment '{args.name}' status: {status['status']}")
@@ -695,9 +1628,14 @@ def main():
                 print(f"  {service.name}: {service.status}")
         
         elif args.command == "logs":
-            logs = manager.client.get_service_logs(args.service_id, args.lines)
-            for log in logs:
-                print(log)
+            tail = manager.client.follow_service_logs(args.service_ids, args.grep, args.level,
+                                                      args.lines, args.interval)
+            entries = iter(tail) if args.follow else tail.poll_once()
+            
+            prefix = len(args.service_ids) > 1
+            for service_id, entry in entries:
+                line = LogTail.format(entry)
+                print(f"[{service_id}] {line}" if prefix else line, flush=True)
         
         else:
             parser.print_help()